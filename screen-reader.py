@@ -10,6 +10,12 @@ import configparser
 import threading
 import queue
 import json
+import hashlib
+import bisect
+import difflib
+import re
+from collections import OrderedDict, deque
+from abc import ABC, abstractmethod
 from enum import Enum
 import sys
 import keyboard
@@ -68,11 +74,16 @@ class UIElementType(Enum):
     IMAGE = "imagem"
     HEADING = "título"
     PARAGRAPH = "texto"
+    TABLE = "tabela"
+    REGION = "região"
     UNKNOWN = "elemento desconhecido"
 
 class UIElement:
     """Representa um elemento de interface detectado na tela"""
     
+    # Atributos fixos: centenas de elementos são criados por quadro
+    __slots__ = ('element_type', 'position', 'text', 'confidence', 'accessibility_id', 'description')
+    
     def __init__(self, element_type, position, text="", confidence=0.0, accessibility_id=None):
         self.element_type = element_type
         self.position = position  # (x1, y1, x2, y2)
@@ -86,12 +97,596 @@ class UIElement:
             return f"{self.element_type.value}: {self.text}"
         return f"{self.element_type.value}"
 
+class ElementTable:
+    """Elementos de um quadro em arrays NumPy: caixas, códigos de tipo, confianças e índices de texto
+    
+    Translação de coordenadas, filtragem e busca pelo elemento sob o cursor são operações vetorizadas;
+    objetos UIElement só são criados para os elementos efetivamente usados. Textos e ids de
+    acessibilidade ficam em listas compartilhadas entre as tabelas derivadas.
+    """
+    
+    TYPES = list(UIElementType)
+    TYPE_CODES = {element_type: code for code, element_type in enumerate(TYPES)}
+    
+    def __init__(self, boxes, types, confidences, text_ids, texts, id_ids, accessibility_ids):
+        self.boxes = boxes              # int32 (N, 4): x1, y1, x2, y2
+        self.types = types              # uint8 (N,): índice em TYPES
+        self.confidences = confidences  # float32 (N,)
+        self.text_ids = text_ids        # int32 (N,): índice em texts
+        self.texts = texts              # textos distintos do quadro
+        self.id_ids = id_ids            # int32 (N,): índice em accessibility_ids
+        self.accessibility_ids = accessibility_ids
+        self._spatial_index = None
+    
+    @classmethod
+    def from_elements(cls, elements):
+        texts, text_index = [], {}
+        accessibility_ids, id_index = [], {}
+        count = len(elements)
+        boxes = np.empty((count, 4), dtype=np.int32)
+        types = np.empty(count, dtype=np.uint8)
+        confidences = np.empty(count, dtype=np.float32)
+        text_ids = np.empty(count, dtype=np.int32)
+        id_ids = np.empty(count, dtype=np.int32)
+        
+        for i, elem in enumerate(elements):
+            boxes[i] = elem.position
+            types[i] = cls.TYPE_CODES[elem.element_type]
+            confidences[i] = elem.confidence
+            text = elem.text or ""
+            if text not in text_index:
+                text_index[text] = len(texts)
+                texts.append(text)
+            text_ids[i] = text_index[text]
+            if elem.accessibility_id not in id_index:
+                id_index[elem.accessibility_id] = len(accessibility_ids)
+                accessibility_ids.append(elem.accessibility_id)
+            id_ids[i] = id_index[elem.accessibility_id]
+        
+        return cls(boxes, types, confidences, text_ids, texts, id_ids, accessibility_ids)
+    
+    def __len__(self):
+        return len(self.boxes)
+    
+    def element(self, i):
+        """Cria o UIElement da linha i"""
+        return UIElement(
+            self.TYPES[self.types[i]],
+            tuple(int(value) for value in self.boxes[i]),
+            self.texts[self.text_ids[i]],
+            float(self.confidences[i]),
+            self.accessibility_ids[self.id_ids[i]]
+        )
+    
+    def to_elements(self):
+        return [self.element(i) for i in range(len(self))]
+    
+    def translate(self, dx, dy):
+        """Tabela com as caixas deslocadas (por exemplo, de coordenadas locais para globais)"""
+        return ElementTable(self.boxes + np.array([dx, dy, dx, dy], dtype=np.int32), self.types,
+                            self.confidences, self.text_ids, self.texts, self.id_ids, self.accessibility_ids)
+    
+    def filter(self, mask):
+        """Tabela com as linhas selecionadas por uma máscara booleana ou lista de índices"""
+        return ElementTable(self.boxes[mask], self.types[mask], self.confidences[mask], self.text_ids[mask],
+                            self.texts, self.id_ids[mask], self.accessibility_ids)
+    
+    def with_text(self):
+        """Máscara dos elementos com texto"""
+        non_empty = np.array([bool(text.strip()) for text in self.texts], dtype=bool)
+        return non_empty[self.text_ids] if len(self) else np.zeros(0, dtype=bool)
+    
+    def contains_point(self, x, y):
+        boxes = self.boxes
+        return (boxes[:, 0] <= x) & (x <= boxes[:, 2]) & (boxes[:, 1] <= y) & (y <= boxes[:, 3])
+    
+    def spatial_index(self):
+        """Índice espacial das caixas, construído na primeira consulta"""
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(self.boxes)
+        return self._spatial_index
+    
+    def hit_test(self, x, y):
+        """Índice do elemento mais interno que contém o ponto ou, se nenhum, do mais próximo (None se vazia)"""
+        return self.spatial_index().hit_test(x, y)
+    
+    def nearest(self, x, y, k=1):
+        """Índices dos k elementos mais próximos do ponto"""
+        return self.spatial_index().nearest(x, y, k)
+    
+    def memory_bytes(self):
+        """Memória ocupada pela tabela: arrays mais textos e ids distintos"""
+        arrays = (self.boxes.nbytes + self.types.nbytes + self.confidences.nbytes +
+                  self.text_ids.nbytes + self.id_ids.nbytes)
+        return (arrays + sum(sys.getsizeof(text) for text in self.texts) +
+                sum(sys.getsizeof(value) for value in self.accessibility_ids if value is not None))
+
+class SpatialIndex:
+    """Grade uniforme sobre as caixas dos elementos para consultas por ponto em tempo sublinear
+    
+    Cada caixa é registrada nas células que cobre; caixas que cobririam mais de `max_cells` células
+    (contêineres do tamanho da janela) ficam em uma lista à parte, sempre verificada. `innermost`
+    devolve o menor elemento que contém o ponto e `nearest` os k elementos mais próximos pela
+    distância até a caixa, buscando em anéis de células a partir da célula do ponto.
+    """
+    
+    def __init__(self, boxes, cell_size=64, max_cells=64):
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        self.cell_size = cell_size
+        self.cells = {}  # (coluna, linha) -> [índices]
+        self.large = []
+        self.areas = ((self.boxes[:, 2] - self.boxes[:, 0]).astype(np.int64) *
+                      (self.boxes[:, 3] - self.boxes[:, 1])).tolist()
+        self.box_list = self.boxes.tolist()  # Listas Python são mais rápidas nas consultas por candidato
+        
+        if len(self.boxes):
+            cell_boxes = self.boxes // cell_size
+            self.min_cell = cell_boxes[:, :2].min(axis=0)
+            self.max_cell = cell_boxes[:, 2:].max(axis=0)
+        else:
+            self.min_cell = self.max_cell = np.zeros(2, dtype=np.int32)
+        
+        for i, (cx1, cy1, cx2, cy2) in enumerate(self.boxes // cell_size):
+            if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > max_cells:
+                self.large.append(i)
+                continue
+            for cy in range(cy1, cy2 + 1):
+                for cx in range(cx1, cx2 + 1):
+                    self.cells.setdefault((cx, cy), []).append(i)
+    
+    def __len__(self):
+        return len(self.boxes)
+    
+    def _candidates(self, column, row):
+        return self.cells.get((column, row), [])
+    
+    def containing(self, x, y):
+        """Índices (em ordem) dos elementos que contêm o ponto"""
+        candidates = self._candidates(int(x) // self.cell_size, int(y) // self.cell_size) + self.large
+        boxes = self.box_list
+        return sorted(i for i in candidates
+                      if boxes[i][0] <= x <= boxes[i][2] and boxes[i][1] <= y <= boxes[i][3])
+    
+    def innermost(self, x, y):
+        """Índice do menor elemento que contém o ponto (o primeiro, em empate), ou None"""
+        inside = self.containing(x, y)
+        if not inside:
+            return None
+        return min(inside, key=lambda i: (self.areas[i], i))
+    
+    def _distance(self, i, x, y):
+        box = self.box_list[i]
+        dx = max(box[0] - x, 0, x - box[2])
+        dy = max(box[1] - y, 0, y - box[3])
+        return dx * dx + dy * dy
+    
+    @staticmethod
+    def _ring(column, row, ring):
+        """Células na borda do quadrado de raio `ring` em torno de (column, row)"""
+        if ring == 0:
+            yield column, row
+            return
+        for cx in range(column - ring, column + ring + 1):
+            yield cx, row - ring
+            yield cx, row + ring
+        for cy in range(row - ring + 1, row + ring):
+            yield column - ring, cy
+            yield column + ring, cy
+    
+    def nearest(self, x, y, k=1):
+        """Índices dos k elementos mais próximos do ponto (distância até a caixa; empate pela menor área)"""
+        if not len(self.boxes):
+            return []
+        column, row = int(x) // self.cell_size, int(y) // self.cell_size
+        seen = set(self.large)
+        found = [(self._distance(i, x, y), self.areas[i], i) for i in self.large]
+        
+        # Anéis crescentes até cobrir a grade ou até os k melhores estarem dentro do raio já verificado
+        max_ring = int(max(abs(column - self.min_cell[0]), abs(column - self.max_cell[0]),
+                           abs(row - self.min_cell[1]), abs(row - self.max_cell[1])))
+        for ring in range(max_ring + 1):
+            for cx, cy in self._ring(column, row, ring):
+                for i in self._candidates(cx, cy):
+                    if i not in seen:
+                        seen.add(i)
+                        found.append((self._distance(i, x, y), self.areas[i], i))
+            if len(found) >= k:
+                found.sort()
+                # Qualquer caixa ainda não vista está a pelo menos `ring` células completas do ponto
+                reach = ring * self.cell_size
+                if found[k - 1][0] <= reach * reach:
+                    break
+        
+        found.sort()
+        return [i for _, _, i in found[:k]]
+    
+    def hit_test(self, x, y):
+        """Elemento mais interno que contém o ponto ou, se nenhum, o mais próximo (None se vazio)"""
+        index = self.innermost(x, y)
+        if index is None:
+            nearest = self.nearest(x, y)
+            index = nearest[0] if nearest else None
+        return index
+
+class ElementTracker:
+    """Associa os elementos de cada quadro a trilhas com identificadores estáveis
+    
+    A associação usa a matriz de IoU entre as caixas do quadro e as das trilhas, calculada de uma vez,
+    combinada com a semelhança dos textos. Caixas com os mesmos pixels da trilha são o mesmo elemento
+    mesmo sem texto (OCR adiado). Cada trilha tem um cache (texto, descrição, classificação) que vale
+    enquanto o hash dos pixels do elemento não muda.
+    """
+    
+    def __init__(self, iou_threshold=0.5, text_threshold=0.6, max_age=30.0, max_tracks=2000):
+        self.iou_threshold = iou_threshold
+        self.text_threshold = text_threshold
+        self.max_age = max_age
+        self.max_tracks = max_tracks
+        self.reset()
+    
+    def reset(self):
+        """Descarta todas as trilhas (por exemplo, ao trocar de janela)"""
+        self.boxes = np.zeros((0, 4), dtype=np.int32)
+        self.track_ids = np.zeros(0, dtype=np.int64)
+        self.last_seen = np.zeros(0, dtype=np.float64)
+        self.tracks = {}  # id -> {'text': ..., 'hash': ..., 'cache': {...}}
+        self.next_id = 1
+    
+    @staticmethod
+    def iou_matrix(a, b):
+        """IoU entre cada caixa de `a` (N, 4) e cada caixa de `b` (M, 4)"""
+        a = a.astype(np.float32)
+        b = b.astype(np.float32)
+        width = np.clip(np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0]), 0, None)
+        height = np.clip(np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1]), 0, None)
+        intersection = width * height
+        area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+        area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+        union = area_a[:, None] + area_b[None, :] - intersection
+        return np.where(union > 0, intersection / np.maximum(union, 1e-6), 0.0)
+    
+    @staticmethod
+    def text_similarity(a, b):
+        a = " ".join(a.lower().split())
+        b = " ".join(b.lower().split())
+        if a == b:
+            return 1.0
+        if not a or not b:
+            return 0.0
+        return difflib.SequenceMatcher(None, a, b).ratio()
+    
+    def update(self, table, image=None, origin=(0, 0)):
+        """Associa as linhas da ElementTable (coordenadas globais) às trilhas e retorna o id de cada linha
+        
+        Com `image` (captura cujo canto está em `origin`), o hash dos pixels de cada elemento decide se
+        o cache da trilha continua válido.
+        """
+        now = time.time()
+        
+        # Descartar trilhas antigas
+        alive = now - self.last_seen <= self.max_age
+        if not alive.all():
+            for track_id in self.track_ids[~alive]:
+                self.tracks.pop(int(track_id), None)
+            self.boxes, self.track_ids, self.last_seen = self.boxes[alive], self.track_ids[alive], self.last_seen[alive]
+        
+        count = len(table)
+        texts = [table.texts[text_id] for text_id in table.text_ids]
+        hashes = [None] * count
+        if image is not None:
+            pixels = np.asarray(image)
+            for i, (x1, y1, x2, y2) in enumerate(table.boxes.tolist()):
+                crop = pixels[max(0, y1 - origin[1]):max(0, y2 - origin[1]), max(0, x1 - origin[0]):max(0, x2 - origin[0])]
+                if crop.size:
+                    hashes[i] = WindowStateCache.hash_pixels(crop)
+        
+        # Pares candidatos pela IoU; a semelhança de texto só é calculada para eles
+        assigned = [None] * count
+        if count and len(self.track_ids):
+            iou = self.iou_matrix(table.boxes, self.boxes)
+            rows, columns = np.nonzero(iou >= self.iou_threshold)
+            candidates = []
+            for row, column in zip(rows.tolist(), columns.tolist()):
+                track = self.tracks[int(self.track_ids[column])]
+                if hashes[row] is not None and hashes[row] == track['hash']:
+                    similarity = 1.0
+                else:
+                    similarity = self.text_similarity(texts[row], track['text'])
+                if similarity >= self.text_threshold:
+                    candidates.append((iou[row, column] * similarity, row, column))
+            
+            used_columns = set()
+            for _, row, column in sorted(candidates, reverse=True):
+                if assigned[row] is None and column not in used_columns:
+                    assigned[row] = column
+                    used_columns.add(column)
+        
+        result = []
+        new_boxes, new_ids = [], []
+        for row in range(count):
+            column = assigned[row]
+            if column is None:
+                track_id = self.next_id
+                self.next_id += 1
+                self.tracks[track_id] = {'text': "", 'hash': None, 'cache': {}}
+                new_boxes.append(table.boxes[row])
+                new_ids.append(track_id)
+            else:
+                track_id = int(self.track_ids[column])
+                self.boxes[column] = table.boxes[row]
+                self.last_seen[column] = now
+            
+            track = self.tracks[track_id]
+            if hashes[row] is None or hashes[row] != track['hash']:
+                track['cache'] = {}  # Pixels mudaram (ou são desconhecidos): resultados guardados não valem mais
+                track['hash'] = hashes[row]
+            if texts[row]:
+                track['text'] = texts[row]
+                track['cache']['text'] = texts[row]
+            result.append(track_id)
+        
+        if new_ids:
+            self.boxes = np.concatenate([self.boxes, np.array(new_boxes, dtype=np.int32).reshape(-1, 4)])
+            self.track_ids = np.concatenate([self.track_ids, np.array(new_ids, dtype=np.int64)])
+            self.last_seen = np.concatenate([self.last_seen, np.full(len(new_ids), now)])
+        
+        # Limitar o número de trilhas, mantendo as vistas mais recentemente
+        if len(self.track_ids) > self.max_tracks:
+            keep = np.argsort(self.last_seen)[-self.max_tracks:]
+            for track_id in np.delete(self.track_ids, keep):
+                self.tracks.pop(int(track_id), None)
+            self.boxes, self.track_ids, self.last_seen = self.boxes[keep], self.track_ids[keep], self.last_seen[keep]
+        
+        return result
+    
+    def cached(self, track_id, key):
+        """Valor guardado para a trilha, ou None se não houver (ou se os pixels mudaram)"""
+        track = self.tracks.get(track_id)
+        return track['cache'].get(key) if track else None
+    
+    def store(self, track_id, key, value):
+        track = self.tracks.get(track_id)
+        if track:
+            track['cache'][key] = value
+
+class ForegroundInfo:
+    """Dados da janela em primeiro plano calculados uma vez por mudança de foco ou título"""
+    
+    def __init__(self, hwnd=None, title="", class_name=""):
+        self.hwnd = hwnd
+        self.title = title
+        self.class_name = class_name
+        self.browser = None
+        self.app_name = "generic"
+        self.app_profile = {"common_elements": {}, "regions": []}
+        self.is_browser = False
+        self.is_social_media = False
+        self.is_document = False
+        self.is_code_editor = False
+        self.is_line_grid_app = False
+        self.has_line_numbers = False
+        self.is_accessibility_compatible = False
+
+
+class ForegroundContext:
+    """Serviço compartilhado com o contexto da janela em primeiro plano
+    
+    Cada consulta faz apenas uma verificação barata (identificador e título da janela); classe,
+    navegador, perfil da aplicação e categorias são recalculados somente quando um deles muda.
+    """
+    
+    BROWSERS = {
+        'chrome': ('Chrome', 'Chrome_WidgetWin_1'),
+        'edge': ('Edge', 'Chrome_WidgetWin_1'),  # Edge usa mesma classe que Chrome
+        'firefox': ('Firefox', 'MozillaWindowClass'),
+        'opera': ('Opera', 'Chrome_WidgetWin_1'),  # Opera também usa Chrome
+        'safari': ('Safari', 'SafariWnd')
+    }
+    BROWSER_TITLES = ("chrome", "firefox", "edge", "safari", "opera")
+    SOCIAL_MEDIA_TITLES = ("facebook", "instagram", "twitter", "linkedin", "youtube")
+    DOCUMENT_TITLES = ("word", "excel", "powerpoint", "pdf", "doc", "documento")
+    CODE_EDITOR_TITLES = ("code", "visual studio", "intellij", "pycharm", "sublime")
+    
+    # Aplicações conhecidas com bom suporte a APIs de acessibilidade
+    COMPATIBLE_APPS = (
+        # Navegadores (já tratados pelo HTML Accessibility Manager)
+        'chrome', 'firefox', 'edge', 'opera', 'safari',
+        # Aplicações Office
+        'word', 'excel', 'powerpoint', 'outlook',
+        # Editores de código
+        'vscode', 'visual studio', 'intellij', 'pycharm',
+        # Outras aplicações
+        'adobe', 'reader'
+    )
+    
+    def __init__(self, app_profiler=None, accessibility_manager=None):
+        self.platform = sys.platform
+        self.app_profiler = app_profiler or AppProfiler()
+        self.accessibility_manager = accessibility_manager
+        
+        self.win32gui = None
+        if self.platform == 'win32':
+            try:
+                import win32gui
+                self.win32gui = win32gui
+            except ImportError:
+                logger.warning("win32gui indisponível; contexto da janela em primeiro plano limitado")
+        
+        self.lock = threading.Lock()
+        self.info = ForegroundInfo()
+        self.stats = {'checks': 0, 'refreshes': 0}
+        
+        # Retângulo da janela reaproveitado por `rect_interval` (consultado a cada quadro)
+        self.rect_interval = 0.1
+        self.rect_cache = (None, 0.0)  # (retângulo, instante)
+    
+    def _read_window(self):
+        """Leitura barata do identificador e título da janela em primeiro plano"""
+        if self.win32gui:
+            hwnd = self.win32gui.GetForegroundWindow()
+            return hwnd, self.win32gui.GetWindowText(hwnd) if hwnd else ""
+        
+        if self.accessibility_manager:
+            focused = self.accessibility_manager.get_focused_element()
+            if focused:
+                return focused.accessibility_id or focused.text, focused.text or ""
+        return None, ""
+    
+    def get_window_rect(self):
+        """Retângulo (x1, y1, x2, y2) da janela em primeiro plano, ou None
+        
+        Windows: GetWindowRect; Linux: limites da janela ativa no cache AT-SPI. O resultado é
+        reaproveitado por `rect_interval` segundos, para que consultas por quadro não repitam a chamada.
+        """
+        rect, stamp = self.rect_cache
+        now = time.time()
+        if rect is not None and now - stamp < self.rect_interval:
+            return rect
+        rect = self._read_window_rect()
+        self.rect_cache = (rect, now)
+        return rect
+    
+    def _read_window_rect(self):
+        try:
+            if self.win32gui:
+                hwnd = self.win32gui.GetForegroundWindow()
+                return tuple(self.win32gui.GetWindowRect(hwnd)) if hwnd else None
+            
+            atspi_cache = self.accessibility_manager.get_atspi_cache() if self.accessibility_manager else None
+            active = atspi_cache.get_active_window() if atspi_cache else None
+            if active and active[1]:
+                return tuple(active[1])
+        except Exception as e:
+            logger.debug(f"Erro ao obter o retângulo da janela em primeiro plano: {e}")
+        return None
+    
+    def get(self):
+        """Retorna o ForegroundInfo atual, recalculando apenas se a janela ou o título mudaram"""
+        try:
+            hwnd, title = self._read_window()
+        except Exception as e:
+            logger.debug(f"Erro ao ler janela em primeiro plano: {e}")
+            return self.info
+        
+        with self.lock:
+            self.stats['checks'] += 1
+            if hwnd == self.info.hwnd and title == self.info.title:
+                return self.info
+            self.info = self._build(hwnd, title)
+            self.stats['refreshes'] += 1
+            return self.info
+    
+    def _build(self, hwnd, title):
+        class_name = ""
+        if self.win32gui and hwnd:
+            try:
+                class_name = self.win32gui.GetClassName(hwnd)
+            except Exception:
+                pass
+        
+        info = ForegroundInfo(hwnd, title, class_name)
+        title_lower = title.lower()
+        
+        for browser, (name, cls) in self.BROWSERS.items():
+            if name.lower() in title_lower or (class_name and cls == class_name):
+                info.browser = browser
+                break
+        
+        info.app_name, info.app_profile = self.app_profiler.get_app_profile(title)
+        info.is_browser = any(browser in title_lower for browser in self.BROWSER_TITLES)
+        info.is_social_media = any(site in title_lower for site in self.SOCIAL_MEDIA_TITLES)
+        info.is_document = any(app in title_lower for app in self.DOCUMENT_TITLES)
+        info.is_code_editor = any(editor in title_lower for editor in self.CODE_EDITOR_TITLES)
+        info.is_line_grid_app = bool(VisionManager.LINE_GRID_PATTERN.search(title_lower))
+        info.has_line_numbers = bool(VisionManager.LINE_NUMBER_PATTERN.search(title_lower))
+        info.is_accessibility_compatible = any(app in title_lower for app in self.COMPATIBLE_APPS)
+        
+        if info.browser and info.browser != self.info.browser:
+            logger.info(f"Navegador detectado: {info.browser}")
+        logger.debug(f"Janela em primeiro plano: '{title}' ({info.app_name})")
+        return info
+
 class HTMLAccessibilityManager:
     """Gerencia a extração de informações de acessibilidade de elementos HTML em navegadores"""
     
-    def __init__(self, accessibility_manager=None):
+    # Papéis AT-SPI -> tipos de elemento
+    ATSPI_ROLES = {
+        'push button': UIElementType.BUTTON,
+        'toggle button': UIElementType.BUTTON,
+        'link': UIElementType.LINK,
+        'entry': UIElementType.TEXT_FIELD,
+        'password text': UIElementType.TEXT_FIELD,
+        'check box': UIElementType.CHECKBOX,
+        'radio button': UIElementType.RADIO,
+        'combo box': UIElementType.DROPDOWN,
+        'heading': UIElementType.HEADING,
+        'image': UIElementType.IMAGE,
+        'paragraph': UIElementType.PARAGRAPH,
+        'label': UIElementType.PARAGRAPH,
+        'static': UIElementType.PARAGRAPH,
+        'table': UIElementType.TABLE,
+        'tree table': UIElementType.TABLE,
+        'landmark': UIElementType.REGION,
+    }
+    
+    # Papéis de navegação -> ControlType do UIA (consultas FindAll)
+    UIA_CONTROL_TYPES = {
+        'button': (50000,),
+        'checkbox': (50002,),
+        'combobox': (50003,),
+        'textbox': (50004,),
+        'link': (50005,),
+        'image': (50006,),
+        'radio': (50013,),
+        'table': (50036, 50028),
+    }
+    UIA_LANDMARK_ROLES = ('region', 'landmark', 'main', 'navigation')
+    UIA_CONTROL_TYPE_ELEMENTS = {
+        50000: UIElementType.BUTTON,
+        50002: UIElementType.CHECKBOX,
+        50003: UIElementType.DROPDOWN,
+        50004: UIElementType.TEXT_FIELD,
+        50005: UIElementType.LINK,
+        50006: UIElementType.IMAGE,
+        50013: UIElementType.RADIO,
+        50020: UIElementType.PARAGRAPH,
+        50028: UIElementType.TABLE,
+        50031: UIElementType.BUTTON,
+        50036: UIElementType.TABLE,
+    }
+    # UIA_HeadingLevelPropertyId e HeadingLevel_None, para reconhecer títulos fora da consulta em lote
+    UIA_HEADING_LEVEL_PROPERTY = 30173
+    UIA_HEADING_LEVEL_NONE = 80050
+    # UIA_LandmarkTypePropertyId: diferente de zero em regiões (main, navigation, region, ...)
+    UIA_LANDMARK_TYPE_PROPERTY = 30157
+    
+    # Contêineres não entram no cache de elementos sob o cursor: contêm outros elementos
+    CONTAINER_TYPES = (UIElementType.UNKNOWN, UIElementType.TABLE, UIElementType.REGION)
+    
+    # Papéis de navegação -> nomes das constantes ROLE_* do pyatspi (consultas Collection.getMatches)
+    ATSPI_QUERY_ROLES = {
+        'heading': ('ROLE_HEADING',),
+        'link': ('ROLE_LINK',),
+        'button': ('ROLE_PUSH_BUTTON', 'ROLE_TOGGLE_BUTTON'),
+        'textbox': ('ROLE_ENTRY', 'ROLE_PASSWORD_TEXT'),
+        'checkbox': ('ROLE_CHECK_BOX',),
+        'radio': ('ROLE_RADIO_BUTTON',),
+        'combobox': ('ROLE_COMBO_BOX',),
+        'table': ('ROLE_TABLE',),
+        'image': ('ROLE_IMAGE',),
+        'region': ('ROLE_LANDMARK', 'ROLE_SECTION'),
+        'landmark': ('ROLE_LANDMARK',),
+        'main': ('ROLE_LANDMARK',),
+        'navigation': ('ROLE_LANDMARK',),
+    }
+    
+    def __init__(self, accessibility_manager=None, foreground_context=None, cdp_port=0):
         self.platform = sys.platform
         self.accessibility_manager = accessibility_manager
+        self.foreground_context = foreground_context
+        
+        # Backend CDP opcional para navegadores Chromium (--remote-debugging-port)
+        self.cdp_backend = CDPAccessibilityBackend(port=cdp_port) if cdp_port else None
         logger.info(f"Inicializando gerenciador de acessibilidade HTML para plataforma: {self.platform}")
         
         # Importar bibliotecas específicas para cada navegador
@@ -106,6 +701,25 @@ class HTMLAccessibilityManager:
         # Inicializar atributos
         self.available = False
         self.has_uiautomation = False
+        self.tree_walker = None  # Percurso incremental da árvore (criado no primeiro uso)
+        self.tree_root_key = None
+        self.tree_differ = AccessibilityTreeDiffer()
+        self.diffed_sessions = {}  # raiz -> início do último percurso completo já comparado
+        
+        # Cliente UIA e pedidos de cache: propriedades chegam junto com os nós, sem uma chamada COM cada.
+        # O runtime id só entra no pedido quando o índice de papéis precisa casar eventos com ele
+        self.uia_automation = None
+        self.uia = None
+        self.uia_true_condition = None
+        self.uia_cache_requests = {}  # inclui runtime id -> pedido de cache
+        self.runtime_ids = False
+        
+        # Elementos recentes sob o cursor: mover dentro dos mesmos limites não consulta o backend.
+        # Só controles folha entram no cache; painéis e documentos (UNKNOWN) contêm outros elementos
+        self.hover_cache = []  # [(limites, elemento, janela, instante)]
+        self.hover_cache_size = 16
+        self.hover_ttl = 1.0
+        self.hover_stats = {'cache_hits': 0, 'point_queries': 0, 'misses': 0}
         
         try:
             if self.platform == 'win32':
@@ -158,6 +772,9 @@ class HTMLAccessibilityManager:
     def detect_browser(self):
         """Detecta qual navegador está em uso atualmente"""
         try:
+            if self.platform == 'win32' and self.foreground_context:
+                return self.foreground_context.get().browser
+            
             if self.platform == 'win32':
                 hwnd = self.win32gui.GetForegroundWindow()
                 title = self.win32gui.GetWindowText(hwnd)
@@ -196,9 +813,14 @@ class HTMLAccessibilityManager:
             
             elif self.platform.startswith('linux'):
                 try:
-                    desktop = self.pyatspi.Registry.getDesktop(0)
-                    for app in desktop:
-                        app_name = app.name.lower()
+                    atspi_cache = self.accessibility_manager.get_atspi_cache() if self.accessibility_manager else None
+                    if atspi_cache:
+                        app_names = atspi_cache.get_application_names()
+                    else:
+                        app_names = [app.name for app in self.pyatspi.Registry.getDesktop(0)]
+                    
+                    for app_name in app_names:
+                        app_name = app_name.lower()
                         if any(browser in app_name for browser in ['chrome', 'firefox', 'edge', 'opera']):
                             return next(browser for browser in ['chrome', 'firefox', 'edge', 'opera'] if browser in app_name)
                 except:
@@ -216,6 +838,13 @@ class HTMLAccessibilityManager:
             return []
         
         try:
+            if self._cdp_ready(browser):
+                try:
+                    return self.cdp_backend.get_elements(region)
+                except Exception as e:
+                    logger.debug(f"Consulta CDP falhou, usando a API do sistema: {e}")
+                    self.cdp_backend.close()
+            
             if self.platform == 'win32':
                 # Usar abordagem baseada em uiautomation
                 if self.has_uiautomation:
@@ -231,90 +860,415 @@ class HTMLAccessibilityManager:
             logger.error(f"Erro ao obter árvore de acessibilidade HTML: {e}")
             return []
     
-    def _get_tree_with_uiautomation(self, region=None):
-        """Obtém a árvore de acessibilidade usando a biblioteca uiautomation"""
+    def _cdp_ready(self, browser):
+        """Indica se o backend CDP atende a aba atual (somente navegadores Chromium)"""
+        if not self.cdp_backend or browser not in ('chrome', 'edge', 'opera'):
+            return False
+        if not self.foreground_context:
+            return self.cdp_backend.ensure_connected()
+        foreground = self.foreground_context.get()
+        return self.cdp_backend.ensure_connected(foreground.hwnd, foreground.title)
+    
+    def find_elements_by_role(self, roles):
+        """Retorna os elementos da janela ativa com os papéis pedidos, filtrados pelo próprio backend
+        
+        Usa uma única chamada FindAll com cache de propriedades (UIA) ou Collection.getMatches
+        (AT-SPI). Retorna None quando o backend não oferece a consulta, para que o chamador use a
+        árvore completa.
+        """
+        if isinstance(roles, str):
+            roles = [roles]
+        if not self.available:
+            return None
+        
+        try:
+            if self._cdp_ready(self.detect_browser()):
+                try:
+                    return self.cdp_backend.find_by_role(roles)
+                except Exception as e:
+                    logger.debug(f"Consulta CDP por papel falhou: {e}")
+                    self.cdp_backend.close()
+            
+            if self.platform == 'win32':
+                return self._find_by_role_uia(roles)
+            if self.platform.startswith('linux'):
+                return self._find_by_role_atspi(roles)
+        except Exception as e:
+            logger.debug(f"Consulta por papel no backend falhou: {e}")
+        return None
+    
+    def _uia_client(self):
+        """Cliente UIA (comtypes) compartilhado pelo percurso, pela consulta por ponto e pelas consultas por papel"""
+        if self.uia_automation is None:
+            automation = self.comtypes.client.CreateObject("UIAutomationClient.CUIAutomation")
+            from comtypes.gen import UIAutomationClient as uia
+            self.uia = uia
+            self.uia_true_condition = automation.CreateTrueCondition()
+            self.uia_automation = automation
+        return self.uia_automation
+    
+    def _uia_cache_request(self, runtime_ids=None):
+        """Pedido de cache com as propriedades lidas por _uia_to_element (runtime id só se pedido)"""
+        if runtime_ids is None:
+            runtime_ids = self.runtime_ids
+        cache_request = self.uia_cache_requests.get(runtime_ids)
+        if cache_request is None:
+            automation = self._uia_client()
+            uia = self.uia
+            cache_request = automation.CreateCacheRequest()
+            for property_id in (uia.UIA_NamePropertyId, uia.UIA_BoundingRectanglePropertyId,
+                                uia.UIA_ControlTypePropertyId, self.UIA_HEADING_LEVEL_PROPERTY,
+                                self.UIA_LANDMARK_TYPE_PROPERTY):
+                cache_request.AddProperty(property_id)
+            if runtime_ids:
+                cache_request.AddProperty(uia.UIA_RuntimeIdPropertyId)
+            self.uia_cache_requests[runtime_ids] = cache_request
+        return cache_request
+    
+    def require_runtime_ids(self):
+        """Passa a pedir o runtime id do UIA (o índice de papéis casa os eventos da árvore por ele)"""
+        if self.runtime_ids:
+            return
+        self.runtime_ids = True
+        self.hover_cache = []
+        if self.tree_walker is not None:
+            self.tree_walker.invalidate()
+    
+    def _find_by_role_uia(self, roles):
+        automation = self._uia_client()
+        uia = self.uia
+        
+        conditions = []
+        for role in roles:
+            for control_type in self.UIA_CONTROL_TYPES.get(role, ()):
+                conditions.append(automation.CreatePropertyCondition(uia.UIA_ControlTypePropertyId, control_type))
+        if 'heading' in roles:
+            # Títulos não têm ControlType próprio: nível de título diferente de "nenhum"
+            conditions.append(automation.CreateNotCondition(
+                automation.CreatePropertyCondition(uia.UIA_HeadingLevelPropertyId, uia.HeadingLevel_None)))
+        if any(role in self.UIA_LANDMARK_ROLES for role in roles):
+            conditions.append(automation.CreateNotCondition(
+                automation.CreatePropertyCondition(uia.UIA_LandmarkTypePropertyId, 0)))
+        if not conditions:
+            return []
+        
+        condition = conditions[0]
+        for other in conditions[1:]:
+            condition = automation.CreateOrCondition(condition, other)
+        
+        # Nome, limites, tipo e runtime id chegam junto com os resultados, sem uma chamada por elemento
+        cache_request = self._uia_cache_request(runtime_ids=True)
+        
+        root = automation.ElementFromHandle(self.win32gui.GetForegroundWindow())
+        found = root.FindAllBuildCache(uia.TreeScope_Descendants, condition, cache_request)
+        
+        elements = []
+        is_heading_query = 'heading' in roles
+        is_landmark_query = any(role in self.UIA_LANDMARK_ROLES for role in roles)
+        for index in range(found.Length):
+            item = found.GetElement(index)
+            rect = item.CachedBoundingRectangle
+            control_type = item.CachedControlType
+            element_type = self.UIA_CONTROL_TYPE_ELEMENTS.get(control_type, UIElementType.UNKNOWN)
+            # Encontrado pela condição de título ou de região, não pelo ControlType
+            if not any(control_type in self.UIA_CONTROL_TYPES.get(role, ()) for role in roles):
+                if is_heading_query:
+                    element_type = UIElementType.HEADING
+                elif is_landmark_query:
+                    element_type = UIElementType.REGION
+            try:
+                accessibility_id = self._uia_runtime_id(item.GetCachedPropertyValue(uia.UIA_RuntimeIdPropertyId))
+            except Exception:
+                accessibility_id = "html_element"
+            elements.append(UIElement(
+                element_type,
+                (rect.left, rect.top, rect.right, rect.bottom),
+                text=item.CachedName,
+                confidence=0.9,
+                accessibility_id=accessibility_id
+            ))
+        return elements
+    
+    def _find_by_role_atspi(self, roles):
+        pyatspi = self.pyatspi
+        role_values = []
+        for role in roles:
+            for name in self.ATSPI_QUERY_ROLES.get(role, ()):
+                value = getattr(pyatspi, name, None)
+                if value is not None and value not in role_values:
+                    role_values.append(value)
+        if not role_values:
+            return []
+        
+        window = self._foreground_key()
+        if window is None:
+            return None
+        
+        collection = window.queryCollection()
+        rule = collection.createMatchRule(
+            pyatspi.StateSet().raw(), collection.MATCH_NONE,
+            "", collection.MATCH_NONE,
+            role_values, collection.MATCH_ANY,
+            "", collection.MATCH_NONE,
+            False
+        )
+        matches = collection.getMatches(rule, collection.SORT_ORDER_CANONICAL, 0, True)
+        
         elements = []
+        for accessible in matches:
+            extents = accessible.queryComponent().getExtents(pyatspi.DESKTOP_COORDS)
+            elements.append(UIElement(
+                self.ATSPI_ROLES.get(accessible.getRoleName(), UIElementType.UNKNOWN),
+                (extents.x, extents.y, extents.x + extents.width, extents.y + extents.height),
+                text=accessible.name,
+                confidence=0.9,
+                accessibility_id=self._atspi_id(accessible)
+            ))
+        return elements
+    
+    def get_html_accessibility_snapshot(self, region=None):
+        """Retorna a árvore de acessibilidade da página como AccessibilitySnapshot"""
+        elements = self.get_html_accessibility_tree(region)
+        
+        parents = None
+        if region is None and self.tree_walker is not None:
+            parents = self.tree_walker.get_parents(self.tree_root_key)
+            if len(parents) != len(elements):
+                parents = None
+        
+        return AccessibilitySnapshot(elements, parents)
+    
+    def get_tree_changes(self):
+        """Eventos de mudança desde o último percurso completo da janela atual
+        
+        Só compara quando o percurso incremental terminou uma nova passagem pela árvore;
+        nos demais casos retorna lista vazia sem custo.
+        """
+        walker = self.tree_walker
+        root_key = self.tree_root_key
+        if walker is None or root_key is None or not walker.is_complete(root_key):
+            return []
+        
+        started = walker.sessions[root_key]['started']
+        if self.diffed_sessions.get(root_key) == started:
+            return []
+        self.diffed_sessions[root_key] = started
+        
+        events = self.tree_differ.update(root_key, walker.sessions[root_key]['elements'])
+        if events:
+            self.hover_cache = []
+        return events
+    
+    def _foreground_key(self):
+        """Identifica a janela ativa para invalidar o cache de elementos sob o cursor"""
+        if self.platform == 'win32':
+            if self.foreground_context:
+                return self.foreground_context.get().hwnd
+            return self.win32gui.GetForegroundWindow()
+        if self.platform.startswith('linux') and self.accessibility_manager:
+            atspi_cache = self.accessibility_manager.get_atspi_cache()
+            return atspi_cache.active_window if atspi_cache else None
+        return None
+    
+    def get_element_at_point(self, x, y):
+        """Retorna o elemento de acessibilidade sob o ponto (x, y) consultando o backend diretamente
         
+        Usa UIA ElementFromPoint (Windows) ou getAccessibleAtPoint (AT-SPI). Controles folha ficam em
+        cache pelos seus limites; contêineres são consultados de novo a cada ponto, para não encobrir
+        os filhos. Retorna None quando a consulta não é suportada ou falha.
+        """
+        if not self.available:
+            return None
+        
+        try:
+            window_key = self._foreground_key()
+            now = time.time()
+            
+            # Cache: elemento mais interno entre os recentes que contêm o ponto
+            best = None
+            for bounds, element, key, stamp in self.hover_cache:
+                if key != window_key or now - stamp > self.hover_ttl:
+                    continue
+                if bounds[0] <= x <= bounds[2] and bounds[1] <= y <= bounds[3]:
+                    area = (bounds[2] - bounds[0]) * (bounds[3] - bounds[1])
+                    if best is None or area < best[0]:
+                        best = (area, element)
+            if best:
+                self.hover_stats['cache_hits'] += 1
+                return best[1]
+            
+            self.hover_stats['point_queries'] += 1
+            element = None
+            if self.platform == 'win32' and self.has_uiautomation:
+                automation = self._uia_client()
+                control = automation.ElementFromPointBuildCache(self.uia.tagPOINT(x, y), self._uia_cache_request())
+                if control:
+                    element = self._uia_to_element(control, self._uia_bounds(control))
+            elif self.platform.startswith('linux'):
+                element = self._atspi_element_at_point(x, y)
+            
+            if element is None:
+                self.hover_stats['misses'] += 1
+                return None
+            if element.element_type in self.CONTAINER_TYPES:
+                return element
+            
+            self.hover_cache = [entry for entry in self.hover_cache if now - entry[3] <= self.hover_ttl]
+            self.hover_cache.append((element.position, element, window_key, now))
+            del self.hover_cache[:-self.hover_cache_size]
+            return element
+        
+        except Exception as e:
+            logger.debug(f"Consulta de elemento por ponto falhou: {e}")
+            self.hover_stats['misses'] += 1
+            return None
+    
+    def _atspi_element_at_point(self, x, y, max_depth=32):
+        """Desce pela janela ativa com getAccessibleAtPoint até o objeto mais interno sob o ponto"""
+        window = self._foreground_key()
+        if window is None:
+            for app in self.pyatspi.Registry.getDesktop(0):
+                for candidate in app:
+                    if candidate.getState().contains(self.pyatspi.STATE_ACTIVE):
+                        window = candidate
+                        break
+        if window is None:
+            return None
+        
+        accessible = window
+        for _ in range(max_depth):
+            child = accessible.queryComponent().getAccessibleAtPoint(x, y, self.pyatspi.DESKTOP_COORDS)
+            if child is None or child == accessible:
+                break
+            accessible = child
+        if accessible == window:
+            return None
+        
+        extents = accessible.queryComponent().getExtents(self.pyatspi.DESKTOP_COORDS)
+        return UIElement(
+            self.ATSPI_ROLES.get(accessible.getRoleName(), UIElementType.UNKNOWN),
+            (extents.x, extents.y, extents.x + extents.width, extents.y + extents.height),
+            text=accessible.name,
+            confidence=0.9,
+            accessibility_id=self._atspi_id(accessible)
+        )
+    
+    @staticmethod
+    def _atspi_id(accessible):
+        """Identificador estável de um objeto AT-SPI (barramento da aplicação + caminho do objeto)"""
+        try:
+            return f"atspi:{accessible.app.bus_name}{accessible.path}"
+        except Exception:
+            return "html_element"
+    
+    def _get_tree_with_uiautomation(self, region=None):
+        """Obtém a árvore de acessibilidade usando a biblioteca uiautomation
+        
+        O percurso é feito pelo AccessibilityTreeWalker: em largura, podado pela janela e pela
+        região, com orçamento por chamada e continuação na chamada seguinte. Os filhos de cada nó
+        vêm de um FindAllBuildCache, com as propriedades já no cache do UIA.
+        """
         try:
             # Usar janela em primeiro plano
-            hwnd = self.win32gui.GetForegroundWindow()
+            hwnd = self._foreground_key()
             
             # Obter elemento raiz
-            root = self.auto.ControlFromHandle(hwnd)
+            automation = self._uia_client()
+            root = automation.ElementFromHandleBuildCache(hwnd, self._uia_cache_request())
             if not root:
                 return []
             
-            # Função recursiva para extrair elementos
-            def extract_elements(element, depth=0):
-                if depth > 10:  # Limitar profundidade para evitar loop infinito
-                    return
-                
-                try:
-                    # Extrair informações do elemento
-                    name = element.Name
-                    control_type = element.ControlTypeName
-                    
-                    # Obter retângulo
-                    rect = element.BoundingRectangle
-                    position = (rect.left, rect.top, rect.right, rect.bottom)
-                    
-                    # Verificar se está na região de interesse
-                    if region:
-                        x1, y1, x2, y2 = region
-                        if rect.right < x1 or rect.left > x2 or rect.bottom < y1 or rect.top > y2:
-                            # Processar filhos mesmo se o pai estiver fora da região
-                            for child in element.GetChildren():
-                                extract_elements(child, depth + 1)
-                            return
-                    
-                    # Mapear tipo de elemento
-                    element_type = UIElementType.UNKNOWN
-                    if "button" in control_type.lower():
-                        element_type = UIElementType.BUTTON
-                    elif "edit" in control_type.lower():
-                        element_type = UIElementType.TEXT_FIELD
-                    elif "hyperlink" in control_type.lower():
-                        element_type = UIElementType.LINK
-                    elif "checkbox" in control_type.lower():
-                        element_type = UIElementType.CHECKBOX
-                    elif "radiobutton" in control_type.lower():
-                        element_type = UIElementType.RADIO
-                    elif "text" in control_type.lower():
-                        element_type = UIElementType.PARAGRAPH
-                    elif "image" in control_type.lower():
-                        element_type = UIElementType.IMAGE
-                    
-                    # Adicionar elemento se tiver dimensão razoável
-                    width = rect.right - rect.left
-                    height = rect.bottom - rect.top
-                    
-                    if width > 5 and height > 5:
-                        ui_element = UIElement(
-                            element_type,
-                            position,
-                            text=name,
-                            confidence=0.9,
-                            accessibility_id="html_element"
-                        )
-                        
-                        elements.append(ui_element)
-                
-                except Exception as e:
-                    logger.debug(f"Erro ao extrair informações do elemento: {e}")
-                
-                # Processar filhos
-                for child in element.GetChildren():
-                    extract_elements(child, depth + 1)
-            
-            # Iniciar processamento
-            extract_elements(root)
+            if self.tree_walker is None:
+                self.tree_walker = AccessibilityTreeWalker(
+                    self._uia_children,
+                    self._uia_bounds,
+                    self._uia_to_element
+                )
             
-            return elements
+            viewport = self.win32gui.GetWindowRect(hwnd)
+            self.tree_root_key = hwnd
+            return self.tree_walker.walk(root, hwnd, viewport=viewport, region=region)
         
         except Exception as e:
             logger.error(f"Erro ao usar uiautomation: {e}")
             return []
     
+    def _uia_children(self, element):
+        """Filhos do nó com as propriedades do pedido de cache atual (uma chamada COM por nó)"""
+        found = element.FindAllBuildCache(self.uia.TreeScope_Children, self.uia_true_condition,
+                                          self._uia_cache_request())
+        if not found:
+            return []
+        return [found.GetElement(index) for index in range(found.Length)]
+    
+    @staticmethod
+    def _uia_bounds(element):
+        rect = element.CachedBoundingRectangle
+        return (rect.left, rect.top, rect.right, rect.bottom)
+    
+    @staticmethod
+    def _uia_runtime_id(runtime_id):
+        """Identificador comum a todos os caminhos UIA (percurso, consulta por ponto e consulta em lote)"""
+        return "html:" + ".".join(str(part) for part in runtime_id)
+    
+    def _uia_to_element(self, element, position):
+        """Converte um elemento UIA obtido com pedido de cache em UIElement (None se for pequeno demais)
+        
+        Só lê propriedades em cache; nenhuma chamada COM adicional por nó.
+        """
+        if position is None:
+            return None
+        
+        # Adicionar elemento se tiver dimensão razoável
+        width = position[2] - position[0]
+        height = position[3] - position[1]
+        if width <= 5 or height <= 5:
+            return None
+        
+        try:
+            # Extrair informações do elemento
+            name = element.CachedName
+            control_type = element.CachedControlType
+        except Exception as e:
+            logger.debug(f"Erro ao extrair informações do elemento: {e}")
+            return None
+        
+        # Mapear tipo de elemento
+        element_type = self.UIA_CONTROL_TYPE_ELEMENTS.get(control_type, UIElementType.UNKNOWN)
+        
+        # Títulos não têm ControlType próprio: nível de título diferente de "nenhum"
+        if element_type in (UIElementType.PARAGRAPH, UIElementType.UNKNOWN):
+            try:
+                level = element.GetCachedPropertyValue(self.UIA_HEADING_LEVEL_PROPERTY)
+                if level and level != self.UIA_HEADING_LEVEL_NONE:
+                    element_type = UIElementType.HEADING
+            except Exception:
+                pass
+        
+        # Regiões (landmarks) também não: tipo de landmark diferente de zero
+        if element_type == UIElementType.UNKNOWN:
+            try:
+                if element.GetCachedPropertyValue(self.UIA_LANDMARK_TYPE_PROPERTY):
+                    element_type = UIElementType.REGION
+            except Exception:
+                pass
+        
+        # Identificador de execução do UIA permite casar o nó entre percursos (só quando pedido)
+        accessibility_id = "html_element"
+        if self.runtime_ids:
+            try:
+                accessibility_id = self._uia_runtime_id(element.GetCachedPropertyValue(self.uia.UIA_RuntimeIdPropertyId))
+            except Exception:
+                pass
+        
+        return UIElement(
+            element_type,
+            position,
+            text=name,
+            confidence=0.9,
+            accessibility_id=accessibility_id
+        )
+    
     def get_focused_html_element(self):
         """Obtém o elemento HTML atualmente em foco"""
         browser = self.detect_browser()
@@ -371,20 +1325,1199 @@ class HTMLAccessibilityManager:
             
         return None
 
-class AccessibilityManager:
-    """Gerencia a integração com APIs de acessibilidade do sistema operacional"""
+class AccessibilityTreeWalker:
+    """Percorre árvores de acessibilidade em largura com orçamento de tempo e de nós por chamada
     
-    def __init__(self):
-        self.platform = sys.platform
-        logger.info(f"Inicializando gerenciador de acessibilidade para plataforma: {self.platform}")
+    Independente de backend: `get_children(no)`, `get_bounds(no)` e `make_element(no, limites)`
+    adaptam UIA, AT-SPI ou outra fonte. Subárvores fora da área visível (`viewport`) são podadas e
+    nós que cruzam a região de interesse são expandidos antes dos demais. Quando o orçamento
+    acaba, a fronteira é guardada por raiz e a próxima chamada continua de onde parou; os elementos
+    já encontrados são retornados imediatamente.
+    
+    `max_age` conta a partir do último avanço (percurso em andamento) ou do fim da passagem
+    (percurso completo), para que árvores grandes, que levam várias chamadas, cheguem ao fim.
+    """
+    
+    def __init__(self, get_children, get_bounds, make_element, time_budget=0.05, node_budget=400,
+                 max_depth=10, max_age=1.0, max_sessions=4):
+        self.get_children = get_children
+        self.get_bounds = get_bounds
+        self.make_element = make_element
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.max_depth = max_depth
+        self.max_age = max_age
+        self.max_sessions = max_sessions
         
-        # Importa as bibliotecas específicas da plataforma apenas quando necessário
-        if self.platform == 'win32':
-            try:
-                import pywinauto
-                import comtypes.client
-                import win32gui
-                import win32con
+        self.sessions = OrderedDict()  # chave da raiz -> estado do percurso
+    
+    @staticmethod
+    def intersects(bounds, rect):
+        return not (bounds[2] < rect[0] or bounds[0] > rect[2] or bounds[3] < rect[1] or bounds[1] > rect[3])
+    
+    @staticmethod
+    def is_empty(bounds):
+        """Limites ausentes ou vazios (contêineres sem geometria própria) não permitem poda"""
+        return bounds is None or bounds[2] <= bounds[0] or bounds[3] <= bounds[1]
+    
+    def _new_session(self, root):
+        bounds = self.get_bounds(root)
+        session = {
+            'near': deque([(root, bounds, 0, -1)]),
+            'far': deque(),
+            'elements': [],
+            'parents': [],  # índice do elemento ancestral mais próximo (-1 na raiz)
+            'region': None,
+            'started': time.time(),
+            'updated': time.time(),  # último avanço, ou fim da passagem quando completo
+            'nodes': 1,
+            'complete': False,
+        }
+        element = self.make_element(root, bounds)
+        if element:
+            session['elements'].append(element)
+            session['parents'].append(-1)
+            session['near'][0] = (root, bounds, 0, 0)
+        return session
+    
+    def _is_near(self, bounds, region):
+        return region is None or self.is_empty(bounds) or self.intersects(bounds, region)
+    
+    def _repartition(self, session, region):
+        """Reclassifica a fronteira pendente quando a região de interesse muda"""
+        pending = list(session['near']) + list(session['far'])
+        session['near'] = deque(entry for entry in pending if self._is_near(entry[1], region))
+        session['far'] = deque(entry for entry in pending if not self._is_near(entry[1], region))
+        session['region'] = region
+    
+    def walk(self, root, root_key, viewport=None, region=None):
+        """Avança o percurso de `root` dentro do orçamento e retorna os elementos já encontrados
+        
+        Retorna os elementos que cruzam `region` (todos, se `region` for None).
+        """
+        session = self.sessions.get(root_key)
+        if session is None or time.time() - session['updated'] > self.max_age:
+            session = self._new_session(root)
+            self.sessions[root_key] = session
+        self.sessions.move_to_end(root_key)
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        
+        if session['region'] != region:
+            self._repartition(session, region)
+        
+        deadline = time.time() + self.time_budget
+        visited = 0
+        near, far = session['near'], session['far']
+        
+        while (near or far) and visited < self.node_budget and time.time() < deadline:
+            node, _, depth, parent_index = near.popleft() if near else far.popleft()
+            if depth >= self.max_depth:
+                continue
+            
+            try:
+                children = self.get_children(node)
+            except Exception as e:
+                logger.debug(f"Erro ao obter filhos na árvore de acessibilidade: {e}")
+                continue
+            
+            for child in children:
+                visited += 1
+                try:
+                    bounds = self.get_bounds(child)
+                except Exception:
+                    bounds = None
+                
+                # Fora da área visível: a subárvore inteira é descartada
+                if viewport and not self.is_empty(bounds) and not self.intersects(bounds, viewport):
+                    continue
+                
+                element = self.make_element(child, bounds)
+                child_index = parent_index
+                if element:
+                    child_index = len(session['elements'])
+                    session['elements'].append(element)
+                    session['parents'].append(parent_index)
+                
+                entry = (child, bounds, depth + 1, child_index)
+                (near if self._is_near(bounds, region) else far).append(entry)
+        
+        session['nodes'] += visited
+        if visited or not session['complete']:
+            session['updated'] = time.time()
+        session['complete'] = not near and not far
+        
+        if region is None:
+            return list(session['elements'])
+        return [elem for elem in session['elements'] if self.intersects(elem.position, region)]
+    
+    def is_complete(self, root_key):
+        session = self.sessions.get(root_key)
+        return bool(session and session['complete'])
+    
+    def get_parents(self, root_key):
+        """Índices dos pais, alinhados aos elementos retornados por `walk` sem região"""
+        session = self.sessions.get(root_key)
+        return list(session['parents']) if session else []
+    
+    def invalidate(self, root_key=None):
+        if root_key is None:
+            self.sessions.clear()
+        else:
+            self.sessions.pop(root_key, None)
+
+class AccessibilityTreeDiffer:
+    """Compara retratos sucessivos da árvore de acessibilidade e emite eventos de mudança
+    
+    Os nós são casados pelo identificador de execução (runtime id) quando existe e, nos demais,
+    por papel + nome + limites, depois papel + nome (movido) e papel + limites (renomeado).
+    Cada etapa usa dicionários, mantendo o custo linear no número de nós.
+    Eventos: ('inserted', novo, None), ('removed', None, antigo),
+    ('renamed', novo, antigo) e ('moved', novo, antigo).
+    """
+    
+    GENERIC_IDS = (None, "", "html_element", "html_focused")
+    
+    def __init__(self, max_trees=8):
+        self.previous = OrderedDict()  # chave da árvore -> lista de elementos
+        self.max_trees = max_trees
+    
+    @staticmethod
+    def _match(old_pending, new_pending, key_function):
+        """Casa elementos pendentes com a mesma chave; retorna os pares e remove-os das pendências"""
+        index = {}
+        for position, elem in old_pending.items():
+            index.setdefault(key_function(elem), []).append(position)
+        
+        pairs = []
+        for position, elem in list(new_pending.items()):
+            candidates = index.get(key_function(elem))
+            if candidates:
+                old_position = candidates.pop(0)
+                pairs.append((old_pending.pop(old_position), new_pending.pop(position)))
+        return pairs
+    
+    def diff(self, old_elements, new_elements):
+        """Lista de eventos que transformam `old_elements` em `new_elements`"""
+        old_pending = dict(enumerate(old_elements))
+        new_pending = dict(enumerate(new_elements))
+        events = []
+        
+        def stable_id(elem):
+            return elem.accessibility_id if elem.accessibility_id not in self.GENERIC_IDS else id(elem)
+        
+        # 1) Identificador de execução: pode ter mudado nome e posição ao mesmo tempo
+        for old, new in self._match(old_pending, new_pending, stable_id):
+            if old.text != new.text:
+                events.append(('renamed', new, old))
+            if tuple(old.position) != tuple(new.position):
+                events.append(('moved', new, old))
+        
+        # 2) Mesmo papel, nome e limites: inalterado
+        self._match(old_pending, new_pending, lambda e: (e.element_type, e.text, tuple(e.position)))
+        
+        # 3) Mesmo papel e nome em outro lugar: movido
+        for old, new in self._match(old_pending, new_pending, lambda e: (e.element_type, e.text)):
+            events.append(('moved', new, old))
+        
+        # 4) Mesmo papel e limites com outro nome: renomeado
+        for old, new in self._match(old_pending, new_pending, lambda e: (e.element_type, tuple(e.position))):
+            events.append(('renamed', new, old))
+        
+        events.extend(('removed', None, old) for old in old_pending.values())
+        events.extend(('inserted', new, None) for new in new_pending.values())
+        return events
+    
+    def update(self, tree_key, elements):
+        """Compara com o retrato anterior da mesma árvore e guarda o novo; a primeira vez não gera eventos"""
+        previous = self.previous.get(tree_key)
+        self.previous[tree_key] = list(elements)
+        self.previous.move_to_end(tree_key)
+        while len(self.previous) > self.max_trees:
+            self.previous.popitem(last=False)
+        
+        if previous is None:
+            return []
+        return self.diff(previous, elements)
+
+class AccessibilitySnapshot:
+    """Retrato colunar de uma árvore de acessibilidade para consultas vetorizadas
+    
+    Limites, papel, deslocamentos de nome e índice do pai ficam em arrays NumPy; consultas por
+    retângulo, por papel e contagens por papel são máscaras sobre esses arrays, sem percorrer
+    objetos UIElement nem remapear `element_type` a cada consulta.
+    """
+    
+    ROLES = ('unknown', 'button', 'link', 'textbox', 'checkbox', 'radio', 'combobox',
+             'heading', 'image', 'text', 'table', 'region')
+    ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+    # Papéis de navegação guardados sob um papel comum (os backends não distinguem o tipo de região)
+    ROLE_ALIASES = {'landmark': 'region', 'main': 'region', 'navigation': 'region'}
+    ELEMENT_ROLES = {
+        UIElementType.BUTTON: 'button',
+        UIElementType.LINK: 'link',
+        UIElementType.TEXT_FIELD: 'textbox',
+        UIElementType.CHECKBOX: 'checkbox',
+        UIElementType.RADIO: 'radio',
+        UIElementType.DROPDOWN: 'combobox',
+        UIElementType.HEADING: 'heading',
+        UIElementType.IMAGE: 'image',
+        UIElementType.PARAGRAPH: 'text',
+        UIElementType.TABLE: 'table',
+        UIElementType.REGION: 'region',
+    }
+    
+    def __init__(self, elements, parents=None):
+        count = len(elements)
+        self.elements = list(elements)
+        
+        self.bounds = np.array([elem.position for elem in elements], dtype=np.int32).reshape(count, 4)
+        self.roles = np.fromiter(
+            (self.ROLE_CODES[self.ELEMENT_ROLES.get(elem.element_type, 'unknown')] for elem in elements),
+            dtype=np.int16, count=count
+        )
+        self.parents = (np.asarray(parents, dtype=np.int32) if parents is not None
+                        else np.full(count, -1, dtype=np.int32))
+        
+        # Nomes concatenados em um único texto; o nome i fica em names[offsets[i]:offsets[i + 1]]
+        names = [elem.text or "" for elem in elements]
+        self.names = "".join(names)
+        self.name_offsets = np.zeros(count + 1, dtype=np.int32)
+        if count:
+            np.cumsum([len(name) for name in names], out=self.name_offsets[1:])
+        
+        self._spatial_index = None
+    
+    def __len__(self):
+        return len(self.elements)
+    
+    def name(self, index):
+        return self.names[self.name_offsets[index]:self.name_offsets[index + 1]]
+    
+    def role(self, index):
+        return self.ROLES[self.roles[index]]
+    
+    def role_mask(self, roles):
+        """Máscara dos elementos cujo papel está em `roles` (texto ou lista)
+        
+        Papéis desconhecidos geram ValueError em vez de uma máscara vazia silenciosa.
+        """
+        if isinstance(roles, str):
+            roles = [roles]
+        codes = []
+        for role in roles:
+            role = self.ROLE_ALIASES.get(role, role)
+            if role not in self.ROLE_CODES:
+                raise ValueError(f"Papel não suportado no retrato de acessibilidade: {role}")
+            codes.append(self.ROLE_CODES[role])
+        return np.isin(self.roles, codes)
+    
+    def rect_mask(self, rect):
+        """Máscara dos elementos que cruzam o retângulo (x1, y1, x2, y2)"""
+        b = self.bounds
+        return ~((b[:, 2] < rect[0]) | (b[:, 0] > rect[2]) | (b[:, 3] < rect[1]) | (b[:, 1] > rect[3]))
+    
+    def point_mask(self, x, y):
+        b = self.bounds
+        return (b[:, 0] <= x) & (x <= b[:, 2]) & (b[:, 1] <= y) & (y <= b[:, 3])
+    
+    def select(self, mask):
+        return [self.elements[i] for i in np.flatnonzero(mask)]
+    
+    def intersecting(self, rect):
+        return self.select(self.rect_mask(rect))
+    
+    def with_role(self, roles):
+        return self.select(self.role_mask(roles))
+    
+    def count_by_role(self):
+        """Dicionário papel -> quantidade de elementos"""
+        counts = np.bincount(self.roles, minlength=len(self.ROLES))
+        return {role: int(counts[code]) for code, role in enumerate(self.ROLES)}
+    
+    def spatial_index(self):
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(self.bounds)
+        return self._spatial_index
+    
+    def at_point(self, x, y):
+        """Elemento mais interno que contém o ponto ou, se nenhum, o mais próximo"""
+        index = self.spatial_index().hit_test(x, y)
+        return None if index is None else self.elements[index]
+    
+    def nearest(self, x, y, k=1):
+        """Os k elementos mais próximos do ponto"""
+        return [self.elements[i] for i in self.spatial_index().nearest(x, y, k)]
+
+class AccessibilityRoleIndex:
+    """Índices por categoria de navegação (títulos, links, regiões, formulários, tabelas, imagens)
+    
+    Cada categoria guarda seus elementos em uma lista ordenada pela ordem de leitura (topo, esquerda)
+    e, para cada elemento, a sua chave de ordem. Localizar um elemento é uma busca binária, e os
+    eventos do AccessibilityTreeDiffer inserem e removem por bisect sem reconstruir posições.
+    """
+    
+    CATEGORIES = {
+        'headings': ('heading',),
+        'links': ('link',),
+        'regions': ('region', 'landmark', 'main', 'navigation'),
+        'forms': ('textbox', 'button', 'checkbox', 'radio', 'combobox'),
+        'tables': ('table',),
+        'images': ('image',),
+    }
+    
+    # Categoria de elementos inseridos, deduzida do tipo
+    INSERT_CATEGORIES = {
+        UIElementType.HEADING: 'headings',
+        UIElementType.LINK: 'links',
+        UIElementType.TEXT_FIELD: 'forms',
+        UIElementType.BUTTON: 'forms',
+        UIElementType.CHECKBOX: 'forms',
+        UIElementType.RADIO: 'forms',
+        UIElementType.DROPDOWN: 'forms',
+        UIElementType.IMAGE: 'images',
+        UIElementType.TABLE: 'tables',
+        UIElementType.REGION: 'regions',
+    }
+    
+    def __init__(self):
+        self.key = None
+        self.id_scheme = None
+        self.elements = {category: [] for category in self.CATEGORIES}
+        self.order_keys = {category: [] for category in self.CATEGORIES}
+        self.locations = {category: {} for category in self.CATEGORIES}  # chave do elemento -> chave de ordem
+        self.type_counts = {}  # (categoria, tipo do elemento) -> quantidade
+    
+    @staticmethod
+    def order_key(element):
+        return (element.position[1], element.position[0])
+    
+    @staticmethod
+    def element_key(element):
+        """Identidade do elemento entre fontes diferentes (consulta em lote x percurso da árvore)"""
+        if element.accessibility_id not in AccessibilityTreeDiffer.GENERIC_IDS:
+            return element.accessibility_id
+        return (element.element_type, element.text, tuple(element.position))
+    
+    @staticmethod
+    def id_scheme_of(element):
+        """Origem do identificador ('html' para UIA, 'atspi', 'cdp'), ou None se for genérico"""
+        accessibility_id = element.accessibility_id
+        if accessibility_id in AccessibilityTreeDiffer.GENERIC_IDS or ':' not in accessibility_id:
+            return None
+        return accessibility_id.split(':', 1)[0]
+    
+    def build(self, key, query):
+        """Reconstrói todos os índices com `query(papéis)` (consulta em lote do backend)"""
+        self.key = key
+        self.id_scheme = None
+        self.type_counts = {}
+        for category, roles in self.CATEGORIES.items():
+            found = query(list(roles)) or []
+            unique = list({self.element_key(elem): elem for elem in found}.values())
+            unique.sort(key=self.order_key)
+            self.elements[category] = unique
+            self.order_keys[category] = [self.order_key(elem) for elem in unique]
+            self.locations[category] = {self.element_key(elem): self.order_key(elem) for elem in unique}
+            for elem in unique:
+                type_key = (category, elem.element_type)
+                self.type_counts[type_key] = self.type_counts.get(type_key, 0) + 1
+                self.id_scheme = self.id_scheme or self.id_scheme_of(elem)
+        logger.debug(f"Índices de navegação reconstruídos: {self.counts()}")
+    
+    def _index_of(self, category, element_key):
+        """Posição do elemento na categoria por busca binária na chave de ordem guardada (None se ausente)"""
+        order = self.locations[category].get(element_key)
+        if order is None:
+            return None
+        keys = self.order_keys[category]
+        elements = self.elements[category]
+        index = bisect.bisect_left(keys, order)
+        while index < len(keys) and keys[index] == order:
+            if self.element_key(elements[index]) == element_key:
+                return index
+            index += 1
+        return None
+    
+    def _insert(self, category, element):
+        self._remove(category, element)  # Evitar duplicatas de um elemento já indexado
+        key = self.order_key(element)
+        index = bisect.bisect_right(self.order_keys[category], key)
+        self.order_keys[category].insert(index, key)
+        self.elements[category].insert(index, element)
+        self.locations[category][self.element_key(element)] = key
+        type_key = (category, element.element_type)
+        self.type_counts[type_key] = self.type_counts.get(type_key, 0) + 1
+    
+    def _remove(self, category, element):
+        element_key = self.element_key(element)
+        index = self._index_of(category, element_key)
+        if index is None:
+            return False
+        removed = self.elements[category].pop(index)
+        del self.order_keys[category][index]
+        del self.locations[category][element_key]
+        type_key = (category, removed.element_type)
+        self.type_counts[type_key] = self.type_counts.get(type_key, 1) - 1
+        return True
+    
+    def apply_events(self, events):
+        """Atualiza os índices com eventos ('inserted' | 'removed' | 'renamed' | 'moved', novo, antigo)
+        
+        Eventos com identificadores de outra origem (por exemplo, índice montado pelo CDP e eventos do
+        percurso UIA) não podem ser casados; nesse caso o índice é marcado para reconstrução.
+        """
+        for event_type, new, old in events:
+            scheme = self.id_scheme_of(new if new is not None else old)
+            if self.id_scheme and scheme and scheme != self.id_scheme:
+                self.key = None
+                return
+        
+        for event_type, new, old in events:
+            if event_type == 'inserted':
+                category = self.INSERT_CATEGORIES.get(new.element_type)
+                if category:
+                    self._insert(category, new)
+                continue
+            
+            for category in self.CATEGORIES:
+                if self._remove(category, old) and event_type != 'removed':
+                    self._insert(category, new)
+            
+            # Elemento que mudou para um tipo indexado (ex.: passou a ser título)
+            if event_type != 'removed':
+                category = self.INSERT_CATEGORIES.get(new.element_type)
+                if category and self._index_of(category, self.element_key(new)) is None:
+                    self._insert(category, new)
+    
+    def get(self, category):
+        return self.elements.get(category, [])
+    
+    def count(self, category, element_type=None):
+        if element_type is None:
+            return len(self.elements.get(category, []))
+        return self.type_counts.get((category, element_type), 0)
+    
+    def counts(self):
+        return {category: len(elements) for category, elements in self.elements.items()}
+    
+    def neighbor(self, category, element, direction=1):
+        """Índice do próximo (direction=1) ou anterior (-1) elemento da categoria a partir de `element`"""
+        elements = self.elements.get(category, [])
+        if not elements:
+            return None
+        
+        index = self._index_of(category, self.element_key(element)) if element is not None else None
+        if index is not None:
+            return (index + direction) % len(elements)
+        if element is None:
+            return 0 if direction > 0 else len(elements) - 1
+        
+        # Elemento fora da categoria: continuar a partir da sua posição na leitura
+        key = self.order_key(element)
+        if direction > 0:
+            return bisect.bisect_right(self.order_keys[category], key) % len(elements)
+        return (bisect.bisect_left(self.order_keys[category], key) - 1) % len(elements)
+
+class CDPReplayTransport:
+    """Transporte CDP que responde com mensagens gravadas, para testar o backend sem navegador
+    
+    A gravação é um JSON {"responses": {método: resultado}, "events": [mensagens]}: cada comando
+    recebe o resultado gravado para o seu método e os eventos são entregues após a primeira resposta.
+    `emit` entrega um evento a qualquer momento; ele é processado antes da resposta do próximo comando.
+    Substitui um servidor de reprodução: veja `testar_cdp_gravado`.
+    """
+    
+    def __init__(self, recording):
+        if isinstance(recording, str):
+            with open(recording, 'r', encoding='utf-8') as f:
+                recording = json.load(f)
+        self.responses = recording.get('responses', {})
+        self.events = list(recording.get('events', []))
+        self.outbox = queue.Queue()
+        self.sent = []
+    
+    def send(self, message):
+        request = json.loads(message)
+        self.sent.append(request)
+        result = self.responses.get(request['method'], {})
+        self.outbox.put(json.dumps({'id': request['id'], 'result': result}))
+        while self.events:
+            self.outbox.put(json.dumps(self.events.pop(0)))
+    
+    def emit(self, message):
+        self.outbox.put(json.dumps(message))
+    
+    def recv(self):
+        return self.outbox.get()
+    
+    def close(self):
+        self.outbox.put(None)
+
+
+class CDPAccessibilityBackend:
+    """Backend de acessibilidade via Chrome DevTools Protocol para navegadores Chromium
+    
+    Mantém um websocket persistente com a aba ativa (o navegador precisa ser iniciado com
+    --remote-debugging-port) e obtém a árvore inteira com uma chamada Accessibility.getFullAXTree,
+    junto com os retângulos de layout de DOMSnapshot.captureSnapshot. Eventos
+    Accessibility.nodesUpdated atualizam nós no lugar e inserem os que ainda não existiam (nós sem
+    layout conhecido marcam a árvore como alterada); navegação marca a árvore para nova busca na
+    próxima consulta. Mutações do DOM (contadas por um MutationObserver injetado, que ignora atributos
+    de apresentação como class e style) também marcam a árvore, mas a nova busca espera
+    `refetch_interval` desde a anterior, para que páginas animadas não refaçam a busca a cada consulta.
+    
+    A conexão fica presa à aba escolhida (pelo id do alvo) enquanto a janela do navegador for a mesma e
+    a página continuar visível; mudanças de título não reconectam. Sem aba correspondente ou sem
+    depurador escutando, novas tentativas esperam um intervalo que dobra a cada falha.
+    """
+    
+    ROLE_ELEMENTS = {
+        'button': UIElementType.BUTTON,
+        'link': UIElementType.LINK,
+        'textbox': UIElementType.TEXT_FIELD,
+        'searchbox': UIElementType.TEXT_FIELD,
+        'checkbox': UIElementType.CHECKBOX,
+        'switch': UIElementType.CHECKBOX,
+        'radio': UIElementType.RADIO,
+        'combobox': UIElementType.DROPDOWN,
+        'listbox': UIElementType.DROPDOWN,
+        'heading': UIElementType.HEADING,
+        'img': UIElementType.IMAGE,
+        'image': UIElementType.IMAGE,
+        'paragraph': UIElementType.PARAGRAPH,
+        'StaticText': UIElementType.PARAGRAPH,
+        'table': UIElementType.TABLE,
+        'grid': UIElementType.TABLE,
+        'region': UIElementType.REGION,
+        'banner': UIElementType.REGION,
+        'complementary': UIElementType.REGION,
+        'contentinfo': UIElementType.REGION,
+        'form': UIElementType.REGION,
+        'main': UIElementType.REGION,
+        'navigation': UIElementType.REGION,
+        'search': UIElementType.REGION,
+    }
+    
+    # Papéis de navegação -> papéis ARIA/Chromium
+    QUERY_ROLES = {
+        'heading': ('heading',),
+        'link': ('link',),
+        'button': ('button',),
+        'textbox': ('textbox', 'searchbox'),
+        'checkbox': ('checkbox', 'switch'),
+        'radio': ('radio',),
+        'combobox': ('combobox', 'listbox'),
+        'table': ('table', 'grid'),
+        'image': ('img', 'image'),
+        'region': ('region',),
+        'landmark': ('banner', 'complementary', 'contentinfo', 'form', 'main', 'navigation', 'region', 'search'),
+        'main': ('main',),
+        'navigation': ('navigation',),
+    }
+    
+    # Atributos que mudam a árvore de acessibilidade; os demais (class, style) mudam a cada quadro de animação
+    MUTATION_SCRIPT = (
+        "if (!window.__screenReaderMutations) { window.__screenReaderMutations = 1;"
+        " new MutationObserver(() => window.__screenReaderMutations++)"
+        ".observe(document, {subtree: true, childList: true, characterData: true,"
+        " attributeFilter: ['role', 'hidden', 'alt', 'title', 'disabled', 'aria-label', 'aria-hidden',"
+        " 'aria-expanded', 'aria-checked', 'aria-selected']}); }"
+    )
+    STATE_SCRIPT = (
+        "JSON.stringify([window.__screenReaderMutations || 0, window.scrollX, window.scrollY,"
+        " window.screenX, window.screenY, window.outerWidth - window.innerWidth,"
+        " window.outerHeight - window.innerHeight, window.devicePixelRatio,"
+        " document.visibilityState === 'visible'])"
+    )
+    
+    def __init__(self, host='127.0.0.1', port=9222, transport_factory=None, timeout=2.0, state_interval=0.1,
+                 refetch_interval=0.5, retry_interval=1.0, max_retry_interval=30.0):
+        self.host = host
+        self.port = port
+        self.transport_factory = transport_factory
+        self.timeout = timeout
+        self.state_interval = state_interval
+        self.refetch_interval = refetch_interval
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        
+        self.transport = None
+        self.target_id = None      # id do alvo CDP (aba) conectado
+        self.target_window = None  # janela do navegador em que a aba estava visível
+        self.retry_delay = retry_interval
+        self.retry_at = 0.0        # próxima tentativa de conexão após uma falha
+        self.message_id = 0
+        self.pending = {}  # id -> [evento, resposta]
+        self.pending_lock = threading.Lock()  # a thread leitora retira respostas de `pending`
+        self.send_lock = threading.Lock()
+        self.tree_lock = threading.Lock()
+        
+        self.nodes = {}            # nodeId -> nó AX
+        self.layout = {}           # backendNodeId -> (x, y, largura, altura) em coordenadas do documento
+        self.dirty = True
+        self.mutated = False       # DOM mudou desde a última busca (nova busca limitada por refetch_interval)
+        self.last_fetch_time = 0.0
+        self.mutation_count = None
+        self.page_state = None
+        self.page_state_time = 0.0
+        self.stats = {'full_fetches': 0, 'incremental_updates': 0, 'queries': 0}
+    
+    @staticmethod
+    def select_target(targets, window_title):
+        """Aba cujo título aparece no título da janela (o mais longo), a única aba aberta, ou None
+        
+        Com várias abas e nenhum título correspondente não há como saber qual está visível, então
+        nenhuma é escolhida em vez de ler uma aba sem relação com a janela.
+        """
+        pages = [t for t in targets if t.get('type') == 'page']
+        matches = [t for t in pages if t.get('title') and t['title'] in (window_title or "")]
+        if matches:
+            return max(matches, key=lambda t: len(t['title']))
+        if len(pages) == 1:
+            return pages[0]
+        return None
+    
+    def _open_transport(self, window_title):
+        """Abre o websocket da aba correspondente à janela; retorna (transporte, id do alvo) ou (None, None)"""
+        if self.transport_factory:
+            return self.transport_factory(), None
+        
+        import urllib.request
+        import websocket
+        
+        with urllib.request.urlopen(f"http://{self.host}:{self.port}/json", timeout=self.timeout) as response:
+            targets = json.loads(response.read().decode('utf-8'))
+        
+        target = self.select_target(targets, window_title)
+        if target is None:
+            logger.debug(f"Nenhuma aba CDP corresponde à janela '{window_title}'")
+            return None, None
+        return websocket.create_connection(target['webSocketDebuggerUrl'], timeout=None,
+                                           suppress_origin=True), target.get('id')
+    
+    def _tab_hidden(self):
+        """Indica se a aba conectada deixou de ser a visível (troca de aba) ou não responde mais"""
+        try:
+            return not self._refresh_state()[8]
+        except Exception:
+            return True
+    
+    def ensure_connected(self, window_key=None, window_title=None):
+        """Conecta (ou reconecta ao trocar de janela ou de aba) e retorna se o backend está utilizável"""
+        if self.transport is not None:
+            if window_key == self.target_window and not self._tab_hidden():
+                return True
+            self.close()
+        
+        # Depurador ausente ou nenhuma aba correspondente: não repetir a cada consulta
+        if time.time() < self.retry_at:
+            return False
+        
+        try:
+            self.transport, self.target_id = self._open_transport(window_title)
+            if self.transport is None:
+                self._schedule_retry()
+                return False
+            self.target_window = window_key
+            self.page_state = None
+            self.mutation_count = None
+            threading.Thread(target=self._reader_loop, args=(self.transport,), name="CDPReader",
+                             daemon=True).start()
+            
+            self.call('Page.enable')
+            self.call('Accessibility.enable')
+            self.call('Page.addScriptToEvaluateOnNewDocument', {'source': self.MUTATION_SCRIPT})
+            self.call('Runtime.evaluate', {'expression': self.MUTATION_SCRIPT})
+            self.dirty = True
+            self.retry_delay = self.retry_interval
+            self.retry_at = 0.0
+            logger.info(f"Backend CDP de acessibilidade conectado à aba {self.target_id}")
+            return True
+        except Exception as e:
+            logger.debug(f"Backend CDP indisponível: {e}")
+            self.close()
+            self._schedule_retry()
+            return False
+    
+    def _schedule_retry(self):
+        self.retry_at = time.time() + self.retry_delay
+        self.retry_delay = min(self.retry_delay * 2, self.max_retry_interval)
+    
+    def close(self):
+        transport, self.transport = self.transport, None
+        if transport is not None:
+            try:
+                transport.close()
+            except Exception:
+                pass
+        with self.pending_lock:
+            waiters = list(self.pending.values())
+            self.pending.clear()
+        for waiter in waiters:
+            waiter[0].set()
+    
+    def call(self, method, params=None):
+        """Envia um comando CDP e aguarda a resposta"""
+        transport = self.transport
+        if transport is None:
+            raise ConnectionError("CDP desconectado")
+        
+        with self.send_lock:
+            self.message_id += 1
+            message_id = self.message_id
+            waiter = [threading.Event(), None]
+            with self.pending_lock:
+                self.pending[message_id] = waiter
+            transport.send(json.dumps({'id': message_id, 'method': method, 'params': params or {}}))
+        
+        if not waiter[0].wait(self.timeout) or waiter[1] is None:
+            with self.pending_lock:
+                self.pending.pop(message_id, None)
+            raise TimeoutError(f"Sem resposta CDP para {method}")
+        if 'error' in waiter[1]:
+            raise RuntimeError(f"Erro CDP em {method}: {waiter[1]['error']}")
+        return waiter[1].get('result', {})
+    
+    def _reader_loop(self, transport):
+        while self.transport is transport:
+            try:
+                raw = transport.recv()
+                if raw is None:
+                    break
+                message = json.loads(raw)
+            except Exception as e:
+                if self.transport is transport:
+                    logger.debug(f"Conexão CDP encerrada: {e}")
+                    self.transport = None
+                break
+            
+            if 'id' in message:
+                with self.pending_lock:
+                    waiter = self.pending.pop(message['id'], None)
+                if waiter:
+                    waiter[1] = message
+                    waiter[0].set()
+            elif 'method' in message:
+                self._handle_event(message['method'], message.get('params', {}))
+    
+    def _handle_event(self, method, params):
+        if method == 'Accessibility.nodesUpdated':
+            with self.tree_lock:
+                for node in params.get('nodes', []):
+                    if node.get('nodeId') is None:
+                        continue
+                    if node['nodeId'] not in self.nodes and node.get('backendDOMNodeId') not in self.layout:
+                        # Nó novo sem retângulo: o layout precisa ser buscado de novo
+                        self.mutated = True
+                    self.nodes[node['nodeId']] = node
+                self.stats['incremental_updates'] += 1
+        elif method in ('Accessibility.loadComplete', 'Page.frameNavigated', 'Page.loadEventFired'):
+            self.dirty = True
+    
+    def _refresh_state(self):
+        """Lê contador de mutações, rolagem e geometria da janela (no máximo a cada state_interval)"""
+        now = time.time()
+        if self.page_state is not None and now - self.page_state_time < self.state_interval:
+            return self.page_state
+        
+        result = self.call('Runtime.evaluate', {'expression': self.STATE_SCRIPT, 'returnByValue': True})
+        state = json.loads(result['result']['value'])
+        if self.mutation_count is not None and state[0] != self.mutation_count:
+            self.mutated = True
+        self.mutation_count = state[0]
+        self.page_state = state
+        self.page_state_time = now
+        return state
+    
+    def _fetch_full(self):
+        """Busca a árvore AX inteira e o layout em uma única passagem"""
+        tree = self.call('Accessibility.getFullAXTree')
+        snapshot = self.call('DOMSnapshot.captureSnapshot', {'computedStyles': []})
+        
+        layout = {}
+        for document in snapshot.get('documents', [])[:1]:
+            backend_ids = document['nodes'].get('backendNodeId', [])
+            for node_index, bounds in zip(document['layout']['nodeIndex'], document['layout']['bounds']):
+                layout[backend_ids[node_index]] = bounds
+        
+        with self.tree_lock:
+            self.nodes = {node['nodeId']: node for node in tree.get('nodes', [])}
+            self.layout = layout
+        self.dirty = False
+        self.mutated = False
+        self.last_fetch_time = time.time()
+        self.stats['full_fetches'] += 1
+    
+    def _collect(self, role_filter=None, region=None):
+        state = self._refresh_state()
+        if self.dirty or (self.mutated and time.time() - self.last_fetch_time >= self.refetch_interval):
+            self._fetch_full()
+        
+        _, scroll_x, scroll_y, screen_x, screen_y, chrome_width, chrome_height, scale, _ = state
+        origin_x = screen_x + chrome_width / 2
+        origin_y = screen_y + chrome_height - chrome_width / 2
+        
+        elements = []
+        with self.tree_lock:
+            for node in self.nodes.values():
+                if node.get('ignored'):
+                    continue
+                role = node.get('role', {}).get('value', '')
+                if role_filter is not None and role not in role_filter:
+                    continue
+                bounds = self.layout.get(node.get('backendDOMNodeId'))
+                if not bounds or bounds[2] <= 5 or bounds[3] <= 5:
+                    continue
+                
+                x1 = int((origin_x + bounds[0] - scroll_x) * scale)
+                y1 = int((origin_y + bounds[1] - scroll_y) * scale)
+                position = (x1, y1, x1 + int(bounds[2] * scale), y1 + int(bounds[3] * scale))
+                if region and (position[2] < region[0] or position[0] > region[2] or
+                               position[3] < region[1] or position[1] > region[3]):
+                    continue
+                
+                elements.append(UIElement(
+                    self.ROLE_ELEMENTS.get(role, UIElementType.UNKNOWN),
+                    position,
+                    text=node.get('name', {}).get('value', ''),
+                    confidence=0.9,
+                    accessibility_id=f"cdp:{node.get('backendDOMNodeId')}"
+                ))
+        
+        self.stats['queries'] += 1
+        return elements
+    
+    def get_elements(self, region=None):
+        """Elementos da página em coordenadas de tela, opcionalmente limitados à região"""
+        return self._collect(region=region)
+    
+    def find_by_role(self, roles):
+        """Elementos com os papéis de navegação pedidos, filtrados na árvore em memória"""
+        role_filter = set()
+        for role in roles:
+            role_filter.update(self.QUERY_ROLES.get(role, (role,)))
+        return self._collect(role_filter=role_filter)
+
+class ATSPITreeCache:
+    """Espelho em memória da árvore AT-SPI mantido por eventos (Linux)
+    
+    Em vez de percorrer `Registry.getDesktop(0)` via D-Bus a cada consulta, o cache carrega uma vez
+    aplicações e janelas de nível superior e depois se mantém atualizado pelos eventos de foco,
+    ativação, filhos adicionados/removidos, limites e nome. Subárvores de janelas são espelhadas
+    sob demanda e descartadas quando um evento de filhos as invalida.
+    
+    `atspi` é o módulo pyatspi ou um provedor falso com a mesma interface (Registry.getDesktop,
+    Registry.registerEventListener, Registry.start/stop, STATE_ACTIVE, STATE_FOCUSED, DESKTOP_COORDS),
+    o que permite testar o cache sem um barramento de acessibilidade.
+    """
+    
+    EVENT_TYPES = (
+        'focus:',
+        'window:activate',
+        'window:deactivate',
+        'object:state-changed:focused',
+        'object:state-changed:active',
+        'object:children-changed',
+        'object:bounds-changed',
+        'object:property-change:accessible-name',
+    )
+    
+    def __init__(self, atspi, max_subtree_depth=8):
+        self.atspi = atspi
+        self.max_subtree_depth = max_subtree_depth
+        
+        self.lock = threading.RLock()
+        self.nodes = {}           # objeto acessível -> dados espelhados
+        self.applications = []    # objetos das aplicações na ordem do desktop
+        self.active_window = None
+        self.focused = None
+        self.subtrees = set()     # raízes com subárvore completa espelhada
+        
+        self.ready = False
+        self.listening = False
+        self.stats = {'queries': 0, 'events': 0, 'resyncs': 0}
+    
+    def start(self, run_event_loop=True):
+        """Carrega o espelho inicial e registra os eventos
+        
+        Com `run_event_loop=False` os eventos devem ser entregues por `handle_event` (testes).
+        """
+        self.resync()
+        try:
+            self.atspi.Registry.registerEventListener(self.handle_event, *self.EVENT_TYPES)
+            self.listening = True
+            if run_event_loop:
+                threading.Thread(target=self._run_registry, name="ATSPIEvents", daemon=True).start()
+            logger.info("Cache de eventos AT-SPI iniciado")
+        except Exception as e:
+            logger.warning(f"Não foi possível registrar eventos AT-SPI, usando consultas diretas: {e}")
+            self.listening = False
+    
+    def stop(self):
+        if not self.listening:
+            return
+        try:
+            self.atspi.Registry.deregisterEventListener(self.handle_event, *self.EVENT_TYPES)
+            self.atspi.Registry.stop()
+        except Exception as e:
+            logger.debug(f"Erro ao encerrar eventos AT-SPI: {e}")
+        self.listening = False
+    
+    def _run_registry(self):
+        try:
+            self.atspi.Registry.start()
+        except Exception as e:
+            logger.error(f"Laço de eventos AT-SPI encerrado: {e}")
+            self.listening = False
+    
+    def is_current(self):
+        """Indica se as consultas podem ser respondidas pelo espelho"""
+        return self.ready and self.listening
+    
+    def resync(self):
+        """Recarrega aplicações e janelas de nível superior a partir do desktop"""
+        with self.lock:
+            self.nodes.clear()
+            self.subtrees.clear()
+            self.applications = []
+            self.active_window = None
+            self.focused = None
+            try:
+                desktop = self.atspi.Registry.getDesktop(0)
+                for app in desktop:
+                    if app is None:
+                        continue
+                    self._mirror(app, None)
+                    self.applications.append(app)
+                    for window in app:
+                        if window is None:
+                            continue
+                        node = self._mirror(window, app)
+                        self.nodes[app]['children'].append(window)
+                        if node['active']:
+                            self.active_window = window
+                self.ready = True
+            except Exception as e:
+                logger.error(f"Erro ao sincronizar cache AT-SPI: {e}")
+                self.ready = False
+            self.stats['resyncs'] += 1
+    
+    def _mirror(self, accessible, parent):
+        """Copia para o espelho os dados de um objeto acessível (sem filhos)"""
+        node = {
+            'name': '',
+            'role': '',
+            'bounds': None,
+            'parent': parent,
+            'children': [],
+            'active': False,
+        }
+        try:
+            node['name'] = accessible.name or ''
+            node['role'] = accessible.getRoleName()
+            node['active'] = accessible.getState().contains(self.atspi.STATE_ACTIVE)
+        except Exception as e:
+            logger.debug(f"Erro ao ler objeto AT-SPI: {e}")
+        node['bounds'] = self._read_bounds(accessible)
+        self.nodes[accessible] = node
+        return node
+    
+    def _read_bounds(self, accessible):
+        try:
+            extents = accessible.queryComponent().getExtents(self.atspi.DESKTOP_COORDS)
+            return (extents.x, extents.y, extents.x + extents.width, extents.y + extents.height)
+        except Exception:
+            return None
+    
+    def _mirror_subtree(self, root, depth=0):
+        """Espelha recursivamente os filhos de `root` até `max_subtree_depth`"""
+        if depth >= self.max_subtree_depth:
+            return
+        node = self.nodes[root]
+        node['children'] = []
+        try:
+            children = list(root)
+        except Exception:
+            children = []
+        for child in children:
+            if child is None:
+                continue
+            self._mirror(child, root)
+            node['children'].append(child)
+            self._mirror_subtree(child, depth + 1)
+    
+    def _drop(self, accessible):
+        """Remove um objeto e seus descendentes do espelho"""
+        node = self.nodes.pop(accessible, None)
+        if not node:
+            return
+        self.subtrees.discard(accessible)
+        if accessible is self.focused:
+            self.focused = None
+        if accessible is self.active_window:
+            self.active_window = None
+        for child in node['children']:
+            self._drop(child)
+    
+    def _subtree_root(self, accessible):
+        """Raiz espelhada (janela) que contém `accessible`, se houver"""
+        while accessible is not None and accessible in self.nodes:
+            if accessible in self.subtrees:
+                return accessible
+            accessible = self.nodes[accessible]['parent']
+        return None
+    
+    def handle_event(self, event):
+        """Atualiza o espelho a partir de um evento AT-SPI"""
+        self.stats['events'] += 1
+        event_type = event.type
+        source = event.source
+        
+        try:
+            with self.lock:
+                if event_type.startswith('focus:') or event_type.startswith('object:state-changed:focused'):
+                    if event_type.startswith('focus:') or event.detail1:
+                        if source not in self.nodes:
+                            self._mirror(source, None)
+                        self.focused = source
+                
+                elif event_type.startswith('window:activate') or (
+                        event_type.startswith('object:state-changed:active') and event.detail1):
+                    node = self.nodes.get(source) or self._mirror(source, None)
+                    node['active'] = True
+                    if self.active_window is not None and self.active_window in self.nodes:
+                        self.nodes[self.active_window]['active'] = False
+                    self.active_window = source
+                
+                elif event_type.startswith('window:deactivate') or \
+                        event_type.startswith('object:state-changed:active'):
+                    if source in self.nodes:
+                        self.nodes[source]['active'] = False
+                    if source is self.active_window:
+                        self.active_window = None
+                
+                elif event_type.startswith('object:children-changed'):
+                    self._handle_children_changed(event)
+                
+                elif event_type.startswith('object:bounds-changed'):
+                    if source in self.nodes:
+                        self.nodes[source]['bounds'] = self._read_bounds(source)
+                
+                elif event_type.startswith('object:property-change:accessible-name'):
+                    if source in self.nodes:
+                        name = event.any_data if isinstance(event.any_data, str) else source.name
+                        self.nodes[source]['name'] = name or ''
+        
+        except Exception as e:
+            logger.debug(f"Erro ao processar evento AT-SPI {event_type}: {e}")
+    
+    def _handle_children_changed(self, event):
+        source = event.source
+        child = event.any_data
+        is_add = ':add' in event.type
+        
+        # Filhos do desktop são aplicações
+        if source not in self.nodes:
+            try:
+                is_desktop = source.getRoleName() == 'desktop frame'
+            except Exception:
+                is_desktop = False
+            if not is_desktop or child is None:
+                return
+            if is_add and child not in self.nodes:
+                self._mirror(child, None)
+                self.applications.append(child)
+            elif not is_add and child in self.applications:
+                self.applications.remove(child)
+                self._drop(child)
+            return
+        
+        node = self.nodes[source]
+        if is_add:
+            if child is not None and child not in node['children']:
+                self._mirror(child, source)
+                node['children'].append(child)
+                if self._subtree_root(source) is not None:
+                    self._mirror_subtree(child)
+                elif node['parent'] is None and self.nodes[child]['active']:
+                    self.active_window = child
+        else:
+            if child in node['children']:
+                node['children'].remove(child)
+            self._drop(child)
+    
+    def get_active_window(self):
+        """Retorna (nome, limites) da janela ativa espelhada, ou None"""
+        self.stats['queries'] += 1
+        with self.lock:
+            if self.active_window is None:
+                return None
+            node = self.nodes[self.active_window]
+            return node['name'], node['bounds']
+    
+    def get_application_names(self):
+        """Nomes das aplicações acessíveis, na ordem do desktop"""
+        self.stats['queries'] += 1
+        with self.lock:
+            return [self.nodes[app]['name'] for app in self.applications if app in self.nodes]
+    
+    def get_active_application_name(self):
+        """Nome da aplicação dona da janela ativa"""
+        self.stats['queries'] += 1
+        with self.lock:
+            window = self.active_window
+            parent = self.nodes[window]['parent'] if window in self.nodes else None
+            return self.nodes[parent]['name'] if parent in self.nodes else None
+    
+    def get_focused(self):
+        """Retorna (nome, papel, limites) do objeto com foco, ou None"""
+        self.stats['queries'] += 1
+        with self.lock:
+            node = self.nodes.get(self.focused)
+            if node is None:
+                return None
+            return node['name'], node['role'], node['bounds']
+    
+    def get_subtree(self, root=None):
+        """Lista (nome, papel, limites, profundidade) da subárvore de `root` (janela ativa por padrão)
+        
+        A subárvore é espelhada na primeira consulta e mantida pelos eventos a partir daí.
+        """
+        self.stats['queries'] += 1
+        with self.lock:
+            root = self.active_window if root is None else root
+            if root is None or root not in self.nodes:
+                return []
+            if root not in self.subtrees:
+                self._mirror_subtree(root)
+                self.subtrees.add(root)
+            
+            result = []
+            stack = [(root, 0)]
+            while stack:
+                accessible, depth = stack.pop()
+                node = self.nodes.get(accessible)
+                if node is None:
+                    continue
+                result.append((node['name'], node['role'], node['bounds'], depth))
+                stack.extend((child, depth + 1) for child in reversed(node['children']))
+            return result
+
+class AccessibilityManager:
+    """Gerencia a integração com APIs de acessibilidade do sistema operacional"""
+    
+    def __init__(self):
+        self.platform = sys.platform
+        logger.info(f"Inicializando gerenciador de acessibilidade para plataforma: {self.platform}")
+        
+        # Importa as bibliotecas específicas da plataforma apenas quando necessário
+        if self.platform == 'win32':
+            try:
+                import pywinauto
+                import comtypes.client
+                import win32gui
+                import win32con
                 self.pywinauto = pywinauto
                 self.comtypes = comtypes
                 self.win32gui = win32gui
@@ -410,6 +2543,10 @@ class AccessibilityManager:
                 import pyatspi
                 self.pyatspi = pyatspi
                 self.available = True
+                
+                # Espelho da árvore mantido por eventos, evitando percorrer o desktop a cada consulta
+                self.atspi_cache = ATSPITreeCache(pyatspi)
+                self.atspi_cache.start()
                 logger.info("APIs de acessibilidade do Linux (AT-SPI) inicializadas com sucesso")
             except ImportError:
                 logger.warning("Não foi possível importar as bibliotecas de acessibilidade do Linux")
@@ -418,6 +2555,11 @@ class AccessibilityManager:
             logger.warning(f"Plataforma {self.platform} não suportada para acessibilidade nativa")
             self.available = False
     
+    def get_atspi_cache(self):
+        """Cache AT-SPI pronto para consultas, ou None"""
+        cache = getattr(self, 'atspi_cache', None)
+        return cache if cache is not None and cache.is_current() else None
+    
     def get_focused_element(self):
         """Obtém o elemento atualmente em foco no sistema"""
         if not self.available:
@@ -504,7 +2646,13 @@ class AccessibilityManager:
                         )
             
             elif self.platform.startswith('linux'):
-                # Implementação para Linux permanece a mesma
+                atspi_cache = self.get_atspi_cache()
+                if atspi_cache:
+                    active = atspi_cache.get_active_window()
+                    if active and active[1]:
+                        return UIElement(UIElementType.UNKNOWN, active[1], text=active[0])
+                    return None
+                
                 desktop = self.pyatspi.Registry.getDesktop(0)
                 active_window = None
                 
@@ -668,26 +2816,10 @@ class AccessibilityManager:
                         elements = self.vision_manager.detect_elements(screenshot)
                         
                         if elements:
-                            # Encontrar elemento mais próximo ao cursor
-                            nearest = elements[0]
-                            for elem in elements:
-                                # Ajustar coordenadas para global
-                                global_pos = (
-                                    elem.position[0] + region[0],
-                                    elem.position[1] + region[1],
-                                    elem.position[2] + region[0],
-                                    elem.position[3] + region[1]
-                                )
-                                
-                                # Criar elemento com coordenadas globais
-                                nearest = UIElement(
-                                    elem.element_type,
-                                    global_pos,
-                                    elem.text,
-                                    accessibility_id="tab_focused"
-                                )
-                                break
-                            
+                            # Encontrar elemento mais próximo ao cursor, em coordenadas globais
+                            table = ElementTable.from_elements(elements).translate(region[0], region[1])
+                            nearest = table.element(table.hit_test(x, y))
+                            nearest.accessibility_id = "tab_focused"
                             return nearest
             except:
                 pass
@@ -697,8 +2829,42 @@ class AccessibilityManager:
 class VisionManager:
     """Gerencia a detecção visual de elementos da interface usando visão computacional"""
     
-    def __init__(self, config):
+    # Caracteres aceitos pelo OCR otimizado para elementos de UI
+    UI_ALLOWLIST = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,()-_/@#$%&+=:;'
+    # Caracteres aceitos pelo OCR de código-fonte
+    CODE_ALLOWLIST = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,()[]{}<>:;=+-*/_"\''
+    # Parâmetros de OCR por região; podem ser ajustados por aplicação com o OCRParameterTuner
+    DEFAULT_OCR_PARAMS = {
+        'min_size': 20,               # Tamanho mínimo de texto para o detector (padrão do easyOCR)
+        'upscale_min_side': 30,       # Regiões menores que isso são ampliadas
+        'contrast_alpha': 1.0,
+        'contrast_beta': 0,
+        'equalize': True,
+        'denoise': True,
+        'threshold_block_size': 11,
+        'threshold_c': 2,
+        'min_confidence': 0.3,        # Confiança mínima no processamento em lote
+        'ui_min_confidence': 0.15,    # Confiança mínima no OCR otimizado para UI
+        'ui_contrast_alpha': 2.0,
+        'ui_contrast_beta': 10,
+        'max_batch': 8                # Regiões lidas imediatamente por quadro
+    }
+    CODE_OCR_PARAMS = {
+        'contrast_alpha': 1.5,
+        'contrast_beta': 10
+    }
+    # Títulos de janelas cujo conteúdo é texto monoespaçado em grade de linhas; só editores têm
+    # calha de números de linha (a saída de terminais pode começar com números)
+    LINE_NUMBER_APPS = ('visual studio code', 'vscode', 'sublime', 'notepad++', 'vim', 'pycharm', 'intellij')
+    LINE_GRID_APPS = LINE_NUMBER_APPS + ('terminal', 'powershell', 'cmd.exe', 'prompt de comando',
+                                         'command prompt', 'bash')
+    # Nomes comparados como palavras inteiras ('vim' não casa com "Vimeo")
+    LINE_NUMBER_PATTERN = re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, LINE_NUMBER_APPS)) + r')(?!\w)')
+    LINE_GRID_PATTERN = re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, LINE_GRID_APPS)) + r')(?!\w)')
+    
+    def __init__(self, config, foreground_context=None):
         self.config = config
+        self.foreground_context = foreground_context
         
         # Configurações do modelo de visão
         model_path = self.config.get('vision', 'model_path', fallback='models')
@@ -706,6 +2872,35 @@ class VisionManager:
         # Cache para resultados de OCR
         self.ocr_cache = {}  # Cache para resultados OCR
         self.cache_max_size = 100  # Limitar tamanho do cache
+        self.ocr_cache_lock = threading.Lock()
+        self.ocr_scheduler = None
+        self.is_background_view = False  # Visões de background_view não gravam estado compartilhado
+        
+        # Estatísticas da cascata de OCR (tentativas e aceites por estágio)
+        self.ocr_cascade_stats = {}
+        self._ocr_cascade_calls = 0
+        
+        # Grade de linhas para editores de código e terminais
+        self.line_grid = None
+        if self.config.getboolean('vision', 'code_line_grid', fallback=True):
+            self.line_grid = CodeLineGrid()
+        
+        # Atlas de layout aprendido por aplicação (elementos fixos anunciados sem OCR)
+        self.layout_atlas = None
+        if self.config.getboolean('vision', 'layout_atlas', fallback=True):
+            self.layout_atlas = LayoutAtlas(
+                self.config.get('vision', 'layout_atlas_file', fallback='layout_atlas.json'),
+                min_hits=self.config.getint('vision', 'layout_atlas_min_hits', fallback=3)
+            )
+            self.layout_atlas.start_autosave()
+        
+        # Vocabulário de UI para correção léxica do OCR
+        self.app_profiler = foreground_context.app_profiler if foreground_context else AppProfiler()
+        self.current_app_name = "generic"
+        self._ocr_params_cache = {}
+        self.lexicon = None
+        if self.config.getboolean('vision', 'ocr_lexicon_correction', fallback=True):
+            self.lexicon = self.build_lexicon()
         
         # Carregar modelo de detecção de elementos UI (pode ser YOLO, Faster R-CNN, etc.)
         try:
@@ -716,14 +2911,31 @@ class VisionManager:
             
             # Inicializar leitor OCR
             logger.info("Inicializando motor OCR para português...")
+            # Backend de inferência otimizado para CPU (TorchScript ou ONNX Runtime)
+            self.inference_backend = OCRInferenceBackend(
+                self.config.get('vision', 'ocr_backend', fallback='eager'),
+                num_threads=self.config.getint('vision', 'ocr_backend_threads', fallback=0)
+            )
             try:
-                # Lista de idiomas - 'pt' para português, 'en' para inglês
-                self.reader = easyocr.Reader(['pt', 'en'], gpu=False)
+                self.reader = self.create_reader()
                 logger.info("Motor OCR inicializado com sucesso")
             except Exception as e:
                 logger.error(f"Erro ao inicializar OCR: {e}")
                 self.reader = None
             
+            # Camada de motores de OCR: cada região vai para o motor de melhor custo-benefício
+            engines = [EasyOCREngine(lambda: self.reader)]
+            if self.config.getboolean('ocr_engines', 'tesseract_enabled', fallback=True):
+                engines.append(TesseractEngine(
+                    languages=self.config.get('ocr_engines', 'tesseract_languages', fallback='por+eng')
+                ))
+            self.ocr_router = OCREngineRouter(self.config, engines)
+            
+            # Agendador que completa em segundo plano as regiões fora do lote imediato
+            if self.reader is not None:
+                cpu_budget = self.config.getfloat('vision', 'ocr_background_budget', fallback=0.3)
+                self.ocr_scheduler = OCRScheduler(self._ocr_region_in_pieces, cpu_budget=cpu_budget)
+            
             logger.info("Modelos de visão computacional carregados com sucesso")
         except Exception as e:
             logger.error(f"Erro ao carregar modelos de visão: {e}")
@@ -809,6 +3021,187 @@ class VisionManager:
             logger.error(f"Erro na identificação de botão de rede social: {e}")
             return None
 
+    def build_lexicon(self):
+        """Constrói o índice léxico com o vocabulário dos perfis e as listas de palavras por aplicação"""
+        lexicon = OCRLexicon()
+        try:
+            for text, app_name in self.app_profiler.get_vocabulary():
+                lexicon.add_text(text, app_name)
+            
+            # Listas de palavras por aplicação: <lexicon_folder>/<aplicação>.txt (generic.txt vale para todas)
+            lexicon_folder = self.config.get('vision', 'lexicon_folder', fallback='lexicons')
+            if os.path.isdir(lexicon_folder):
+                for file_name in sorted(os.listdir(lexicon_folder)):
+                    if file_name.endswith('.txt'):
+                        app_name = os.path.splitext(file_name)[0].lower()
+                        lexicon.load_word_list(os.path.join(lexicon_folder, file_name), app_name)
+            
+            # Dicionário base: arquivos ou pastas de listas de palavras corretas que nunca são trocadas
+            for path in self.config.get('vision', 'ocr_base_dictionary', fallback='').split(','):
+                path = path.strip()
+                if os.path.isdir(path):
+                    for file_name in sorted(os.listdir(path)):
+                        if file_name.endswith('.txt'):
+                            lexicon.load_dictionary(os.path.join(path, file_name))
+                elif path and os.path.isfile(path):
+                    lexicon.load_dictionary(path)
+            if not lexicon.dictionary:
+                logger.info("Sem dicionário base: correção léxica restrita a palavras frequentes do vocabulário")
+            
+            logger.info(f"Vocabulário de correção de OCR carregado: {len(lexicon.words)} palavras")
+        except Exception as e:
+            logger.error(f"Erro ao construir vocabulário de OCR: {e}")
+        return lexicon
+    
+    def correct_ocr_text(self, text, confidence):
+        """Aplica a correção léxica ao texto do OCR lido com `confidence`, retornando (texto, todos_conhecidos)"""
+        if not self.lexicon or not text:
+            return text, False
+        try:
+            return self.lexicon.correct_text(text, self.current_app_name, confidence)
+        except Exception as e:
+            logger.debug(f"Erro na correção léxica: {e}")
+            return text, False
+    
+    def correct_ocr_parts(self, parts):
+        """Corrige cada fragmento [(texto, confiança)] pela sua própria confiança e une os textos"""
+        texts = []
+        all_known = bool(parts)
+        for text, confidence in parts:
+            text, known = self.correct_ocr_text(text, confidence)
+            texts.append(text)
+            all_known = all_known and known
+        return " ".join(texts), all_known
+    
+    def set_window_context(self, window_title):
+        """Atualiza a aplicação atual usada para escolher o vocabulário de correção"""
+        self.current_app_name, _ = self.app_profiler.get_app_profile(window_title or "")
+    
+    def is_line_grid_app(self, window_title):
+        """Verifica se a janela é um editor de código ou terminal (texto em grade de linhas)"""
+        return bool(self.LINE_GRID_PATTERN.search(window_title.lower()))
+    
+    def has_line_numbers(self, window_title):
+        """Verifica se a janela é um editor, cujo texto pode ter calha de números de linha"""
+        return bool(self.LINE_NUMBER_PATTERN.search(window_title.lower()))
+    
+    def detect_code_lines(self, cv_image, window_key, origin=(0, 0), background=False, line_numbers=False):
+        """Lê o conteúdo de editores/terminais linha a linha, usando cache por hash de pixels
+        
+        Com `line_numbers` (editores), a calha de números de linha é procurada nas linhas lidas.
+        Retorna a lista de elementos (uma por linha com texto, limitada à extensão do texto) ou None
+        se a região não formar uma grade.
+        """
+        try:
+            gray = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
+            layout, lines = self.line_grid.find_lines(gray, window_key)
+            if not lines:
+                return None
+            
+            # Ignorar a calha de números de linha quando já conhecida
+            gutter_local = 0
+            if layout['gutter_right'] is not None:
+                gutter_local = min(max(0, layout['gutter_right'] - origin[0]), gray.shape[1] - 1)
+            
+            elements = []
+            pending = []  # linhas lidas neste quadro: (índice em elements, chave, fragmentos)
+            if self.ocr_scheduler and not background:
+                self.ocr_scheduler.begin_interactive()
+            try:
+                for top, bottom in lines:
+                    strip = gray[top:bottom, gutter_local:]
+                    key = self.line_grid.line_key(strip)
+                    cached = self.line_grid.get_cached(key)
+                    
+                    if cached is None:
+                        if self.ocr_scheduler and background:
+                            self.ocr_scheduler.wait_idle()
+                        # Margem vertical ajuda o detector a não cortar ascendentes/descendentes
+                        padded = cv2.copyMakeBorder(strip, 4, 4, 4, 4, cv2.BORDER_REPLICATE)
+                        results = self.ocr_router.readtext(padded, detail=1, paragraph=False,
+                                                           allowlist=self.CODE_ALLOWLIST)
+                        fragments = [fragment for line in OCRLineGrouper.group_lines(results, line_tolerance=bottom - top)
+                                     for fragment in line if fragment[5] > 0.3]
+                        pending.append((len(elements), key, fragments))
+                        cached = ("", 0, strip.shape[1])
+                    
+                    text, left, right = cached
+                    elements.append(UIElement(
+                        UIElementType.PARAGRAPH,
+                        (gutter_local + left, top, gutter_local + right, bottom),
+                        text=text,
+                        confidence=0.8,
+                        accessibility_id="code_line"
+                    ))
+            finally:
+                if self.ocr_scheduler and not background:
+                    self.ocr_scheduler.end_interactive()
+            
+            # A calha é procurada só em editores e enquanto desconhecida (com calha conhecida, a faixa
+            # já começa depois dela ou a região inteira está à sua direita)
+            fragment_lines = [fragments for _, _, fragments in pending]
+            if line_numbers and layout['gutter_right'] is None:
+                fragment_lines = self.line_grid.split_gutter(layout, fragment_lines, origin[0] - 4)
+            
+            width = gray.shape[1] - gutter_local
+            for (index, key, _), fragments in zip(pending, fragment_lines):
+                fragments = [fragment for fragment in fragments if fragment[4].strip()]
+                text, _ = self.correct_ocr_parts([(" ".join(fragment[4].split()), fragment[5])
+                                                  for fragment in fragments])
+                # Extensão do texto na faixa (descontando a margem de 4 pixels)
+                left, right = 0, width
+                if fragments:
+                    left = int(min(max(0, min(fragment[0] for fragment in fragments) - 4), width))
+                    right = int(min(max(fragment[2] for fragment in fragments) - 4, width))
+                self.line_grid.store(key, (text, left, right))
+                
+                element = elements[index]
+                element.text = text
+                element.position = (gutter_local + left, element.position[1], gutter_local + right, element.position[3])
+            
+            return [elem for elem in elements if elem.text]
+        
+        except Exception as e:
+            logger.error(f"Erro na leitura por grade de linhas: {e}")
+            return None
+    
+    def background_view(self):
+        """Visão para detecção em outra thread (pré-OCR ocioso e pré-busca do cursor)
+        
+        Guarda apenas aplicação atual, grade de linhas e estatísticas da cascata, que detect_elements
+        altera a cada chamada. Leitor, motores, caches e os demais atributos são lidos do VisionManager
+        principal a cada acesso (veja `__getattr__`), então um leitor recriado por create_reader ou um
+        cache de OCR substituído valem também para a visão. A visão não envia lotes ao OCRScheduler
+        (o que descartaria os do quadro principal), não grava no atlas de layout e não grava a imagem
+        de depuração.
+        """
+        view = object.__new__(type(self))
+        view.parent = self
+        view.is_background_view = True
+        view.current_app_name = "generic"
+        view.line_grid = CodeLineGrid() if self.line_grid else None
+        view.ocr_cascade_stats = {}
+        view._ocr_cascade_calls = 0
+        return view
+    
+    def __getattr__(self, name):
+        # Só chamado para atributos ausentes: a visão em segundo plano lê o restante do VisionManager principal
+        parent = self.__dict__.get('parent')
+        if parent is None:
+            raise AttributeError(name)
+        return getattr(parent, name)
+    
+    def create_reader(self, **options):
+        """Cria um leitor easyOCR (português e inglês) com o backend de inferência configurado
+        
+        Todo leitor novo, inclusive os recriados pelo ajuste de desempenho e pela recuperação de
+        erros, passa por aqui para não perder o backend otimizado.
+        """
+        # Lista de idiomas - 'pt' para português, 'en' para inglês
+        reader = easyocr.Reader(['pt', 'en'], gpu=False, **options)
+        self.inference_backend.apply(reader)
+        return reader
+    
     def initialize_cv_detectors(self):
         """Inicializa detectores baseados em OpenCV"""
         # Cascade para botões (aproximação simples)
@@ -819,8 +3212,13 @@ class VisionManager:
             logger.warning(f"Arquivo de cascade não encontrado: {cascade_path}")
             self.button_cascade = None
     
-    def detect_elements(self, image):
-        """Detecta elementos de UI em uma imagem usando visão computacional com regiões expandidas para melhor OCR"""
+    def detect_elements(self, image, focus_point=None, origin=(0, 0), background=False):
+        """Detecta elementos de UI em uma imagem usando visão computacional com regiões expandidas para melhor OCR
+        
+        `focus_point` (coordenadas locais da imagem) define quais regiões recebem OCR primeiro;
+        `origin` é a posição da imagem na tela, usada pela grade de linhas de editores de código.
+        Com `background=True` (pré-OCR ocioso) todas as regiões são lidas, cedendo ao trabalho interativo.
+        """
         elements = []
         
         try:
@@ -834,6 +3232,56 @@ class VisionManager:
             altura, largura = cv_image.shape[:2]
             logger.info(f"Analisando imagem de {largura}x{altura} pixels")
             
+            # Obter o título da janela atual para adaptar o OCR
+            window_title = ""
+            window_key = None
+            if self.foreground_context:
+                foreground = self.foreground_context.get()
+                window_title = foreground.title
+                window_key = foreground.hwnd
+                self.current_app_name = foreground.app_name
+                is_line_grid_app = foreground.is_line_grid_app
+                line_numbers = foreground.has_line_numbers
+                # OCR em modo código para editores e terminais, pelas flags da janela em primeiro plano
+                code_mode = foreground.is_code_editor or foreground.is_line_grid_app
+                atlas_app = LayoutAtlas.app_key(foreground)
+            else:
+                try:
+                    import win32gui
+                    hwnd = win32gui.GetForegroundWindow()
+                    window_title = win32gui.GetWindowText(hwnd)
+                    window_key = hwnd
+                except:
+                    pass
+                self.set_window_context(window_title)
+                is_line_grid_app = self.is_line_grid_app(window_title)
+                line_numbers = self.has_line_numbers(window_title)
+                code_mode = is_line_grid_app
+                atlas_app = self.current_app_name
+            
+            # Editores de código e terminais: o texto da grade é lido em linhas inteiras; barras laterais
+            # e de ferramentas continuam na detecção por contornos abaixo
+            code_lines = []
+            if self.line_grid and is_line_grid_app:
+                code_lines = self.detect_code_lines(cv_image, window_key or window_title, origin, background,
+                                                    line_numbers=line_numbers) or []
+                if code_lines:
+                    logger.info(f"Linhas de código lidas pela grade: {len(code_lines)}")
+            
+            # Atlas de layout: elementos fixos já confirmados, verificados pelo hash dos pixels
+            atlas_elements = []
+            window_rect = None
+            if self.layout_atlas and window_key and self.foreground_context:
+                window_rect = self.foreground_context.get_window_rect()
+            if window_rect:
+                try:
+                    atlas_elements = self.layout_atlas.lookup(atlas_app, window_rect, cv_image, origin)
+                except (KeyError, ValueError, TypeError) as e:
+                    # Entrada corrompida no arquivo do atlas (tipo desconhecido, caixa inválida)
+                    logger.warning(f"Entrada inválida no atlas de layout: {e}")
+                if atlas_elements:
+                    logger.info(f"Elementos reconhecidos pelo atlas de layout: {len(atlas_elements)}")
+            
             # Converter para escala de cinza para processamento
             gray = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
             
@@ -871,6 +3319,12 @@ class VisionManager:
             for contour in filtered_contours:
                 x, y, w, h = cv2.boundingRect(contour)
                 
+                # Regiões já resolvidas pelo atlas ou pela grade de linhas dispensam classificação e OCR
+                if atlas_elements and LayoutAtlas.covers(atlas_elements, (x, y, x+w, y+h)):
+                    continue
+                if code_lines and CodeLineGrid.covers(code_lines, (x, y, x+w, y+h)):
+                    continue
+                
                 # Determinar tipo com base na forma
                 aspect_ratio = float(w) / h if h > 0 else 0
                 
@@ -891,15 +3345,6 @@ class VisionManager:
                 element_types.append(element_type)
                 element_positions.append((x, y, x+w, y+h))
             
-            # Obter o título da janela atual para adaptar o OCR
-            window_title = ""
-            try:
-                import win32gui
-                hwnd = win32gui.GetForegroundWindow()
-                window_title = win32gui.GetWindowText(hwnd)
-            except:
-                pass
-            
             # Filtrar apenas regiões grandes o suficiente para OCR e expandir-las
             ocr_regions = []
             element_indices = []  # Para mapear regiões OCR de volta aos elementos
@@ -920,18 +3365,24 @@ class VisionManager:
             
             # Processar OCR apenas nas regiões filtradas e expandidas
             element_texts = [""] * len(regions)  # Inicializar todos com string vazia
+            element_fresh = [False] * len(regions)  # Texto lido pelo OCR, não vindo do cache
             
             if ocr_regions:
                 logger.info(f"Processando OCR em lote para {len(ocr_regions)} regiões de um total de {len(regions)}")
                 
                 # Processar OCR com regiões expandidas
-                ocr_results = self.batch_process_ocr(cv_image, ocr_regions, max_batch=8, window_title=window_title)
+                max_batch = self.get_ocr_params(code_mode)['max_batch']
+                fresh_indices = set()
+                ocr_results = self.batch_process_ocr(cv_image, ocr_regions, max_batch=max_batch,
+                                                     is_code_editor=code_mode, focus_point=focus_point,
+                                                     background=background, fresh=fresh_indices)
                 
                 # Mapear resultados OCR de volta para os elementos corretos
                 for i, text in enumerate(ocr_results):
                     if i < len(element_indices):
                         original_index = element_indices[i]
                         element_texts[original_index] = text
+                        element_fresh[original_index] = i in fresh_indices
             
             # Criar os objetos UIElement com os resultados
             for i in range(len(regions)):
@@ -942,6 +3393,13 @@ class VisionManager:
                     confidence=0.6
                 ))
             
+            if window_rect:
+                if not self.is_background_view:
+                    self.layout_atlas.record(atlas_app, window_rect, cv_image, elements, origin,
+                                             fresh=element_fresh)
+                elements = atlas_elements + elements
+            elements = code_lines + elements
+            
             logger.info(f"Total de elementos UI identificados: {len(elements)}")
             
             # Contar elementos com texto para diagnóstico
@@ -953,7 +3411,7 @@ class VisionManager:
             logger.info(f"Elementos com texto detectado: {text_elements}")
             
             # Mostrar elementos detectados com texto para debug
-            if len(filtered_contours) > 0:
+            if len(filtered_contours) > 0 and not background and not self.is_background_view:
                 debug_img = cv_image.copy()
                 
                 for elem in elements:
@@ -969,340 +3427,2273 @@ class VisionManager:
                         cv2.putText(debug_img, elem.text, (p1[0], p1[1]-5), 
                                 font, 0.5, (0, 0, 255), 1, cv2.LINE_AA)
                 
-                # Salvar a cada 50 ciclos para não encher o disco
-                if hasattr(self, '_debug_counter'):
-                    self._debug_counter += 1
-                else:
-                    self._debug_counter = 0
-                    
-                if self._debug_counter % 50 == 0:
-                    cv2.imwrite("debug_detection.png", debug_img)
-        
-        except Exception as e:
-            logger.error(f"Erro na detecção visual: {e}")
-            logger.error("Detalhes do erro:", exc_info=True)
-        
-        return elements
+                # Salvar a cada 50 ciclos para não encher o disco
+                if hasattr(self, '_debug_counter'):
+                    self._debug_counter += 1
+                else:
+                    self._debug_counter = 0
+                    
+                if self._debug_counter % 50 == 0:
+                    cv2.imwrite("debug_detection.png", debug_img)
+        
+        except Exception as e:
+            logger.error(f"Erro na detecção visual: {e}")
+            logger.error("Detalhes do erro:", exc_info=True)
+        
+        return elements
+    
+    def extract_text_with_ocr(self, image, region, optimize_for_ui=False):
+        """Extrai texto de uma região específica da imagem usando OCR em cascata guiado por confiança
+        
+        O primeiro estágio faz um único OCR na resolução nativa com o pré-processamento mais barato.
+        Ampliação e variantes extras de pré-processamento só rodam se a confiança ficar abaixo de
+        `ocr_cascade_threshold`; as taxas de aceitação de cada estágio ficam em `ocr_cascade_stats`.
+        """
+        if self.reader is None:
+            return ""
+        
+        try:
+            x1, y1, x2, y2 = region
+            width = x2 - x1
+            height = y2 - y1
+            
+            # Relaxar os limites mínimos para elementos de UI
+            if optimize_for_ui:
+                min_width = 10  # Era 20, agora menor para capturar ícones e botões pequenos
+                min_height = 8  # Era 10, agora menor
+            else:
+                min_width = 20
+                min_height = 10
+                
+            # Verificar se a região é grande o suficiente
+            if width < min_width or height < min_height:
+                return ""
+            
+            # Recortar a região da imagem
+            if isinstance(image, Image.Image):
+                roi = image.crop((x1, y1, x2, y2))
+                roi_cv = cv2.cvtColor(np.array(roi), cv2.COLOR_RGB2BGR)
+            else:
+                roi_cv = image[y1:y2, x1:x2]
+            
+            # Verificar cache (chave pelo conteúdo, pois os chamadores reutilizam coordenadas locais)
+            region_key = self._ocr_cache_key(roi_cv, "cascade_ui" if optimize_for_ui else "cascade")
+            cached = self.ocr_cache.get(region_key)
+            if cached is not None:
+                return cached
+            
+            threshold = self.config.getfloat('vision', 'ocr_cascade_threshold', fallback=0.6)
+            lexicon_threshold = self.config.getfloat('vision', 'ocr_lexicon_threshold', fallback=0.35)
+            # Limiar mínimo para aceitar texto quando nenhum estágio atinge a confiança desejada
+            params = self.get_ocr_params()
+            min_confidence = params['ui_min_confidence'] if optimize_for_ui else params['min_confidence']
+            
+            best_text, best_confidence = "", 0.0
+            best_parts = []  # Fragmentos [(texto, confiança)] do melhor resultado, para a correção léxica
+            all_texts = {}  # Votação entre variantes (texto -> maior confiança)
+            accepted_stage = None
+            
+            for stage_name, variants in self._ocr_cascade_stages(roi_cv, width, height, optimize_for_ui, params):
+                stage_stats = self.ocr_cascade_stats.setdefault(stage_name, {'attempts': 0, 'accepted': 0})
+                stage_stats['attempts'] += 1
+                
+                for processed, min_size in variants:
+                    if optimize_for_ui:
+                        results = self.ocr_router.readtext(processed, detail=1, paragraph=False,
+                                                           min_size=min_size, allowlist=self.UI_ALLOWLIST)
+                        for bbox, text, prob in results:
+                            clean_text = text.strip()
+                            # Se o mesmo texto foi encontrado mais de uma vez, escolher a maior confiança
+                            if clean_text and prob > all_texts.get(clean_text, 0.0):
+                                all_texts[clean_text] = prob
+                        
+                        if all_texts:
+                            best_text, best_confidence = max(all_texts.items(), key=lambda item: item[1])
+                            best_parts = [(best_text, best_confidence)]
+                    else:
+                        results = self.ocr_router.readtext(processed, min_size=min_size)
+                        # Combinar partes confiáveis; confiança média representa a passagem
+                        reliable = [result for result in results if result[2] > min_confidence]
+                        # Ordem de leitura: linhas de cima para baixo, fragmentos da esquerda para a direita
+                        parts = [(fragment[4], fragment[5])
+                                 for line in OCRLineGrouper.group_lines(reliable) for fragment in line]
+                        if parts:
+                            confidence = sum(prob for _, prob in parts) / len(parts)
+                            if confidence > best_confidence:
+                                best_text = " ".join(text for text, _ in parts)
+                                best_confidence = confidence
+                                best_parts = parts
+                
+                # Texto lido inteiramente com palavras do vocabulário aceita confiança menor;
+                # um texto que precisaria de correção léxica nunca ganha esse limiar reduzido
+                all_known = bool(self.lexicon) and self.lexicon.is_known_text(best_text, self.current_app_name)
+                if best_text and (best_confidence >= threshold or
+                                  (all_known and best_confidence >= lexicon_threshold)):
+                    stage_stats['accepted'] += 1
+                    accepted_stage = stage_name
+                    break
+            
+            if best_confidence <= min_confidence:
+                best_text = ""
+            elif best_parts:
+                # Corrigir só os fragmentos de baixa confiança do resultado final
+                best_text, _ = self.correct_ocr_parts(best_parts)
+            
+            # Registrar taxas de acerto por estágio periodicamente
+            self._ocr_cascade_calls += 1
+            if self._ocr_cascade_calls % 50 == 0:
+                logger.info(f"Cascata OCR - taxas de aceitação: {self.get_cascade_hit_rates()}")
+            
+            if best_text:
+                self._store_ocr_cache(region_key, best_text)
+                logger.info(f"OCR em cascata detectou: '{best_text}' (confiança: {best_confidence:.2f}, "
+                            f"estágio: {accepted_stage or 'melhor disponível'})")
+            
+            return best_text
+        
+        except Exception as e:
+            logger.error(f"Erro na extração de texto com OCR: {e}")
+            return ""
+    
+    def _ocr_cascade_stages(self, roi_cv, width, height, optimize_for_ui, params):
+        """Gera os estágios da cascata de OCR sob demanda, do mais barato ao mais caro
+        
+        Cada estágio é (nome, [(imagem_processada, min_size), ...]); o pré-processamento de um
+        estágio só é calculado se o anterior não atingir a confiança desejada.
+        """
+        gray = cv2.cvtColor(roi_cv, cv2.COLOR_BGR2GRAY)
+        
+        # ESTÁGIO 1: resolução nativa, apenas escala de cinza
+        yield 'nativo', [(gray, 3 if optimize_for_ui else 10)]
+        
+        # Regiões pequenas (botões, ícones) recebem super-resolução a partir daqui
+        upscaled = gray
+        if width < 30 or height < 30:
+            scale_factor = max(2, 40/min(height, width))
+            upscaled = cv2.resize(gray, (int(width * scale_factor), int(height * scale_factor)),
+                                  interpolation=cv2.INTER_CUBIC)
+        
+        if optimize_for_ui:
+            # ESTÁGIO 2: versão ampliada de alto contraste
+            high_contrast = cv2.convertScaleAbs(upscaled, alpha=params['ui_contrast_alpha'],
+                                                beta=params['ui_contrast_beta'])
+            yield 'ampliado', [(high_contrast, 3)]
+            
+            # ESTÁGIO 3: variantes caras (CLAHE e bordas invertidas para elementos pequenos)
+            clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
+            variants = [(clahe.apply(upscaled), 3)]
+            if width < 50 or height < 50:
+                edges = cv2.Canny(upscaled, 50, 150)
+                edges = cv2.dilate(edges, np.ones((2,2), np.uint8), iterations=1)
+                variants.append((255 - edges, 2))  # Inverter para texto escuro em fundo claro
+            yield 'variantes', variants
+        else:
+            # ESTÁGIO 2: equalização e remoção de ruído (se ativadas nos parâmetros) e limiarização adaptativa
+            prepared = cv2.equalizeHist(upscaled) if params['equalize'] else upscaled
+            if params['denoise']:
+                prepared = cv2.fastNlMeansDenoising(prepared, None, 10, 7, 21)
+            binary = cv2.adaptiveThreshold(prepared, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                        cv2.THRESH_BINARY, params['threshold_block_size'] | 1,
+                                        params['threshold_c'])
+            yield 'binarizado', [(binary, 10)]
+    
+    def get_cascade_hit_rates(self):
+        """Retorna a fração de chamadas aceitas em cada estágio da cascata de OCR"""
+        return {
+            stage: round(stats['accepted'] / stats['attempts'], 2) if stats['attempts'] else 0.0
+            for stage, stats in self.ocr_cascade_stats.items()
+        }
+        
+    def batch_process_ocr(self, image, regions, max_batch=5, is_code_editor=False, focus_point=None, background=False,
+                          fresh=None):
+        """Processa múltiplas regiões para OCR priorizando as mais próximas do cursor
+        
+        As `max_batch` regiões mais próximas de `focus_point` são processadas imediatamente;
+        as demais são entregues ao agendador em segundo plano, que preenche o cache de OCR
+        para os próximos movimentos do usuário. Com `background=True` todas as regiões são
+        lidas nesta chamada, em faixas (veja `_ocr_region_in_pieces`), esperando antes de cada faixa o
+        fim do trabalho interativo. Se `fresh` for um conjunto, recebe os índices das regiões lidas pelo
+        OCR (fora do cache).
+        """
+        if self.reader is None or not regions:
+            return [""] * len(regions)
+        
+        try:
+            # Resultados para todas as regiões (na ordem original)
+            results = [""] * len(regions)
+            
+            # Contador de regiões processadas
+            processed_regions = 0
+            
+            # Ordenar regiões pela distância ao cursor (ou foco)
+            order = OCRScheduler.order_by_distance(regions, focus_point)
+            deferred_regions = []
+            
+            if background:
+                # Pré-OCR ocioso: ler todas as regiões, cedendo ao trabalho interativo
+                for index in order:
+                    results[index], from_cache = self._ocr_region_in_pieces(image, regions[index], is_code_editor)
+                    if fresh is not None and not from_cache:
+                        fresh.add(index)
+                return results
+            
+            if self.ocr_scheduler:
+                self.ocr_scheduler.begin_interactive()
+            
+            try:
+                for index in order:
+                    # Limitar número de regiões processadas por ciclo
+                    if processed_regions >= max_batch:
+                        deferred_regions.append(regions[index])
+                        continue
+                    
+                    text, from_cache = self._ocr_single_region(image, regions[index], is_code_editor)
+                    results[index] = text
+                    if not from_cache:
+                        processed_regions += 1
+                        if fresh is not None:
+                            fresh.add(index)
+            finally:
+                if self.ocr_scheduler:
+                    self.ocr_scheduler.end_interactive()
+            
+            # Completar as regiões restantes em segundo plano (só o quadro principal usa o agendador)
+            if deferred_regions:
+                if self.is_background_view:
+                    logger.debug(f"{len(deferred_regions)} regiões além do lote ignoradas na visão em segundo plano")
+                elif self.ocr_scheduler:
+                    self.ocr_scheduler.submit_background(image, deferred_regions, is_code_editor)
+                else:
+                    logger.debug(f"{len(deferred_regions)} regiões ignoradas (agendador indisponível)")
+            
+            return results
+        
+        except Exception as e:
+            logger.error(f"Erro no processamento OCR: {e}")
+            logger.debug("Detalhes do erro:", exc_info=True)
+            return [""] * len(regions)
+    
+    @staticmethod
+    def split_region(gray, region, max_height, min_height=10):
+        """Divide uma região alta em faixas horizontais de até `max_height` pixels
+        
+        Cada corte é feito na linha de pixels de menor contraste da metade inferior da faixa, para não
+        atravessar linhas de texto. `gray` é o recorte da região em escala de cinza.
+        """
+        x1, y1, x2, y2 = region
+        height = y2 - y1
+        if height <= max_height:
+            return [region]
+        
+        contrast = gray.max(axis=1).astype(np.int16) - gray.min(axis=1)
+        pieces = []
+        top = 0
+        while height - top > max_height:
+            # Última linha de menor contraste, para faixas o mais altas possível
+            high = top + max_height
+            cut = high - 1 - int(np.argmin(contrast[top + max_height // 2:high][::-1]))
+            pieces.append((x1, y1 + top, x2, y1 + cut))
+            top = cut
+        if height - top < min_height:
+            # Sobra pequena demais para o OCR: junta à faixa anterior
+            pieces[-1] = (x1, pieces[-1][1], x2, y2)
+        else:
+            pieces.append((x1, y1 + top, x2, y2))
+        return pieces
+    
+    def _ocr_region_in_pieces(self, image, region, is_code_editor=False):
+        """OCR em segundo plano de uma região, em faixas, cedendo ao trabalho interativo entre elas
+        
+        Regiões altas (painéis, listas) levam centenas de milissegundos inteiras; em faixas de até
+        `ocr_background_piece_height` pixels o trabalho interativo espera no máximo uma faixa. O texto
+        das faixas é juntado e guardado no cache sob a chave da região inteira, a mesma consultada
+        pelo quadro principal. Retorna (texto, veio_do_cache).
+        """
+        x1, y1, x2, y2 = region
+        max_height = self.config.getint('vision', 'ocr_background_piece_height', fallback=96)
+        if self.ocr_scheduler:
+            self.ocr_scheduler.wait_idle()
+        if y2 - y1 <= max_height or x2 - x1 < 20:
+            return self._ocr_single_region(image, region, is_code_editor)
+        
+        if isinstance(image, Image.Image):
+            roi_cv = cv2.cvtColor(np.array(image.crop((x1, y1, x2, y2))), cv2.COLOR_RGB2BGR)
+        else:
+            roi_cv = image[y1:y2, x1:x2]
+        region_key = self._ocr_cache_key(roi_cv, "code" if is_code_editor else "ui")
+        cached = self.ocr_cache.get(region_key)
+        if cached is not None:
+            return cached, True
+        
+        texts = []
+        gray = cv2.cvtColor(roi_cv, cv2.COLOR_BGR2GRAY)
+        for piece in self.split_region(gray, region, max_height):
+            if self.ocr_scheduler:
+                self.ocr_scheduler.wait_idle()
+            text, _ = self._ocr_single_region(image, piece, is_code_editor)
+            if text:
+                texts.append(text)
+        
+        text = " ".join(texts)
+        self._store_ocr_cache(region_key, text)
+        return text, False
+    
+    def _ocr_cache_key(self, roi_cv, mode):
+        """Gera chave de cache baseada no conteúdo dos pixels da região e no modo de OCR"""
+        roi = np.ascontiguousarray(roi_cv)
+        digest = hashlib.blake2b(roi.tobytes(), digest_size=12).hexdigest()
+        return f"{mode}_{roi.shape[1]}x{roi.shape[0]}_{digest}"
+    
+    def _store_ocr_cache(self, key, text):
+        """Armazena um resultado de OCR respeitando o tamanho máximo do cache"""
+        with self.ocr_cache_lock:
+            self.ocr_cache[key] = text
+            # Remover item mais antigo
+            while len(self.ocr_cache) > self.cache_max_size:
+                self.ocr_cache.pop(next(iter(self.ocr_cache)))
+    
+    def _record_ocr_crop(self, gray, region_key, max_crops=500):
+        """Grava recortes de OCR para comparação de backends, se configurado"""
+        folder = self.config.get('vision', 'record_ocr_crops', fallback='')
+        if not folder:
+            return
+        try:
+            os.makedirs(folder, exist_ok=True)
+            if len(os.listdir(folder)) < max_crops:
+                cv2.imwrite(os.path.join(folder, f"{region_key}.png"), gray)
+        except Exception as e:
+            logger.debug(f"Erro ao gravar recorte de OCR: {e}")
+    
+    def get_ocr_params(self, is_code_editor=False, app_name=None):
+        """Retorna os parâmetros de OCR da aplicação (padrões + seção [ocr_app:<aplicação>] da configuração)"""
+        app_name = app_name or self.current_app_name
+        cache_key = (app_name, is_code_editor)
+        params = self._ocr_params_cache.get(cache_key)
+        if params is not None:
+            return params
+        
+        params = dict(self.DEFAULT_OCR_PARAMS)
+        if is_code_editor:
+            params.update(self.CODE_OCR_PARAMS)
+        
+        # Parâmetros ajustados pelo OCRParameterTuner para esta aplicação
+        section = f"ocr_app:{app_name}"
+        if self.config.has_section(section):
+            for name, default in self.DEFAULT_OCR_PARAMS.items():
+                # Parâmetros do modo código são gravados com prefixo code_
+                option = f"code_{name}" if is_code_editor else name
+                if not self.config.has_option(section, option):
+                    continue
+                try:
+                    if isinstance(default, bool):
+                        params[name] = self.config.getboolean(section, option)
+                    elif isinstance(default, int):
+                        params[name] = self.config.getint(section, option)
+                    else:
+                        params[name] = self.config.getfloat(section, option)
+                except ValueError as e:
+                    logger.warning(f"Parâmetro de OCR inválido em [{section}] {option}: {e}")
+        
+        self._ocr_params_cache[cache_key] = params
+        return params
+    
+    def _ocr_single_region(self, image, region, is_code_editor=False, params=None, use_cache=True):
+        """Executa OCR em uma única região, retornando (texto, veio_do_cache)
+        
+        `params` substitui os parâmetros da aplicação atual (usado pelo OCRParameterTuner).
+        """
+        x1, y1, x2, y2 = region
+        params = params or self.get_ocr_params(is_code_editor)
+        
+        # Verificar se a região é grande o suficiente
+        width = x2 - x1
+        height = y2 - y1
+        if width < 20 or height < 10:  # Muito pequeno para ter texto legível
+            return "", True
+        
+        # Extrair região da imagem
+        if isinstance(image, Image.Image):
+            roi = image.crop((x1, y1, x2, y2))
+            roi_cv = cv2.cvtColor(np.array(roi), cv2.COLOR_RGB2BGR)
+        else:
+            roi_cv = image[y1:y2, x1:x2]
+        
+        # Verificar cache antes de processar (chave pelo conteúdo, válida entre capturas)
+        region_key = self._ocr_cache_key(roi_cv, "code" if is_code_editor else "ui")
+        if use_cache:
+            cached = self.ocr_cache.get(region_key)
+            if cached is not None:
+                return cached, True
+        
+        # Pré-processamento avançado da imagem
+        try:
+            # Converter para escala de cinza
+            gray = cv2.cvtColor(roi_cv, cv2.COLOR_BGR2GRAY)
+            if use_cache:
+                self._record_ocr_crop(gray, region_key)
+            
+            # Redimensionar se for muito pequena
+            upscale_min_side = params['upscale_min_side']
+            if height < upscale_min_side or width < upscale_min_side:
+                scale = max(2, upscale_min_side / min(height, width))
+                new_width = int(width * scale)
+                new_height = int(height * scale)
+                gray = cv2.resize(gray, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+            
+            # Ajuste de contraste (por padrão apenas para código-fonte)
+            if params['contrast_alpha'] != 1.0 or params['contrast_beta'] != 0:
+                gray = cv2.convertScaleAbs(gray, alpha=params['contrast_alpha'], beta=params['contrast_beta'])
+            
+            # Aumentar o contraste
+            if params['equalize']:
+                gray = cv2.equalizeHist(gray)
+            
+            # Remover ruído
+            if params['denoise']:
+                gray = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+            
+            # Limiarização adaptativa para melhorar o contraste do texto
+            block_size = params['threshold_block_size'] | 1  # Tamanho do bloco precisa ser ímpar
+            binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                        cv2.THRESH_BINARY, block_size, params['threshold_c'])
+            
+            # Configurações diferentes para editores de código vs. outros aplicativos
+            if is_code_editor:
+                # OCR com configurações específicas para código
+                ocr_result = self.ocr_router.readtext(
+                    binary, 
+                    detail=1,
+                    paragraph=False,
+                    min_size=params['min_size'],
+                    # Incluir caracteres comuns em código-fonte
+                    allowlist=self.CODE_ALLOWLIST
+                )
+            else:
+                # OCR padrão
+                ocr_result = self.ocr_router.readtext(binary, min_size=params['min_size'])
+            
+            # Processar e combinar resultados do OCR
+            if ocr_result:
+                # Agrupar fragmentos em linhas e uni-los em ordem de leitura
+                segments = OCRLineGrouper.group_segments(ocr_result)
+                
+                # Filtrar e processar resultados
+                filtered_parts = []
+                for text, conf in segments:
+                    # Filtrar textos muito curtos ou sem sentido
+                    if len(text) <= 2 or (len(text) <= 3 and not any(c.isalnum() for c in text)):
+                        continue  # Ignorar textos muito curtos ou sem caracteres alfanuméricos
+                    
+                    if conf > params['min_confidence']:  # Filtrar resultados de baixa confiança
+                        # Remover duplicações de espaços
+                        filtered_parts.append((" ".join(text.split()), conf))
+                
+                # Corrigir fragmentos de baixa confiança próximos do vocabulário de UI e juntar com um espaço
+                full_text, _ = self.correct_ocr_parts([part for part in filtered_parts if part[0]])
+            else:
+                full_text = ""
+            
+            if not use_cache:
+                return full_text, False
+            
+            # Adicionar ao cache (inclusive vazio, para não repetir OCR em regiões sem texto)
+            self._store_ocr_cache(region_key, full_text)
+            if full_text:
+                logger.info(f"OCR detectou: '{full_text}' na região {x1},{y1},{x2},{y2}")
+            
+            return full_text, False
+            
+        except Exception as e:
+            logger.error(f"Erro no OCR da região {x1},{y1},{x2},{y2}: {e}")
+            logger.debug("Detalhes do erro:", exc_info=True)
+            return "", False
+
+class OCRParameterTuner:
+    """Ajuste offline dos parâmetros de OCR por aplicação a partir de quadros gravados e rotulados
+    
+    Estrutura esperada: <frames_folder>/<aplicação>/labels.json e as imagens dos quadros, com
+    labels.json no formato {"quadro.png": [{"region": [x1, y1, x2, y2], "text": "...", "code": false}]}.
+    A busca por descida coordenada maximiza acurácia por milissegundo, sem aceitar perda de acurácia
+    maior que `max_accuracy_loss` em relação aos parâmetros padrão. Os vencedores são gravados em
+    seções [ocr_app:<aplicação>] carregadas por VisionManager.get_ocr_params.
+    
+    O nome da pasta é resolvido pelo AppProfiler como um título de janela (ex.: "Gmail" -> gmail),
+    que é a chave usada por get_ocr_params; pastas que não correspondem a nenhum perfil só são
+    aceitas com o nome "generic" e, nos demais casos, são ignoradas com um aviso.
+    """
+    
+    SEARCH_SPACE = {
+        'min_size': [5, 10, 20],
+        'upscale_min_side': [20, 30, 40],
+        'contrast_alpha': [1.0, 1.5, 2.0],
+        'contrast_beta': [0, 10, 20],
+        'equalize': [True, False],
+        'denoise': [True, False],
+        'threshold_block_size': [11, 15, 21, 31],
+        'threshold_c': [2, 5, 8],
+        'min_confidence': [0.15, 0.3, 0.5]
+    }
+    
+    def __init__(self, vision_manager, frames_folder='tuning_frames', max_accuracy_loss=0.02, passes=2):
+        self.vision_manager = vision_manager
+        self.frames_folder = frames_folder
+        self.max_accuracy_loss = max_accuracy_loss
+        self.passes = passes
+    
+    def load_samples(self, app_folder):
+        """Carrega as regiões rotuladas de uma aplicação: [(imagem, região, texto, é_código)]"""
+        labels_path = os.path.join(app_folder, 'labels.json')
+        with open(labels_path, encoding='utf-8') as f:
+            labels = json.load(f)
+        
+        samples = []
+        for frame_name, regions in labels.items():
+            image = cv2.imread(os.path.join(app_folder, frame_name))
+            if image is None:
+                logger.warning(f"Quadro não encontrado: {frame_name}")
+                continue
+            for label in regions:
+                samples.append((image, tuple(label['region']), label.get('text', ''), bool(label.get('code', False))))
+        return samples
+    
+    @staticmethod
+    def text_accuracy(predicted, expected):
+        """Acurácia por caractere: 1 - distância de edição normalizada"""
+        predicted = " ".join(predicted.lower().split())
+        expected = " ".join(expected.lower().split())
+        if not expected:
+            return 1.0 if not predicted else 0.0
+        limit = max(len(predicted), len(expected))
+        distance = OCRLexicon._edit_distance(predicted, expected, limit)
+        return max(0.0, 1.0 - distance / len(expected))
+    
+    def evaluate(self, samples, params, is_code_editor):
+        """Retorna (acurácia média, milissegundos médios por região) para um conjunto de parâmetros"""
+        total_accuracy = 0.0
+        start_time = time.perf_counter()
+        for image, region, expected, _ in samples:
+            text, _ = self.vision_manager._ocr_single_region(image, region, is_code_editor,
+                                                             params=params, use_cache=False)
+            total_accuracy += self.text_accuracy(text, expected)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        return total_accuracy / len(samples), elapsed_ms / len(samples)
+    
+    def tune(self, samples, is_code_editor):
+        """Busca por descida coordenada os parâmetros com melhor acurácia por milissegundo"""
+        best_params = dict(self.vision_manager.DEFAULT_OCR_PARAMS)
+        if is_code_editor:
+            best_params.update(self.vision_manager.CODE_OCR_PARAMS)
+        
+        baseline_accuracy, baseline_ms = self.evaluate(samples, best_params, is_code_editor)
+        min_accuracy = baseline_accuracy - self.max_accuracy_loss
+        best_accuracy, best_ms = baseline_accuracy, baseline_ms
+        best_score = best_accuracy / max(best_ms, 1e-3)
+        
+        for _ in range(self.passes):
+            improved = False
+            for name, values in self.SEARCH_SPACE.items():
+                for value in values:
+                    if value == best_params[name]:
+                        continue
+                    candidate = dict(best_params, **{name: value})
+                    accuracy, ms = self.evaluate(samples, candidate, is_code_editor)
+                    score = accuracy / max(ms, 1e-3)
+                    if accuracy >= min_accuracy and score > best_score:
+                        best_params, best_accuracy, best_ms, best_score = candidate, accuracy, ms, score
+                        improved = True
+            if not improved:
+                break
+        
+        report = {
+            'baseline': (round(baseline_accuracy, 3), round(baseline_ms, 1)),
+            'tuned': (round(best_accuracy, 3), round(best_ms, 1)),
+            'samples': len(samples)
+        }
+        return best_params, report
+    
+    def run(self, config_file='ai_screen_reader.ini'):
+        """Ajusta todas as aplicações com quadros gravados e grava os parâmetros na configuração"""
+        if not os.path.isdir(self.frames_folder):
+            logger.error(f"Pasta de quadros para ajuste não encontrada: {self.frames_folder}")
+            return {}
+        
+        config = configparser.ConfigParser()
+        config.read(config_file)
+        
+        reports = {}
+        app_profiler = self.vision_manager.app_profiler
+        for folder_name in sorted(os.listdir(self.frames_folder)):
+            app_folder = os.path.join(self.frames_folder, folder_name)
+            if not os.path.isfile(os.path.join(app_folder, 'labels.json')):
+                continue
+            
+            # Seção com a mesma chave que get_ocr_params procura (a aplicação do AppProfiler)
+            app_name, _ = app_profiler.get_app_profile(folder_name)
+            if app_name == "generic" and folder_name.lower() != "generic":
+                logger.warning(f"Pasta de ajuste '{folder_name}' não corresponde a nenhuma aplicação do "
+                               f"AppProfiler ({', '.join(app_profiler.app_profiles)}); use um desses nomes "
+                               f"ou 'generic'")
+                continue
+            
+            samples = self.load_samples(app_folder)
+            section = f"ocr_app:{app_name}"
+            if not config.has_section(section):
+                config.add_section(section)
+            
+            for is_code_editor in (False, True):
+                mode_samples = [sample for sample in samples if sample[3] == is_code_editor]
+                if not mode_samples:
+                    continue
+                
+                params, report = self.tune(mode_samples, is_code_editor)
+                prefix = "code_" if is_code_editor else ""
+                for name in self.SEARCH_SPACE:
+                    config.set(section, prefix + name, str(params[name]).lower() if isinstance(params[name], bool)
+                               else str(params[name]))
+                
+                reports[f"{app_name}{' (código)' if is_code_editor else ''}"] = report
+                logger.info(f"Parâmetros de OCR ajustados para {app_name}: {report}")
+        
+        with open(config_file, 'w') as f:
+            config.write(f)
+        
+        return reports
+
+class LayoutAtlas:
+    """Atlas de layout aprendido por aplicação e tamanho de janela
+    
+    Barras de ferramentas, abas e painéis laterais das aplicações mais usadas ficam sempre nas mesmas
+    posições. Cada caixa de elemento lida por OCR é registrada em coordenadas relativas à janela, com
+    o texto, o tipo e o hash dos seus pixels; depois de `min_hits` leituras independentes com o mesmo
+    texto ela passa a ser confirmada. Como o cache de OCR também é indexado pelo hash dos pixels, só
+    leituras feitas fora do cache contam: as do quadro principal que não vieram do cache e as
+    verificações sem cache feitas pelo IdlePrefetcher (`candidates`/`confirm`). Em quadros seguintes,
+    caixas confirmadas cujo hash confere são anunciadas direto do atlas, sem OCR nem classificação.
+    O atlas é gravado em JSON por uma thread própria (`start_autosave`) e ao encerrar, nunca durante
+    a captura, e recarregado entre sessões.
+    """
+    
+    def __init__(self, path='layout_atlas.json', min_hits=3, max_entries=300, max_layouts=64,
+                 save_interval=60.0):
+        self.path = path
+        self.min_hits = min_hits
+        self.max_entries = max_entries
+        self.max_layouts = max_layouts
+        self.save_interval = save_interval
+        
+        self.layouts = OrderedDict()  # "aplicação|LxA" -> {"x1,y1,x2,y2": entrada}
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.last_save = time.time()
+        self.stats = {'hits': 0, 'mismatches': 0, 'recorded': 0, 'confirmed': 0, 'rejected': 0}
+        self.autosave_thread = None
+        self.load()
+    
+    @staticmethod
+    def app_key(foreground):
+        """Nome usado no atlas: aplicações sem perfil são separadas pela classe da janela"""
+        if foreground.app_name != "generic":
+            return foreground.app_name
+        return foreground.class_name or "generic"
+    
+    @staticmethod
+    def layout_key(app_name, window_rect):
+        return f"{app_name}|{window_rect[2] - window_rect[0]}x{window_rect[3] - window_rect[1]}"
+    
+    @staticmethod
+    def _crop(image, box):
+        """Recorte local da imagem, ou None se a caixa não estiver inteira dentro dela"""
+        x1, y1, x2, y2 = box
+        if x1 < 0 or y1 < 0 or x2 > image.shape[1] or y2 > image.shape[0] or x2 <= x1 or y2 <= y1:
+            return None
+        return image[y1:y2, x1:x2]
+    
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            with self.lock:
+                self.layouts = OrderedDict((key, entries) for key, entries in data.get('layouts', {}).items())
+            logger.info(f"Atlas de layout carregado: {len(self.layouts)} layouts")
+        except Exception as e:
+            logger.error(f"Erro ao carregar atlas de layout: {e}")
+    
+    def save(self, force=False):
+        """Grava o atlas se houver alterações (no máximo a cada `save_interval`, salvo com `force`)"""
+        if not self.path or not self.dirty:
+            return
+        if not force and time.time() - self.last_save < self.save_interval:
+            return
+        try:
+            with self.lock:
+                data = {'version': 1, 'layouts': dict(self.layouts)}
+                self.dirty = False
+                self.last_save = time.time()
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.error(f"Erro ao gravar atlas de layout: {e}")
+    
+    def start_autosave(self):
+        """Grava o atlas periodicamente em uma thread própria, fora do caminho de captura"""
+        if self.autosave_thread or not self.path:
+            return
+        
+        def loop():
+            while True:
+                time.sleep(self.save_interval)
+                self.save()
+        
+        self.autosave_thread = threading.Thread(target=loop, name="LayoutAtlasSave", daemon=True)
+        self.autosave_thread.start()
+    
+    def lookup(self, app_name, window_rect, image, origin=(0, 0)):
+        """Elementos confirmados da imagem cujo hash de pixels ainda confere (coordenadas locais)"""
+        elements = []
+        offset_x = window_rect[0] - origin[0]
+        offset_y = window_rect[1] - origin[1]
+        with self.lock:
+            entries = self.layouts.get(self.layout_key(app_name, window_rect))
+            if not entries:
+                return elements
+            self.layouts.move_to_end(self.layout_key(app_name, window_rect))
+            
+            for entry in entries.values():
+                if entry['hits'] < self.min_hits:
+                    continue
+                x1, y1, x2, y2 = entry['box']
+                box = (x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y)
+                crop = self._crop(image, box)
+                if crop is None:
+                    continue
+                if WindowStateCache.hash_pixels(crop) != entry['hash']:
+                    self.stats['mismatches'] += 1
+                    continue
+                
+                self.stats['hits'] += 1
+                elements.append(UIElement(
+                    UIElementType[entry['type']],
+                    box,
+                    text=entry['text'],
+                    confidence=0.9,
+                    accessibility_id="layout_atlas"
+                ))
+        return elements
+    
+    @staticmethod
+    def covers(elements, box):
+        """Verifica se a caixa está contida em algum dos elementos (já resolvidos pelo atlas)"""
+        return any(elem.position[0] <= box[0] and elem.position[1] <= box[1] and
+                   elem.position[2] >= box[2] and elem.position[3] >= box[3] for elem in elements)
+    
+    def record(self, app_name, window_rect, image, elements, origin=(0, 0), fresh=None):
+        """Registra as caixas lidas por OCR
+        
+        `fresh` indica, por elemento, se o texto veio de uma leitura fora do cache de OCR; só essas
+        leituras contam para confirmar uma entrada com o mesmo texto e hash. Leituras do cache apenas
+        renovam a entrada. Sem `fresh`, todas as leituras são tratadas como independentes.
+        """
+        offset_x = window_rect[0] - origin[0]
+        offset_y = window_rect[1] - origin[1]
+        now = time.time()
+        key = self.layout_key(app_name, window_rect)
+        
+        with self.lock:
+            entries = self.layouts.get(key)
+            if entries is None:
+                entries = self.layouts[key] = {}
+                while len(self.layouts) > self.max_layouts:
+                    self.layouts.popitem(last=False)
+            self.layouts.move_to_end(key)
+            
+            for i, elem in enumerate(elements):
+                text = (elem.text or "").strip()
+                if len(text) < 2:
+                    continue
+                independent = fresh is None or (i < len(fresh) and fresh[i])
+                crop = self._crop(image, elem.position)
+                if crop is None:
+                    continue
+                
+                box = [elem.position[0] - offset_x, elem.position[1] - offset_y,
+                       elem.position[2] - offset_x, elem.position[3] - offset_y]
+                box_key = ",".join(str(value) for value in box)
+                pixel_hash = WindowStateCache.hash_pixels(crop)
+                entry = entries.get(box_key)
+                
+                if entry and entry['hash'] == pixel_hash and entry['text'] == text:
+                    if independent:
+                        entry['hits'] += 1
+                    entry['last_seen'] = now
+                else:
+                    entries[box_key] = {'box': box, 'text': text, 'type': elem.element_type.name,
+                                        'hash': pixel_hash, 'hits': 1 if independent else 0, 'last_seen': now}
+                    self.stats['recorded'] += 1
+                self.dirty = True
+            
+            # Descartar primeiro as entradas menos confirmadas e mais antigas
+            if len(entries) > self.max_entries:
+                ranked = sorted(entries, key=lambda k: (entries[k]['hits'], entries[k]['last_seen']))
+                for box_key in ranked[:len(entries) - self.max_entries]:
+                    del entries[box_key]
+    
+    def candidates(self, app_name, window_rect, image, origin=(0, 0), limit=3):
+        """Entradas ainda não confirmadas cujo hash confere com a imagem: [(chave, caixa local)]"""
+        offset_x = window_rect[0] - origin[0]
+        offset_y = window_rect[1] - origin[1]
+        found = []
+        with self.lock:
+            entries = self.layouts.get(self.layout_key(app_name, window_rect))
+            if not entries:
+                return found
+            # As mais próximas da confirmação primeiro
+            pending = sorted((k for k, e in entries.items() if e['hits'] < self.min_hits),
+                             key=lambda k: -entries[k]['hits'])
+            for box_key in pending:
+                x1, y1, x2, y2 = entries[box_key]['box']
+                box = (x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y)
+                crop = self._crop(image, box)
+                if crop is None or WindowStateCache.hash_pixels(crop) != entries[box_key]['hash']:
+                    continue
+                found.append((box_key, box))
+                if len(found) >= limit:
+                    break
+        return found
+    
+    def confirm(self, app_name, window_rect, box_key, text):
+        """Aplica uma leitura sem cache a uma entrada: texto igual confirma, diferente reinicia a contagem"""
+        text = (text or "").strip()
+        with self.lock:
+            entries = self.layouts.get(self.layout_key(app_name, window_rect))
+            entry = entries.get(box_key) if entries else None
+            if entry is None:
+                return False
+            if entry['text'] == text:
+                entry['hits'] += 1
+                entry['last_seen'] = time.time()
+                self.stats['confirmed'] += 1
+                agreed = True
+            elif len(text) >= 2:
+                entry['text'] = text
+                entry['hits'] = 0
+                self.stats['rejected'] += 1
+                agreed = False
+            else:
+                del entries[box_key]
+                self.stats['rejected'] += 1
+                agreed = False
+            self.dirty = True
+        return agreed
+
+class CodeLineGrid:
+    """Modo de grade de linhas para editores de código e terminais
+    
+    O espaçamento entre linhas (pitch) é medido uma vez por janela a partir do perfil horizontal de
+    tinta, e a calha de números de linha (só em editores) é aprendida das linhas lidas. A cada
+    quadro o texto é fatiado em linhas inteiras e cada linha é armazenada em cache pelo hash dos
+    seus pixels, de modo que só as linhas alteradas voltam ao OCR.
+    """
+    
+    def __init__(self, max_cached_lines=2000, min_pitch=10, max_pitch=60):
+        self.layouts = {}  # janela -> {'pitch': int, 'gutter_right': x absoluto ou None}
+        self.line_cache = OrderedDict()  # hash da linha -> (texto, esquerda, direita) na faixa
+        self.max_cached_lines = max_cached_lines
+        self.min_pitch = min_pitch
+        self.max_pitch = max_pitch
+        self.stats = {'lines_read': 0, 'lines_cached': 0}
+    
+    @staticmethod
+    def ink_mask(gray):
+        """Máscara de pixels de texto; a classe minoritária após Otsu é tratada como tinta (tema claro ou escuro)"""
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        mask = binary > 0
+        if np.count_nonzero(mask) > mask.size / 2:
+            mask = ~mask
+        return mask
+    
+    def estimate_pitch(self, row_ink):
+        """Estima o espaçamento entre linhas a partir das faixas horizontais com tinta"""
+        rows = row_ink.astype(np.int8)
+        starts = np.flatnonzero(np.diff(rows) == 1) + 1
+        if len(starts) < 3:
+            return None
+        
+        gaps = np.diff(starts)
+        gaps = gaps[(gaps >= self.min_pitch) & (gaps <= self.max_pitch * 3)]
+        if len(gaps) < 2:
+            return None
+        
+        # O salto mais frequente corresponde a linhas consecutivas com texto
+        pitch = int(np.bincount(gaps).argmax())
+        if pitch > self.max_pitch:
+            return None
+        
+        # Linhas vazias geram saltos múltiplos do pitch; a grade é válida se quase todos forem múltiplos
+        remainders = np.minimum(gaps % pitch, pitch - gaps % pitch)
+        if np.mean(remainders <= 2) < 0.7:
+            return None
+        return pitch
+    
+    def find_lines(self, gray, window_key):
+        """Fatia a imagem em linhas da grade, retornando (layout, [(topo, base)]) ou (layout, None)"""
+        mask = self.ink_mask(gray)
+        height, width = mask.shape
+        row_counts = mask.sum(axis=1)
+        row_ink = row_counts > max(2, width * 0.002)
+        
+        layout = self.layouts.get(window_key)
+        if layout is None:
+            pitch = self.estimate_pitch(row_ink)
+            if pitch is None:
+                return None, None
+            layout = {'pitch': pitch, 'gutter_right': None}
+            self.layouts[window_key] = layout
+            logger.info(f"Grade de linhas detectada para a janela: espaçamento de {pitch} pixels")
+        
+        pitch = layout['pitch']
+        if height < pitch * 2:
+            return layout, None
+        
+        # Fase da grade: deslocamento (mod pitch) com menos tinta marca a fronteira entre linhas
+        usable = (height // pitch) * pitch
+        folded = row_counts[:usable].reshape(-1, pitch).sum(axis=0)
+        phase = int(np.argmin(folded))
+        
+        # Fronteiras com muita tinta indicam que a região não é uma grade de texto (botões, painéis)
+        if folded.max() == 0 or folded[phase] > 0.25 * folded.max():
+            return layout, None
+        
+        lines = []
+        for top in range(phase, height - pitch + 1, pitch):
+            bottom = top + pitch
+            if row_ink[top:bottom].any():
+                lines.append((top, bottom))
+        return layout, lines
+    
+    def line_key(self, strip):
+        """Chave de cache da linha pelo hash dos seus pixels"""
+        strip = np.ascontiguousarray(strip)
+        digest = hashlib.blake2b(strip.tobytes(), digest_size=12).hexdigest()
+        return f"{strip.shape[1]}x{strip.shape[0]}_{digest}"
+    
+    def get_cached(self, key):
+        entry = self.line_cache.get(key)
+        if entry is not None:
+            self.line_cache.move_to_end(key)
+            self.stats['lines_cached'] += 1
+        return entry
+    
+    def store(self, key, entry):
+        self.line_cache[key] = entry
+        self.line_cache.move_to_end(key)
+        while len(self.line_cache) > self.max_cached_lines:
+            self.line_cache.popitem(last=False)
+        self.stats['lines_read'] += 1
+    
+    @staticmethod
+    def covers(lines, box):
+        """Verifica se o centro da caixa cai no texto de alguma linha já lida pela grade"""
+        center_x = (box[0] + box[2]) / 2
+        center_y = (box[1] + box[3]) / 2
+        return any(line.position[0] <= center_x <= line.position[2] and
+                   line.position[1] <= center_y <= line.position[3] for line in lines)
+    
+    def split_gutter(self, layout, lines, origin_x):
+        """Remove os números de linha do início das linhas e fixa a posição da calha (coordenada absoluta)
+        
+        `lines` são as linhas lidas no quadro, de cima para baixo, cada uma com os fragmentos do
+        OCRLineGrouper (esquerda, topo, direita, base, texto, conf). A calha só é aceita quando a
+        maioria das linhas começa com um número alinhado à direita e os números crescem de uma linha
+        para a seguinte; textos que apenas começam com números ("3 files changed") ficam intactos.
+        """
+        candidates = []  # (índice da linha, número, borda direita absoluta)
+        for index, fragments in enumerate(lines):
+            if not fragments:
+                continue
+            first = fragments[0]
+            number = first[4].strip()
+            if number.isdecimal() and (len(fragments) == 1 or fragments[1][0] - first[2] >= 8):
+                candidates.append((index, int(number), origin_x + first[2]))
+        
+        if len(candidates) < max(2, len(lines) / 2):
+            return lines
+        rights = [right for _, _, right in candidates]
+        if max(rights) - min(rights) > 6:
+            return lines
+        if any(following[1] <= previous[1] for previous, following in zip(candidates, candidates[1:])):
+            return lines
+        
+        layout['gutter_right'] = max(rights) + 4
+        logger.info(f"Calha de números de linha detectada em x={layout['gutter_right']}")
+        numbered = {index for index, _, _ in candidates}
+        return [fragments[1:] if index in numbered else fragments for index, fragments in enumerate(lines)]
+
+class OCRInferenceBackend:
+    """Substitui os módulos eager do easyOCR (detector CRAFT e reconhecedor) por versões otimizadas para CPU
+    
+    Backends suportados (opção `ocr_backend` da seção [vision]):
+    - eager: módulos PyTorch originais
+    - torchscript: módulos rastreados (torch.jit.trace + freeze), executados em inference_mode
+    - onnx: grafos exportados para ONNX Runtime com otimizações de grafo, com cache em disco por
+      módulo, rede de reconhecimento e idiomas
+    
+    Cada módulo convertido é comparado ao original com uma entrada de tamanho diferente do usado na
+    exportação; se a saída divergir, aquele módulo continua no modo eager.
+    """
+    
+    BACKENDS = ('eager', 'torchscript', 'onnx')
+    
+    def __init__(self, backend='eager', cache_folder=os.path.join('models', 'ocr_backend'), num_threads=0):
+        self.backend = backend if backend in self.BACKENDS else 'eager'
+        self.cache_folder = cache_folder
+        self.num_threads = num_threads
+        self.status = {'detector': 'eager', 'recognizer': 'eager'}
+    
+    @staticmethod
+    def model_key(reader):
+        """Identifica os pesos do leitor (rede de reconhecimento e idiomas) no nome do cache ONNX"""
+        parts = [getattr(reader, 'recog_network', None), getattr(reader, 'model_lang', None)]
+        parts.extend(sorted(getattr(reader, 'lang_list', None) or []))
+        return re.sub(r'[^\w.-]+', '_', "_".join(str(part) for part in parts if part))
+    
+    def apply(self, reader):
+        """Aplica o backend configurado ao leitor easyOCR, retornando o status de cada módulo"""
+        self.status = {'detector': 'eager', 'recognizer': 'eager'}
+        if reader is None or self.backend == 'eager':
+            return self.status
+        
+        model_key = self.model_key(reader)
+        for attribute, sample_inputs in (('detector', self._detector_samples),
+                                         ('recognizer', self._recognizer_samples)):
+            eager_module = getattr(reader, attribute, None)
+            if eager_module is None:
+                continue
+            try:
+                # DataParallel (GPU) não é suportado; apenas módulos simples em CPU
+                if isinstance(eager_module, torch.nn.DataParallel):
+                    logger.info(f"Backend {self.backend} ignorado para {attribute} (DataParallel)")
+                    continue
+                
+                eager_module.eval()
+                export_input, probe_input = sample_inputs()
+                if attribute == 'recognizer':
+                    eager_module = _ImageOnlyRecognizer(eager_module)
+                
+                if self.backend == 'torchscript':
+                    optimized = self._build_torchscript(eager_module, export_input)
+                else:
+                    optimized = self._build_onnx(eager_module, export_input, f"{attribute}_{model_key}")
+                
+                if not self._check_parity(eager_module, optimized, probe_input):
+                    logger.warning(f"Backend {self.backend} divergiu do original para {attribute}; mantendo eager")
+                    continue
+                
+                if attribute == 'recognizer':
+                    optimized = _TextArgumentAdapter(optimized)
+                setattr(reader, attribute, optimized)
+                self.status[attribute] = self.backend
+            except Exception as e:
+                logger.warning(f"Não foi possível aplicar backend {self.backend} ao {attribute}: {e}")
+        
+        logger.info(f"Backend de inferência do OCR: {self.status}")
+        return self.status
+    
+    @staticmethod
+    def _detector_samples():
+        """Entradas de exportação e de verificação para o detector CRAFT (N, 3, H, W)"""
+        return torch.rand(1, 3, 320, 480), torch.rand(1, 3, 256, 640)
+    
+    @staticmethod
+    def _recognizer_samples():
+        """Entradas de exportação e de verificação para o reconhecedor (N, 1, 64, W)"""
+        return torch.rand(2, 1, 64, 256), torch.rand(3, 1, 64, 160)
+    
+    def _build_torchscript(self, module, example_input):
+        """Rastreia e congela o módulo para execução em CPU"""
+        with torch.inference_mode():
+            traced = torch.jit.trace(module, example_input, check_trace=False)
+        frozen = torch.jit.freeze(traced.eval())
+        return _InferenceModeModule(frozen)
+    
+    def _build_onnx(self, module, example_input, name):
+        """Exporta o módulo para ONNX (com eixos dinâmicos) e abre uma sessão do ONNX Runtime"""
+        import onnxruntime
+        
+        os.makedirs(self.cache_folder, exist_ok=True)
+        model_path = os.path.join(self.cache_folder, f"{name}.onnx")
+        if not os.path.exists(model_path):
+            logger.info(f"Exportando {name} do OCR para ONNX: {model_path}")
+            with torch.no_grad():
+                torch.onnx.export(
+                    module, example_input, model_path,
+                    input_names=['input'],
+                    dynamic_axes={'input': {0: 'batch', 2: 'height', 3: 'width'}},
+                    opset_version=17
+                )
+        
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads > 0:
+            options.intra_op_num_threads = self.num_threads
+        session = onnxruntime.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        return _OnnxRuntimeModule(session)
+    
+    @staticmethod
+    def _check_parity(eager_module, optimized_module, probe_input, tolerance=1e-3):
+        """Compara as saídas do módulo original e do otimizado em uma entrada de verificação"""
+        with torch.inference_mode():
+            expected = eager_module(probe_input)
+            actual = optimized_module(probe_input)
+        
+        expected = expected if isinstance(expected, (tuple, list)) else (expected,)
+        actual = actual if isinstance(actual, (tuple, list)) else (actual,)
+        if len(expected) != len(actual):
+            return False
+        return all(e.shape == a.shape and torch.allclose(e, a, atol=tolerance, rtol=tolerance)
+                   for e, a in zip(expected, actual))
+
+
+class _InferenceModeModule(torch.nn.Module):
+    """Executa um módulo TorchScript dentro de torch.inference_mode"""
+    
+    def __init__(self, scripted):
+        super().__init__()
+        self.scripted = scripted
+    
+    def forward(self, *inputs):
+        with torch.inference_mode():
+            return self.scripted(*inputs)
+
+
+class _OnnxRuntimeModule(torch.nn.Module):
+    """Adapta uma sessão do ONNX Runtime à interface de módulo PyTorch usada pelo easyOCR"""
+    
+    def __init__(self, session):
+        super().__init__()
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+    
+    def forward(self, image):
+        outputs = self.session.run(None, {self.input_name: image.detach().cpu().numpy()})
+        tensors = tuple(torch.from_numpy(output) for output in outputs)
+        return tensors if len(tensors) > 1 else tensors[0]
+
+
+class _ImageOnlyRecognizer(torch.nn.Module):
+    """Reconhecedor CTC do easyOCR com entrada única (o argumento de texto não é usado na predição)"""
+    
+    def __init__(self, recognizer):
+        super().__init__()
+        self.recognizer = recognizer
+    
+    def forward(self, image):
+        return self.recognizer(image, None)
+
+
+class _TextArgumentAdapter(torch.nn.Module):
+    """Restaura a assinatura recognizer(image, text) esperada pelo easyOCR"""
+    
+    def __init__(self, module):
+        super().__init__()
+        self.module = module
+    
+    def forward(self, image, text=None):
+        return self.module(image)
+
+class OCREngine(ABC):
+    """Interface comum para motores de OCR, com estatísticas de latência e confiança
+    
+    `min_size=None` mantém o tamanho mínimo padrão do motor; o valor só é repassado quando informado.
+    """
+    
+    name = "base"
+    
+    def __init__(self):
+        self.stats = {'calls': 0, 'total_ms': 0.0, 'empty': 0, 'confidence_sum': 0.0, 'fragments': 0}
+        self.stats_lock = threading.Lock()
+    
+    @property
+    def available(self):
+        return False
+    
+    @abstractmethod
+    def _readtext(self, image, allowlist=None, min_size=None, **kwargs):
+        """Implementação específica do motor; retorna [(bbox, texto, confiança)]"""
+    
+    def readtext(self, image, allowlist=None, min_size=None, **kwargs):
+        """Executa o OCR e registra latência e confiança média do motor"""
+        start_time = time.perf_counter()
+        results = self._readtext(image, allowlist=allowlist, min_size=min_size, **kwargs)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        
+        with self.stats_lock:
+            self.stats['calls'] += 1
+            self.stats['total_ms'] += elapsed_ms
+            if not results:
+                self.stats['empty'] += 1
+            for _, _, conf in results:
+                self.stats['confidence_sum'] += conf
+                self.stats['fragments'] += 1
+        
+        return results
+    
+    def get_stats(self):
+        """Resumo das estatísticas: latência média (ms), confiança média e taxa de resultados vazios"""
+        with self.stats_lock:
+            calls = self.stats['calls']
+            fragments = self.stats['fragments']
+            return {
+                'calls': calls,
+                'mean_ms': round(self.stats['total_ms'] / calls, 1) if calls else 0.0,
+                'mean_confidence': round(self.stats['confidence_sum'] / fragments, 2) if fragments else 0.0,
+                'empty_rate': round(self.stats['empty'] / calls, 2) if calls else 0.0
+            }
+
+
+class EasyOCREngine(OCREngine):
+    """Motor neural easyOCR: detector + reconhecedor, indicado para rótulos pequenos e estilizados"""
+    
+    name = "easyocr"
+    
+    def __init__(self, reader_provider):
+        super().__init__()
+        # Função que retorna o leitor atual (pode ser substituído pela recuperação de erros)
+        self.reader_provider = reader_provider
+    
+    @property
+    def available(self):
+        return self.reader_provider() is not None
+    
+    def _readtext(self, image, allowlist=None, min_size=None, **kwargs):
+        if min_size is not None:
+            kwargs['min_size'] = min_size
+        return self.reader_provider().readtext(image, allowlist=allowlist, **kwargs)
+
+
+class TesseractEngine(OCREngine):
+    """Motor Tesseract (pytesseract), rápido para blocos grandes de texto limpo e binarizado"""
+    
+    name = "tesseract"
+    
+    def __init__(self, languages="por+eng", page_segmentation_mode=6):
+        super().__init__()
+        self.languages = languages
+        self.page_segmentation_mode = page_segmentation_mode
+        
+        try:
+            import pytesseract
+            pytesseract.get_tesseract_version()
+            self.pytesseract = pytesseract
+            logger.info("Motor OCR Tesseract disponível")
+        except Exception as e:
+            logger.info(f"Motor OCR Tesseract indisponível: {e}")
+            self.pytesseract = None
+    
+    @property
+    def available(self):
+        return self.pytesseract is not None
+    
+    def _readtext(self, image, allowlist=None, min_size=None, **kwargs):
+        tess_config = f"--psm {self.page_segmentation_mode}"
+        if allowlist:
+            tess_config += f" -c tessedit_char_whitelist={allowlist}"
+        
+        data = self.pytesseract.image_to_data(
+            image, lang=self.languages, config=tess_config, output_type=self.pytesseract.Output.DICT
+        )
+        
+        # Converter para o formato do easyOCR: bbox de quatro pontos, texto, confiança (0-1)
+        results = []
+        for i, text in enumerate(data['text']):
+            conf = float(data['conf'][i])
+            if not text.strip() or conf < 0:
+                continue
+            x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
+            # Mesmo critério do detector do easyOCR: maior lado da caixa abaixo de min_size
+            if min_size is not None and max(w, h) < min_size:
+                continue
+            bbox = [[x, y], [x + w, y], [x + w, y + h], [x, y + h]]
+            results.append((bbox, text, conf / 100.0))
+        return results
+
+
+class OCREngineRouter:
+    """Encaminha cada região para o motor de OCR de melhor custo-benefício segundo regras configuráveis
+    
+    Regiões grandes, de alto contraste ou já binarizadas vão para o motor de texto limpo
+    (Tesseract, se instalado); rótulos pequenos e estilizados ficam com o motor padrão (easyOCR).
+    """
+    
+    def __init__(self, config, engines):
+        self.config = config
+        self.engines = {engine.name: engine for engine in engines}
+        self.default_engine = config.get('ocr_engines', 'default_engine', fallback='easyocr')
+        self.clean_text_engine = config.get('ocr_engines', 'clean_text_engine', fallback='tesseract')
+        self.large_min_width = config.getint('ocr_engines', 'large_text_min_width', fallback=200)
+        self.large_min_height = config.getint('ocr_engines', 'large_text_min_height', fallback=40)
+        self.min_binary_ratio = config.getfloat('ocr_engines', 'min_binary_ratio', fallback=0.9)
+        self._routed_calls = 0
+    
+    def _is_clean_text_block(self, image):
+        """Verifica se a imagem é um bloco de texto grande e de alto contraste"""
+        if image.ndim != 2:
+            return False
+        height, width = image.shape
+        if width < self.large_min_width or height < self.large_min_height:
+            return False
+        
+        # Fração de pixels próximos do preto ou do branco (amostragem para manter o custo baixo)
+        sample = image[::4, ::4]
+        extremes = np.count_nonzero((sample < 40) | (sample > 215))
+        return extremes >= self.min_binary_ratio * sample.size
+    
+    def select_engine(self, image, allowlist=None):
+        """Escolhe o motor para a imagem; cai para o padrão se o preferido estiver indisponível"""
+        engine_name = self.default_engine
+        if allowlist is None and self._is_clean_text_block(image):
+            engine_name = self.clean_text_engine
+        
+        engine = self.engines.get(engine_name)
+        if engine is None or not engine.available:
+            engine = self.engines.get(self.default_engine)
+        return engine
+    
+    def readtext(self, image, allowlist=None, min_size=None, **kwargs):
+        """Executa o OCR no motor selecionado para a imagem"""
+        engine = self.select_engine(image, allowlist)
+        if engine is None or not engine.available:
+            return []
+        
+        self._routed_calls += 1
+        if self._routed_calls % 100 == 0:
+            logger.info(f"Estatísticas dos motores de OCR: {self.get_stats()}")
+        
+        try:
+            return engine.readtext(image, allowlist=allowlist, min_size=min_size, **kwargs)
+        except Exception as e:
+            fallback = self.engines.get(self.default_engine)
+            if engine is fallback or fallback is None or not fallback.available:
+                raise
+            logger.debug(f"Motor OCR {engine.name} falhou, usando {fallback.name}: {e}")
+            return fallback.readtext(image, allowlist=allowlist, min_size=min_size, **kwargs)
+    
+    def get_stats(self):
+        """Estatísticas de latência e confiança de cada motor"""
+        return {name: engine.get_stats() for name, engine in self.engines.items()}
+
+class OCRScheduler:
+    """Agenda OCR priorizando regiões próximas ao cursor e completa o restante em segundo plano"""
+    
+    def __init__(self, ocr_function, cpu_budget=0.3, max_pending=64):
+        # Função chamada para cada região: ocr_function(image, region, is_code_editor)
+        self.ocr_function = ocr_function
+        # Fração máxima de um núcleo de CPU usada pelo trabalho em segundo plano
+        self.cpu_budget = min(1.0, max(0.05, cpu_budget))
+        self.max_pending = max_pending
+        
+        self.pending = queue.Queue()
+        self.generation = 0
+        self.generation_lock = threading.Lock()
+        
+        # Contador de trabalhos interativos em andamento (segundo plano cede a eles)
+        self.interactive_count = 0
+        self.idle_event = threading.Event()
+        self.idle_event.set()
+        self.last_interactive_time = 0.0
+        
+        self.stats = {'background_processed': 0, 'background_discarded': 0}
+        
+        self.worker = threading.Thread(target=self._worker_loop, name="OCRScheduler", daemon=True)
+        self.worker.start()
+    
+    @staticmethod
+    def order_by_distance(regions, focus_point):
+        """Retorna os índices das regiões ordenados pela distância ao ponto de foco"""
+        if focus_point is None:
+            return list(range(len(regions)))
+        
+        fx, fy = focus_point
+        
+        def distance_key(index):
+            x1, y1, x2, y2 = regions[index]
+            # Distância do ponto à caixa (zero se o ponto estiver dentro)
+            dx = max(x1 - fx, 0, fx - x2)
+            dy = max(y1 - fy, 0, fy - y2)
+            # Em caso de empate, preferir a caixa menor (mais específica)
+            return (dx * dx + dy * dy, (x2 - x1) * (y2 - y1))
+        
+        return sorted(range(len(regions)), key=distance_key)
+    
+    def begin_interactive(self):
+        """Sinaliza início de trabalho interativo; o segundo plano pausa até o fim"""
+        with self.generation_lock:
+            self.interactive_count += 1
+            self.idle_event.clear()
+            self.last_interactive_time = time.time()
+    
+    def end_interactive(self):
+        """Sinaliza fim de trabalho interativo"""
+        with self.generation_lock:
+            self.interactive_count = max(0, self.interactive_count - 1)
+            self.last_interactive_time = time.time()
+            if self.interactive_count == 0:
+                self.idle_event.set()
+    
+    def note_interaction(self):
+        """Registra atividade do usuário, adiando o trabalho feito apenas em ociosidade"""
+        self.last_interactive_time = time.time()
+    
+    def wait_idle(self):
+        """Bloqueia enquanto houver trabalho interativo em andamento"""
+        self.idle_event.wait()
+    
+    def throttle(self, elapsed):
+        """Dorme proporcionalmente ao tempo gasto em segundo plano para respeitar o orçamento de CPU"""
+        time.sleep(elapsed * (1.0 - self.cpu_budget) / self.cpu_budget)
+    
+    def submit_background(self, image, regions, is_code_editor=False):
+        """Enfileira regiões para OCR em segundo plano, descartando lotes anteriores"""
+        with self.generation_lock:
+            self.generation += 1
+            generation = self.generation
+        
+        for region in regions[:self.max_pending]:
+            self.pending.put((generation, image, region, is_code_editor))
+        
+        if len(regions) > self.max_pending:
+            self.stats['background_discarded'] += len(regions) - self.max_pending
+    
+    def _worker_loop(self):
+        """Processa a fila em segundo plano respeitando o orçamento de CPU"""
+        while True:
+            generation, image, region, is_code_editor = self.pending.get()
+            
+            # Lote substituído por uma captura mais recente
+            if generation != self.generation:
+                self.stats['background_discarded'] += 1
+                continue
+            
+            # Ceder enquanto houver trabalho interativo (a função de OCR cede também entre as faixas)
+            self.wait_idle()
+            
+            start_time = time.perf_counter()
+            try:
+                self.ocr_function(image, region, is_code_editor)
+                self.stats['background_processed'] += 1
+            except Exception as e:
+                logger.debug(f"Erro no OCR em segundo plano: {e}")
+            
+            # Dormir proporcionalmente ao tempo gasto para limitar o uso de CPU
+            self.throttle(time.perf_counter() - start_time)
+
+class WindowStateCache:
+    """Cache LRU do estado de cada janela (e de cada aba, pelo título) para retorno instantâneo
+    
+    Guarda a lista navegada, o elemento em foco, os índices de navegação e, por bloco da janela,
+    o hash dos pixels e os elementos com o texto de OCR. Blocos e seus elementos ficam em
+    coordenadas relativas ao canto da janela, de modo que mover a janela não os invalida. Ao voltar
+    para uma janela, os hashes atuais dos blocos são comparados com os guardados: blocos iguais são
+    reaproveitados sem recálculo e os demais são descartados. O uso de memória é limitado por
+    `budget_bytes`.
+    """
+    
+    ELEMENT_BYTES = 400  # Estimativa por UIElement (objeto, tupla de posição, atributos)
+    
+    def __init__(self, budget_bytes=16 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.states = OrderedDict()  # (hwnd, título) -> estado
+        self.total_bytes = 0
+        self.lock = threading.RLock()
+        self.stats = {'restores': 0, 'tiles_reused': 0, 'tiles_invalidated': 0, 'evictions': 0}
+    
+    @staticmethod
+    def hash_pixels(pixels):
+        return hashlib.blake2b(np.ascontiguousarray(pixels).tobytes(), digest_size=12).hexdigest()
+    
+    @staticmethod
+    def tile_grid(rect, tile_size):
+        """Divide o retângulo da janela em blocos (coordenadas globais)"""
+        x1, y1, x2, y2 = rect
+        for top in range(y1, y2, tile_size):
+            for left in range(x1, x2, tile_size):
+                yield (left, top, min(left + tile_size, x2), min(top + tile_size, y2))
+    
+    @staticmethod
+    def tile_origin(tile, rect):
+        """Origem do bloco relativa ao canto da janela"""
+        return (tile[0] - rect[0], tile[1] - rect[1])
+    
+    @classmethod
+    def tile_hashes(cls, window_pixels, rect, tile_size):
+        """Hash de cada bloco de uma captura da janela inteira: origem relativa do bloco -> hash"""
+        hashes = {}
+        for tile in cls.tile_grid(rect, tile_size):
+            crop = window_pixels[tile[1] - rect[1]:tile[3] - rect[1], tile[0] - rect[0]:tile[2] - rect[0]]
+            hashes[cls.tile_origin(tile, rect)] = cls.hash_pixels(crop)
+        return hashes
+    
+    def _element_bytes(self, elements):
+        return sum(self.ELEMENT_BYTES + 2 * (len(elem.text or "") + len(elem.description or ""))
+                   for elem in elements)
+    
+    def _new_state(self):
+        return {
+            'tiles': {},           # origem relativa do bloco -> (hash, elementos relativos à janela)
+            'rect': None,          # retângulo da janela quando a navegação foi guardada
+            'elements': [],
+            'index': -1,
+            'focused': None,
+            'category': None,
+            'role_index': None,
+            'bytes': 0,
+        }
+    
+    def get(self, key, create=False):
+        with self.lock:
+            state = self.states.get(key)
+            if state is None and create:
+                state = self._new_state()
+                self.states[key] = state
+            if state is not None:
+                self.states.move_to_end(key)
+            return state
+    
+    def _resize(self, key, state):
+        size = self._element_bytes(state['elements'])
+        size += sum(64 + self._element_bytes(elements) for _, elements in state['tiles'].values())
+        if state['role_index'] is not None:
+            size += self.ELEMENT_BYTES // 4 * sum(state['role_index'].counts().values())
+        self.total_bytes += size - state['bytes']
+        state['bytes'] = size
+        self._enforce_budget(keep=key)
+    
+    def _enforce_budget(self, keep=None):
+        while self.total_bytes > self.budget_bytes and len(self.states) > 1:
+            oldest = next(iter(self.states))
+            if oldest == keep:
+                self.states.move_to_end(oldest)
+                oldest = next(iter(self.states))
+                if oldest == keep:
+                    break
+            self.total_bytes -= self.states.pop(oldest)['bytes']
+            self.stats['evictions'] += 1
+    
+    def tile_matches(self, key, origin, tile_hash):
+        with self.lock:
+            state = self.states.get(key)
+            previous = state['tiles'].get(origin) if state else None
+            return bool(previous and previous[0] == tile_hash)
+    
+    def set_tile(self, key, origin, tile_hash, elements):
+        with self.lock:
+            state = self.get(key, create=True)
+            state['tiles'][origin] = (tile_hash, elements)
+            self._resize(key, state)
+    
+    def tile_elements(self, key, window_origin=(0, 0)):
+        """Elementos de todos os blocos válidos da janela em coordenadas globais, em ordem de leitura"""
+        with self.lock:
+            state = self.states.get(key)
+            if not state:
+                return []
+            elements = [elem for _, tile_elements in state['tiles'].values() for elem in tile_elements]
+        if not elements:
+            return []
+        elements = ElementTable.from_elements(elements).translate(window_origin[0], window_origin[1]).to_elements()
+        elements.sort(key=lambda elem: (elem.position[1], elem.position[0]))
+        return elements
+    
+    def save_navigation(self, key, elements, index, focused, category, role_index, rect=None):
+        with self.lock:
+            state = self.get(key, create=True)
+            state['rect'] = rect
+            state['elements'] = list(elements)
+            state['index'] = index
+            state['focused'] = focused
+            state['category'] = category
+            state['role_index'] = role_index
+            self._resize(key, state)
+    
+    def revalidate(self, key, current_hashes):
+        """Descarta os blocos cujo hash mudou e retorna a fração de blocos guardados ainda válidos
+        
+        Retorna None quando não há blocos guardados para comparar.
+        """
+        with self.lock:
+            state = self.states.get(key)
+            if state is None or not state['tiles']:
+                return None
+            
+            stored = len(state['tiles'])
+            valid = 0
+            for origin in list(state['tiles']):
+                if current_hashes.get(origin) == state['tiles'][origin][0]:
+                    valid += 1
+                else:
+                    del state['tiles'][origin]
+                    self.stats['tiles_invalidated'] += 1
+            self.stats['tiles_reused'] += valid
+            self._resize(key, state)
+            return valid / stored
+
+class IdlePrefetcher:
+    """Usa CPU ociosa para detectar e ler por OCR a janela em primeiro plano antes da interação
+    
+    Uma passagem por assentamento: depois que a janela ativa muda ou que a interação termina e a tela
+    fica `idle_delay` segundos sem trabalho interativo, a janela é dividida em blocos e cada bloco cujo
+    conteúdo mudou passa por detect_elements em modo de segundo plano. Os resultados alimentam os caches
+    de OCR e um cache de elementos por janela usado por `read_all`, guardados no WindowStateCache.
+    Antes de cada região o trabalho espera o fim de qualquer trabalho interativo, cada bloco respeita o
+    orçamento de CPU do OCRScheduler e a detecção usa uma visão própria do VisionManager. Em cada bloco,
+    até `atlas_checks` entradas ainda não confirmadas do atlas de layout são relidas sem cache de OCR.
+    """
+    
+    def __init__(self, screen_reader, idle_delay=1.0, tile_size=400, poll_interval=0.25, atlas_checks=3):
+        self.screen_reader = screen_reader
+        self.window_states = screen_reader.window_states
+        self.vision = screen_reader.vision_manager.background_view()
+        self.idle_delay = idle_delay
+        self.tile_size = tile_size
+        self.poll_interval = poll_interval
+        self.atlas_checks = atlas_checks
+        self.completed_pass = None  # (janela, última interação) da última passagem concluída
+        
+        self.stats = {'tiles_processed': 0, 'tiles_unchanged': 0, 'passes': 0, 'atlas_checks': 0}
+        
+        self.running = False
+        self.thread = None
+    
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="IdlePrefetcher", daemon=True)
+        self.thread.start()
+        logger.info("Pré-OCR em segundo plano da janela ativa iniciado")
+    
+    def stop(self):
+        self.running = False
+    
+    def _foreground_window(self):
+        """Retorna (chave, retângulo) da janela em primeiro plano, ou (None, None)"""
+        foreground_context = self.screen_reader.foreground_context
+        foreground = foreground_context.get()
+        rect = foreground_context.get_window_rect() if foreground.hwnd else None
+        if rect is None:
+            return None, None
+        return (foreground.hwnd, foreground.title), rect
+    
+    def _is_idle(self):
+        scheduler = self.screen_reader.vision_manager.ocr_scheduler
+        if scheduler is None:
+            return False
+        return (scheduler.idle_event.is_set() and
+                time.time() - scheduler.last_interactive_time >= self.idle_delay)
+    
+    def _loop(self):
+        while self.running:
+            time.sleep(self.poll_interval)
+            try:
+                if self.screen_reader.paused or not self._is_idle():
+                    continue
+                
+                window_key, rect = self._foreground_window()
+                if window_key is None:
+                    continue
+                
+                # Nada mudou desde a última passagem concluída: mesma janela, nenhuma interação nova
+                settle = (window_key, self.screen_reader.vision_manager.ocr_scheduler.last_interactive_time)
+                if settle == self.completed_pass:
+                    continue
+                if self._prefetch_window(window_key, rect):
+                    self.completed_pass = settle
+                    self.stats['passes'] += 1
+            except Exception as e:
+                logger.debug(f"Erro no pré-OCR em segundo plano: {e}")
     
-    def extract_text_with_ocr(self, image, region, optimize_for_ui=False):
-        """Extrai texto de uma região específica da imagem usando OCR otimizado para UI"""
-        if self.reader is None:
-            return ""
+    def _prefetch_window(self, window_key, rect):
+        """Processa os blocos da janela cujo conteúdo mudou; retorna False se a passagem foi interrompida"""
+        scheduler = self.screen_reader.vision_manager.ocr_scheduler
         
-        try:
-            x1, y1, x2, y2 = region
-            width = x2 - x1
-            height = y2 - y1
-            
-            # Relaxar os limites mínimos para elementos de UI
-            if optimize_for_ui:
-                min_width = 10  # Era 20, agora menor para capturar ícones e botões pequenos
-                min_height = 8  # Era 10, agora menor
-            else:
-                min_width = 20
-                min_height = 10
-                
-            # Verificar se a região é grande o suficiente
-            if width < min_width or height < min_height:
-                return ""
+        for tile in WindowStateCache.tile_grid(rect, self.tile_size):
+            # Ceder imediatamente se houver trabalho interativo ou se a janela mudou
+            scheduler.wait_idle()
+            if not self.running or self.screen_reader.paused:
+                return False
+            if self._foreground_window()[0] != window_key:
+                return False
             
-            # Verificar cache
-            region_key = f"{x1}_{y1}_{x2}_{y2}"
-            if region_key in self.ocr_cache:
-                return self.ocr_cache[region_key]
+            start_time = time.perf_counter()
+            screenshot = self.screen_reader.capture_screen_region(tile)
+            if screenshot is None:
+                continue
             
-            # Recortar a região da imagem
-            if isinstance(image, Image.Image):
-                roi = image.crop((x1, y1, x2, y2))
-                roi_cv = cv2.cvtColor(np.array(roi), cv2.COLOR_RGB2BGR)
+            tile_hash = WindowStateCache.hash_pixels(np.asarray(screenshot))
+            origin = WindowStateCache.tile_origin(tile, rect)
+            if self.window_states.tile_matches(window_key, origin, tile_hash):
+                self.stats['tiles_unchanged'] += 1
             else:
-                roi_cv = image[y1:y2, x1:x2]
-            
-            # Verificar se a região é muito pequena para processamento padrão
-            if width < 30 or height < 30:
-                # Para regiões pequenas (botões, ícones), aplicar super-resolução
-                scale_factor = max(2, 40/min(height, width))
-                new_width = int(width * scale_factor)
-                new_height = int(height * scale_factor)
-                roi_cv = cv2.resize(roi_cv, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+                elements = self.vision.detect_elements(screenshot, origin=tile[:2], background=True)
+                window_elements = ElementTable.from_elements(elements).translate(origin[0], origin[1]).to_elements()
+                self.window_states.set_tile(window_key, origin, tile_hash, window_elements)
+                self.stats['tiles_processed'] += 1
+            self._verify_atlas(screenshot, tile, rect)
             
-            # Aplicar técnicas de processamento diferenciadas para botões/ícones vs texto normal
-            if optimize_for_ui:
-                # TÉCNICA 1: Versão de alto contraste
-                gray = cv2.cvtColor(roi_cv, cv2.COLOR_BGR2GRAY)
-                gray = cv2.convertScaleAbs(gray, alpha=2.0, beta=10)  # Contraste aumentado
-                
-                # TÉCNICA 2: Versão com equalização de histograma adaptativa (CLAHE)
-                clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-                clahe_img = clahe.apply(cv2.cvtColor(roi_cv, cv2.COLOR_BGR2GRAY))
-                
-                # TÉCNICA 3: Versão com detecção de bordas realçada
-                edges = cv2.Canny(cv2.cvtColor(roi_cv, cv2.COLOR_BGR2GRAY), 50, 150)
-                kernel = np.ones((2,2), np.uint8)
-                edges = cv2.dilate(edges, kernel, iterations=1)
-                edges_inverted = 255 - edges  # Inverter para texto branco em fundo preto
-                
-                # Aplicar OCR a cada versão processada, recolhendo todos os resultados
-                results_combined = []
-                
-                # Processar versão de alto contraste
-                results1 = self.reader.readtext(gray, detail=1, paragraph=False, 
-                                            min_size=3, 
-                                            allowlist='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,()-_/@#$%&+=:;')
-                results_combined.extend(results1)
-                
-                # Processar versão CLAHE
-                results2 = self.reader.readtext(clahe_img, detail=1, paragraph=False, 
-                                            min_size=3, 
-                                            allowlist='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,()-_/@#$%&+=:;')
-                results_combined.extend(results2)
-                
-                # Processar versão de bordas para textos mais difíceis
-                if width < 50 or height < 50:  # Apenas para elementos pequenos
-                    results3 = self.reader.readtext(edges_inverted, detail=1, paragraph=False, 
-                                                min_size=2,  # Tamanho mínimo ainda menor
-                                                allowlist='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,()-_/@#$%&+=:;')
-                    results_combined.extend(results3)
-                
-                # Filtragem e deduplicação inteligente dos resultados
-                if results_combined:
-                    # Coletar todos os textos encontrados
-                    all_texts = {}
-                    for bbox, text, prob in results_combined:
-                        clean_text = text.strip()
-                        if len(clean_text) > 0:
-                            # Usar um limiar mais baixo para botões e elementos de UI
-                            if prob > 0.15:  # Limiar reduzido de 0.3 para 0.15 para elementos UI
-                                # Se o mesmo texto foi encontrado mais de uma vez, escolher a maior confiança
-                                if clean_text not in all_texts or prob > all_texts[clean_text]:
-                                    all_texts[clean_text] = prob
-                    
-                    # Ordenar textos por probabilidade
-                    sorted_texts = sorted(all_texts.items(), key=lambda x: x[1], reverse=True)
-                    
-                    # Para botões e elementos de interface, geralmente queremos apenas o texto mais confiável
-                    if sorted_texts:
-                        best_text = sorted_texts[0][0]
-                        
-                        # Adicionar ao cache
-                        self.ocr_cache[region_key] = best_text
-                        
-                        # Limitar tamanho do cache
-                        if len(self.ocr_cache) > self.cache_max_size:
-                            self.ocr_cache.pop(next(iter(self.ocr_cache)))
-                        
-                        logger.info(f"OCR UI otimizado detectou: '{best_text}' (confiança: {sorted_texts[0][1]:.2f})")
-                        return best_text
+            scheduler.throttle(time.perf_counter() - start_time)
+        return True
+    
+    def _verify_atlas(self, screenshot, tile, rect):
+        """Relê sem cache de OCR as entradas pendentes do atlas visíveis no bloco
+        
+        O cache de OCR é indexado pelo hash dos pixels, então repetir a leitura de um quadro idêntico
+        não prova nada; só uma leitura nova do motor de OCR conta como confirmação independente.
+        """
+        atlas = self.vision.layout_atlas
+        if atlas is None or not self.atlas_checks:
+            return
+        app_name = LayoutAtlas.app_key(self.screen_reader.foreground_context.get())
+        cv_image = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        altura, largura = cv_image.shape[:2]
+        
+        for box_key, (x1, y1, x2, y2) in atlas.candidates(app_name, rect, cv_image, tile[:2], self.atlas_checks):
+            self.screen_reader.vision_manager.ocr_scheduler.wait_idle()
+            if not self.running:
+                return
+            # Mesma expansão de 8 pixels usada por detect_elements
+            region = (max(0, x1 - 8), max(0, y1 - 8), min(largura, x2 + 8), min(altura, y2 + 8))
+            text, _ = self.vision._ocr_single_region(cv_image, region, use_cache=False)
+            atlas.confirm(app_name, rect, box_key, text)
+            self.stats['atlas_checks'] += 1
+    
+    def get_window_elements(self):
+        """Elementos já pré-processados da janela atual, em coordenadas globais e ordem de leitura"""
+        window_key, rect = self._foreground_window()
+        if window_key is None:
+            return []
+        return self.window_states.tile_elements(window_key, rect[:2])
+
+class CursorPrefetcher:
+    """Prevê onde o ponteiro vai parar e antecipa captura, detecção e OCR dessa região
+    
+    Amostras recentes de `pyautogui.position` fornecem velocidade e desaceleração; com movimento
+    desacelerando, o ponto de parada é estimado por d = v² / (2a) na direção do movimento.
+    A região prevista é processada antes da chegada do cursor e `process_screen` reutiliza o
+    resultado quando o cursor para perto do ponto previsto. O trabalho desperdiçado é limitado:
+    uma previsão em andamento por vez, intervalo mínimo entre previsões e pausa após erros seguidos.
+    """
+    
+    def __init__(self, screen_reader, region_half=150, hit_radius=60, max_distance=400, ttl=2.0,
+                 sample_interval=0.02, min_interval=0.15, max_consecutive_waste=5, waste_cooldown=3.0):
+        self.screen_reader = screen_reader
+        self.region_half = region_half
+        self.hit_radius = hit_radius
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.sample_interval = sample_interval
+        self.min_interval = min_interval
+        self.max_consecutive_waste = max_consecutive_waste
+        self.waste_cooldown = waste_cooldown
+        
+        self.samples = deque(maxlen=10)  # (tempo, x, y)
+        self.prefetched = []            # [(ponto previsto, região, ElementTable local, tempo, duração, captura)]
+        self.vision = screen_reader.vision_manager.background_view()
+        self.prefetch_lock = threading.Lock()
+        self.last_prefetch_time = 0.0
+        self.consecutive_waste = 0
+        self.cooldown_until = 0.0
+        
+        self.stats = {'predictions': 0, 'prefetches': 0, 'hits': 0, 'wasted': 0, 'latency_saved': 0.0}
+        
+        self.running = False
+        self.thread = None
+    
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="CursorPrefetcher", daemon=True)
+        self.thread.start()
+        logger.info("Previsão de trajetória do cursor iniciada")
+    
+    def stop(self):
+        self.running = False
+        stats = self.get_stats()
+        logger.info(f"Pré-busca por trajetória: {stats['hits']}/{stats['prefetches']} acertos "
+                    f"({stats['hit_rate']:.0%}), {stats['latency_saved']:.2f}s economizados")
+    
+    def add_sample(self, x, y, timestamp=None):
+        """Registra uma posição do ponteiro"""
+        self.samples.append((time.time() if timestamp is None else timestamp, x, y))
+    
+    def predict_stop(self, min_speed=150.0):
+        """Estima o ponto de parada do ponteiro, ou None se não houver desaceleração clara
+        
+        A velocidade é medida nas metades recente e anterior da janela de amostras;
+        a desaceleração é a queda de velocidade dividida pelo tempo entre as duas medidas.
+        """
+        if len(self.samples) < 4:
+            return None
+        
+        samples = list(self.samples)
+        middle = len(samples) // 2
+        older, recent = samples[:middle + 1], samples[middle:]
+        
+        def velocity(window):
+            dt = window[-1][0] - window[0][0]
+            if dt <= 0:
+                return None
+            return ((window[-1][1] - window[0][1]) / dt, (window[-1][2] - window[0][2]) / dt)
+        
+        v_old, v_new = velocity(older), velocity(recent)
+        if v_old is None or v_new is None:
+            return None
+        
+        speed_old = (v_old[0] ** 2 + v_old[1] ** 2) ** 0.5
+        speed_new = (v_new[0] ** 2 + v_new[1] ** 2) ** 0.5
+        if speed_new < min_speed:
+            return None
+        
+        recent_middle = (recent[-1][0] + recent[0][0]) / 2
+        dt = recent_middle - (older[-1][0] + older[0][0]) / 2
+        deceleration = (speed_old - speed_new) / dt if dt > 0 else 0
+        if deceleration <= 0:
+            return None
+        
+        # A média da janela recente vale para o seu ponto médio; extrapolar até a última amostra
+        _, x, y = samples[-1]
+        speed_end = speed_new - deceleration * (samples[-1][0] - recent_middle)
+        if speed_end <= 0:
+            return None
+        
+        distance = min(speed_end ** 2 / (2 * deceleration), self.max_distance)
+        return (int(x + v_new[0] / speed_new * distance), int(y + v_new[1] / speed_new * distance))
+    
+    def _loop(self):
+        import pyautogui
+        screen_width, screen_height = pyautogui.size()
+        
+        while self.running:
+            time.sleep(self.sample_interval)
+            try:
+                if self.screen_reader.paused:
+                    continue
                 
-                return ""
-                            
-            else:
-                # Processamento OCR padrão para regiões maiores (não botões/ícones)
-                # [Código original aqui...]
-                gray = cv2.cvtColor(roi_cv, cv2.COLOR_BGR2GRAY)
-                gray = cv2.equalizeHist(gray)
-                denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-                binary = cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                            cv2.THRESH_BINARY, 11, 2)
+                x, y = pyautogui.position()
+                self.add_sample(x, y)
+                self._expire()
                 
-                # Realizar OCR na imagem pré-processada
-                results = self.reader.readtext(binary)
+                now = time.time()
+                if now < self.cooldown_until or now - self.last_prefetch_time < self.min_interval:
+                    continue
                 
-                # Extrair texto dos resultados
-                text_parts = []
-                for (bbox, text, prob) in results:
-                    # Filtrar resultados com baixa confiança
-                    if prob > 0.3:
-                        text_parts.append(text)
+                target = self.predict_stop()
+                if target is None:
+                    continue
+                self.stats['predictions'] += 1
                 
-                # Combinar resultados em uma única string
-                full_text = " ".join(text_parts)
+                target = (min(max(target[0], 0), screen_width - 1), min(max(target[1], 0), screen_height - 1))
                 
-                # Adicionar ao cache se encontrou texto
-                if full_text:
-                    self.ocr_cache[region_key] = full_text
-                    # Limitar tamanho do cache
-                    if len(self.ocr_cache) > self.cache_max_size:
-                        self.ocr_cache.pop(next(iter(self.ocr_cache)))
+                # Alvo já perto do cursor ou de uma previsão pendente: nada a antecipar
+                if abs(target[0] - x) <= self.hit_radius and abs(target[1] - y) <= self.hit_radius:
+                    continue
+                with self.prefetch_lock:
+                    if any(self._near(entry[0], target) for entry in self.prefetched):
+                        continue
                 
-                return full_text
+                self._prefetch(target)
+            except Exception as e:
+                logger.debug(f"Erro na previsão de trajetória do cursor: {e}")
+    
+    def _near(self, point, other):
+        return abs(point[0] - other[0]) <= self.hit_radius and abs(point[1] - other[1]) <= self.hit_radius
+    
+    def _prefetch(self, target):
+        """Captura e processa a região ao redor do ponto previsto"""
+        self.last_prefetch_time = time.time()
+        region = (max(0, target[0] - self.region_half), max(0, target[1] - self.region_half),
+                  target[0] + self.region_half, target[1] + self.region_half)
         
-        except Exception as e:
-            logger.error(f"Erro na extração de texto com OCR: {e}")
-            return ""
+        start_time = time.time()
+        screenshot = self.screen_reader.capture_screen_region(region)
+        if screenshot is None:
+            return
+        # Lote interativo limitado numa visão própria do VisionManager: o modo de fundo leria todas as
+        # regiões esperando ociosidade, e as regiões além do lote não são enviadas ao agendador
+        elements = self.vision.detect_elements(
+            screenshot, focus_point=(target[0] - region[0], target[1] - region[1]), origin=region[:2]
+        )
+        duration = time.time() - start_time
         
-    def batch_process_ocr(self, image, regions, max_batch=5, window_title=""):
-        """Processa múltiplas regiões para OCR com melhorias de detecção de texto"""
-        if self.reader is None or not regions:
-            return [""] * len(regions)
+        with self.prefetch_lock:
+            self.prefetched.append((target, region, ElementTable.from_elements(elements), time.time(), duration,
+                                    screenshot))
+            self.stats['prefetches'] += 1
+    
+    def _expire(self):
+        """Descarta previsões vencidas e contabiliza o trabalho desperdiçado"""
+        now = time.time()
+        with self.prefetch_lock:
+            expired = [entry for entry in self.prefetched if now - entry[3] > self.ttl]
+            if not expired:
+                return
+            self.prefetched = [entry for entry in self.prefetched if now - entry[3] <= self.ttl]
         
-        try:
-            # Resultados para todas as regiões
-            results = []
-            
-            # Contador de regiões processadas
-            processed_regions = 0
-            
-            # Verificar se estamos em um editor de código
-            is_code_editor = "code" in window_title.lower() or "vscode" in window_title.lower()
-            
-            # Processar cada região
-            for i, (x1, y1, x2, y2) in enumerate(regions):
-                # Limitar número de regiões processadas por ciclo
-                if processed_regions >= max_batch:
-                    results.append("")  # Adicionar string vazia para regiões não processadas
-                    continue
-                    
-                # Verificar se a região é grande o suficiente
-                width = x2 - x1
-                height = y2 - y1
-                if width < 20 or height < 10:  # Muito pequeno para ter texto legível
-                    results.append("")
-                    continue
-                
-                # Verificar cache antes de processar
-                region_key = f"{x1}_{y1}_{x2}_{y2}"
-                if region_key in self.ocr_cache:
-                    results.append(self.ocr_cache[region_key])
-                    continue
-                
-                # Extrair região da imagem
-                if isinstance(image, Image.Image):
-                    roi = image.crop((x1, y1, x2, y2))
-                    roi_cv = cv2.cvtColor(np.array(roi), cv2.COLOR_RGB2BGR)
+        self.stats['wasted'] += len(expired)
+        self.consecutive_waste += len(expired)
+        if self.consecutive_waste >= self.max_consecutive_waste:
+            self.cooldown_until = now + self.waste_cooldown
+            self.consecutive_waste = 0
+    
+    def take(self, x, y, region):
+        """Retorna a previsão que cobre o cursor em (x, y), ou None se não houver nenhuma válida
+        
+        O resultado é (ElementTable nas coordenadas locais de `region`, captura antecipada, canto da
+        captura na tela); a captura permite ao rastreador comparar os pixels das trilhas.
+        """
+        with self.prefetch_lock:
+            for entry in self.prefetched:
+                target, prefetch_region, table, _, duration, screenshot = entry
+                if self._near(target, (x, y)):
+                    self.prefetched.remove(entry)
+                    break
+            else:
+                return None
+        
+        self.stats['hits'] += 1
+        self.stats['latency_saved'] += duration
+        self.consecutive_waste = 0
+        
+        dx, dy = prefetch_region[0] - region[0], prefetch_region[1] - region[1]
+        return table.translate(dx, dy), screenshot, prefetch_region[:2]
+    
+    def get_stats(self):
+        """Taxa de acerto e latência economizada pela pré-busca"""
+        stats = dict(self.stats)
+        stats['hit_rate'] = stats['hits'] / stats['prefetches'] if stats['prefetches'] else 0.0
+        return stats
+
+class OCRLineGrouper:
+    """Agrupa caixas de OCR em linhas de texto por varredura, em ordem de leitura, em O(n log n)
+    
+    Aceita resultados no formato do easyOCR, (bbox, texto, confiança), com bbox em quatro pontos
+    [[x1,y1], [x2,y2], [x3,y3], [x4,y4]] ou no formato simplificado [x, y, largura, altura].
+    """
+    
+    @staticmethod
+    def box_bounds(bbox):
+        """Converte uma bbox de OCR em (esquerda, topo, direita, base)"""
+        if isinstance(bbox[0], (list, tuple)) or hasattr(bbox[0], '__len__'):
+            xs = [point[0] for point in bbox]
+            ys = [point[1] for point in bbox]
+            return min(xs), min(ys), max(xs), max(ys)
+        x, y, width, height = bbox[:4]
+        return x, y, x + width, y + height
+    
+    @staticmethod
+    def group_lines(ocr_result, line_tolerance=10):
+        """Agrupa os fragmentos em linhas pela linha de base, retornando listas ordenadas da esquerda para a direita
+        
+        Cada fragmento é (esquerda, topo, direita, base, texto, confiança). Um fragmento entra na
+        linha corrente se sua base estiver a menos de `line_tolerance` pixels da base média da linha.
+        """
+        fragments = []
+        for bbox, text, conf in ocr_result:
+            left, top, right, bottom = OCRLineGrouper.box_bounds(bbox)
+            fragments.append((left, top, right, bottom, text, conf))
+        
+        # Varredura vertical pela linha de base
+        fragments.sort(key=lambda fragment: fragment[3])
+        
+        lines = []
+        current_line = []
+        baseline_sum = 0.0
+        for fragment in fragments:
+            if current_line and fragment[3] - baseline_sum / len(current_line) >= line_tolerance:
+                lines.append(current_line)
+                current_line = []
+                baseline_sum = 0.0
+            current_line.append(fragment)
+            baseline_sum += fragment[3]
+        if current_line:
+            lines.append(current_line)
+        
+        for line in lines:
+            line.sort(key=lambda fragment: fragment[0])
+        return lines
+    
+    @staticmethod
+    def group_segments(ocr_result, line_tolerance=10, max_gap=30):
+        """Retorna [(texto, confiança)] em ordem de leitura, unindo fragmentos adjacentes da mesma linha
+        
+        Fragmentos separados horizontalmente por menos de `max_gap` pixels formam um único segmento,
+        cuja confiança é a menor entre as partes.
+        """
+        segments = []
+        for line in OCRLineGrouper.group_lines(ocr_result, line_tolerance):
+            texts = [line[0][4]]
+            confidence = line[0][5]
+            right = line[0][2]
+            for left, _, fragment_right, _, text, conf in line[1:]:
+                if left - right < max_gap:
+                    texts.append(text)
+                    confidence = min(confidence, conf)
                 else:
-                    roi_cv = image[y1:y2, x1:x2]
-                
-                # Pré-processamento avançado da imagem
-                try:
-                    # Converter para escala de cinza
-                    gray = cv2.cvtColor(roi_cv, cv2.COLOR_BGR2GRAY)
-                    
-                    # Redimensionar se for muito pequena
-                    if height < 30 or width < 30:
-                        scale = max(2, 30 / min(height, width))
-                        new_width = int(width * scale)
-                        new_height = int(height * scale)
-                        gray = cv2.resize(gray, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-                    
-                    # Para código-fonte, aumentar contraste para melhorar detecção de texto
-                    if is_code_editor:
-                        # Aumentar contraste para texto de código
-                        gray = cv2.convertScaleAbs(gray, alpha=1.5, beta=10)
-                    
-                    # Aumentar o contraste
-                    gray = cv2.equalizeHist(gray)
-                    
-                    # Remover ruído
-                    denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-                    
-                    # Configurações diferentes para editores de código vs. outros aplicativos
-                    if is_code_editor:
-                        # Configuração otimizada para código-fonte e editores
-                        # Limiarização adaptativa para melhorar o contraste do texto de código
-                        binary = cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                                    cv2.THRESH_BINARY, 11, 2)
-                        
-                        # OCR com configurações específicas para código
-                        ocr_result = self.reader.readtext(
-                            binary, 
-                            detail=1,
-                            paragraph=False,
-                            # Incluir caracteres comuns em código-fonte
-                            allowlist='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,()[]{}<>:;=+-*/_"\''
-                        )
-                    else:
-                        # Configuração padrão para aplicações gerais
-                        # Limiarização adaptativa normal
-                        binary = cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                                    cv2.THRESH_BINARY, 11, 2)
-                        
-                        # OCR padrão
-                        ocr_result = self.reader.readtext(binary)
-                    
-                    # Processar e combinar resultados do OCR
-                    if ocr_result:
-                        # Inicializar array para marcar fragmentos ignorados (já combinados)
-                        ignored = [False] * len(ocr_result)
-                        
-                        # Melhorar a combinação de fragmentos na horizontal
-                        for i, (bbox1, text1, conf1) in enumerate(ocr_result):
-                            if ignored[i]:
-                                continue
-                            for j, (bbox2, text2, conf2) in enumerate(ocr_result):
-                                if i != j and not ignored[j]:
-                                    # Extrair coordenadas para comparação
-                                    if isinstance(bbox1[0], (list, tuple)):
-                                        # Formato detalhado: [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-                                        y1_center = (bbox1[0][1] + bbox1[3][1]) / 2
-                                        y2_center = (bbox2[0][1] + bbox2[3][1]) / 2
-                                        x1_right = max(bbox1[1][0], bbox1[2][0])
-                                        x2_left = min(bbox2[0][0], bbox2[3][0])
-                                    else:
-                                        # Formato simplificado: [x, y, width, height]
-                                        y1_center = bbox1[1] + bbox1[3]/2
-                                        y2_center = bbox2[1] + bbox2[3]/2
-                                        x1_right = bbox1[0] + bbox1[2]
-                                        x2_left = bbox2[0]
-                                    
-                                    # Se os bboxes estão próximos horizontalmente e na mesma altura
-                                    if abs(y1_center - y2_center) < 10 and abs(x1_right - x2_left) < 30:
-                                        # Combinar os textos
-                                        combined_text = text1 + " " + text2
-                                        combined_conf = min(conf1, conf2)
-                                        
-                                        # Atualizar o primeiro elemento com o texto combinado
-                                        ocr_result[i] = (bbox1, combined_text, combined_conf)
-                                        ignored[j] = True  # Marcar o segundo como ignorado
-                        
-                        # Filtrar e processar resultados
-                        filtered_texts = []
-                        for i, (bbox, text, conf) in enumerate(ocr_result):
-                            if ignored[i]:
-                                continue  # Pular textos já combinados
-                            
-                            # Filtrar textos muito curtos ou sem sentido
-                            if len(text) <= 2 or (len(text) <= 3 and not any(c.isalnum() for c in text)):
-                                continue  # Ignorar textos muito curtos ou sem caracteres alfanuméricos
-                            
-                            if conf > 0.3:  # Filtrar resultados de baixa confiança
-                                filtered_texts.append(text)
-                        
-                        # Juntar todos os textos com um espaço
-                        full_text = " ".join(filtered_texts).strip()
-                        
-                        # Remover duplicações de espaços
-                        full_text = " ".join(full_text.split())
-                    else:
-                        full_text = ""
-                    
-                    # Adicionar ao cache se texto encontrado
-                    if full_text:
-                        self.ocr_cache[region_key] = full_text
-                        # Limitar tamanho do cache
-                        if len(self.ocr_cache) > self.cache_max_size:
-                            # Remover item mais antigo
-                            self.ocr_cache.pop(next(iter(self.ocr_cache)))
-                        logger.info(f"OCR detectou: '{full_text}' na região {x1},{y1},{x2},{y2}")
-                    
-                    results.append(full_text)
-                    processed_regions += 1
-                    
-                except Exception as e:
-                    logger.error(f"Erro no OCR da região {x1},{y1},{x2},{y2}: {e}")
-                    logger.debug("Detalhes do erro:", exc_info=True)
-                    results.append("")
-            
-            # Completar com strings vazias para regiões não processadas
-            while len(results) < len(regions):
-                results.append("")
-            
-            return results
+                    segments.append((" ".join(texts), confidence))
+                    texts = [text]
+                    confidence = conf
+                right = max(right, fragment_right)
+            segments.append((" ".join(texts), confidence))
+        return segments
+
+class OCRLexicon:
+    """Corretor de OCR baseado em índice de deleções simétricas (estilo SymSpell) sobre o vocabulário de UI
+    
+    Cada palavra do vocabulário é indexada por todas as suas deleções até `max_edit_distance`;
+    uma consulta gera as deleções do token lido e só calcula a distância de edição para os poucos
+    candidatos que compartilham alguma deleção, o que mantém a correção na casa dos microssegundos.
+    
+    A correção é conservadora: só tokens lidos com confiança abaixo de `max_confidence` são
+    substituídos, nunca palavras do dicionário base nem palavras já lidas várias vezes com confiança
+    alta, e, sem dicionário base, só por palavras do vocabulário com frequência >= `min_frequency`.
+    """
+    
+    TOKEN_PATTERN = re.compile(r"\w*[\d_]\w*|[^\W\d_]+|\W+")
+    
+    def __init__(self, max_edit_distance=2, prefix_length=7, max_confidence=0.6, min_frequency=5,
+                 max_learned_words=5000, max_observed_words=20000, observed_min_count=2):
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.max_confidence = max_confidence
+        self.min_frequency = min_frequency
+        self.max_learned_words = max_learned_words
+        self.max_observed_words = max_observed_words
+        self.observed_min_count = observed_min_count
+        self.words = {}       # palavra -> frequência
+        self.word_apps = {}   # palavra -> aplicações onde a palavra é conhecida
+        self.deletes = {}     # deleção -> conjunto de palavras
+        self.dictionary = set()     # Dicionário base: palavras corretas que nunca são substituídas
+        self.observed = {}          # palavra fora do vocabulário -> leituras com confiança alta
+        self.learned = OrderedDict()  # palavras acrescentadas por learn(), da mais antiga à mais recente
+        self.lock = threading.Lock()
+        self.stats = {'lookups': 0, 'corrections': 0}
+    
+    def _generate_deletes(self, word, max_distance):
+        """Gera todas as deleções do prefixo da palavra até a distância informada"""
+        key = word[:self.prefix_length]
+        results = {key}
+        frontier = {key}
+        for _ in range(max_distance):
+            next_frontier = set()
+            for candidate in frontier:
+                if len(candidate) <= 1:
+                    continue
+                for i in range(len(candidate)):
+                    next_frontier.add(candidate[:i] + candidate[i + 1:])
+            next_frontier -= results
+            results |= next_frontier
+            frontier = next_frontier
+        return results
+    
+    def add_word(self, word, app_name="generic", count=1):
+        """Adiciona uma palavra ao vocabulário, associada a uma aplicação"""
+        word = word.strip().lower()
+        if len(word) < 3 or not word.isalpha():
+            return
+        
+        with self.lock:
+            is_new = word not in self.words
+            self.words[word] = self.words.get(word, 0) + count
+            self.word_apps.setdefault(word, set()).add(app_name)
+            
+            if is_new:
+                for delete in self._generate_deletes(word, self.max_edit_distance):
+                    self.deletes.setdefault(delete, set()).add(word)
+    
+    def add_text(self, text, app_name="generic", count=1):
+        """Adiciona todas as palavras de um texto (rótulos, listas de palavras) ao vocabulário"""
+        if not text:
+            return
+        for token in re.findall(r"[^\W\d_]+", text):
+            self.add_word(token, app_name, count)
+    
+    def _remove_word(self, word):
+        with self.lock:
+            if self.words.pop(word, None) is None:
+                return
+            self.word_apps.pop(word, None)
+            for delete in self._generate_deletes(word, self.max_edit_distance):
+                bucket = self.deletes.get(delete)
+                if bucket:
+                    bucket.discard(word)
+                    if not bucket:
+                        del self.deletes[delete]
+    
+    def learn(self, text, app_name):
+        """Registra um rótulo confirmado (por exemplo, vindo da API de acessibilidade)
+        
+        Palavras novas aprendidas assim são limitadas a `max_learned_words`; as mais antigas saem.
+        """
+        for token in re.findall(r"[^\W\d_]+", text or ""):
+            word = token.lower()
+            if len(word) < 3:
+                continue
+            if word in self.learned:
+                self.learned.move_to_end(word)
+            elif word not in self.words:
+                self.learned[word] = True
+            self.add_word(word, app_name, count=5)
         
+        while len(self.learned) > self.max_learned_words:
+            word, _ = self.learned.popitem(last=False)
+            self._remove_word(word)
+    
+    def load_dictionary(self, path):
+        """Carrega um dicionário base (uma palavra por linha) de palavras corretas"""
+        try:
+            with open(path, encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    word = line.strip().lower()
+                    if word and word.isalpha():
+                        self.dictionary.add(word)
+            return True
         except Exception as e:
-            logger.error(f"Erro no processamento OCR: {e}")
-            logger.debug("Detalhes do erro:", exc_info=True)
-            return [""] * len(regions)
+            logger.error(f"Erro ao carregar dicionário base {path}: {e}")
+            return False
+    
+    def load_word_list(self, path, app_name="generic"):
+        """Carrega uma lista de palavras (uma por linha) para uma aplicação"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        self.add_text(line, app_name)
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao carregar lista de palavras {path}: {e}")
+            return False
+    
+    @staticmethod
+    def _edit_distance(a, b, max_distance):
+        """Distância de Damerau-Levenshtein (OSA) com interrupção ao exceder o limite"""
+        if abs(len(a) - len(b)) > max_distance:
+            return max_distance + 1
+        
+        previous_previous = None
+        previous = list(range(len(b) + 1))
+        for i in range(1, len(a) + 1):
+            current = [i] + [0] * len(b)
+            row_min = current[0]
+            for j in range(1, len(b) + 1):
+                cost = 0 if a[i - 1] == b[j - 1] else 1
+                current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+                if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                    current[j] = min(current[j], previous_previous[j - 2] + 1)
+                row_min = min(row_min, current[j])
+            if row_min > max_distance:
+                return max_distance + 1
+            previous_previous, previous = previous, current
+        return previous[len(b)]
+    
+    def is_known(self, word, app_name=None):
+        """Verifica se a palavra pertence ao vocabulário (da aplicação ou genérico)"""
+        apps = self.word_apps.get(word.lower())
+        if not apps:
+            return False
+        return app_name is None or app_name in apps or "generic" in apps
+    
+    def lookup(self, token, app_name=None):
+        """Retorna a palavra do vocabulário mais próxima do token, ou None"""
+        word = token.lower()
+        if self.is_known(word, app_name):
+            return word
+        
+        # Tokens curtos toleram apenas uma edição para evitar correções ambíguas
+        max_distance = 1 if len(word) <= 4 else self.max_edit_distance
+        
+        self.stats['lookups'] += 1
+        candidates = set()
+        for delete in self._generate_deletes(word, max_distance):
+            candidates |= self.deletes.get(delete, set())
+        
+        best_word, best_distance, best_count = None, max_distance + 1, 0
+        for candidate in candidates:
+            if app_name is not None and not self.is_known(candidate, app_name):
+                continue
+            distance = self._edit_distance(word, candidate, max_distance)
+            count = self.words[candidate]
+            if distance < best_distance or (distance == best_distance and count > best_count):
+                best_word, best_distance, best_count = candidate, distance, count
+        
+        return best_word if best_distance <= max_distance else None
+    
+    def is_known_text(self, text, app_name=None):
+        """Verifica se todas as palavras do texto, como lidas, pertencem ao vocabulário"""
+        tokens = [token for token in re.findall(r"[^\W\d_]+", text or "") if len(token) >= 3]
+        return bool(tokens) and all(self.is_known(token, app_name) for token in tokens)
+    
+    def _observe(self, word):
+        """Conta uma leitura de confiança alta de palavra fora do vocabulário (provavelmente correta)"""
+        if word in self.observed or len(self.observed) < self.max_observed_words:
+            self.observed[word] = self.observed.get(word, 0) + 1
+    
+    def _may_replace(self, word, match):
+        """Verifica se o token pode ser trocado pela palavra do vocabulário"""
+        if word in self.dictionary or self.observed.get(word, 0) >= self.observed_min_count:
+            return False
+        # Sem dicionário base, só palavras frequentes (por exemplo, rótulos confirmados) corrigem
+        return bool(self.dictionary) or self.words.get(match, 0) >= self.min_frequency
+    
+    def correct_text(self, text, app_name=None, confidence=None):
+        """Corrige tokens de baixa confiança próximos do vocabulário, retornando (texto, todos_conhecidos)
+        
+        `todos_conhecidos` só é verdadeiro se todas as palavras já estavam no vocabulário como lidas;
+        um texto corrigido nunca é considerado conhecido. Sem `confidence` nada é substituído.
+        """
+        if not text or not self.words:
+            return text, False
+        
+        low_confidence = confidence is not None and confidence < self.max_confidence
+        corrected = []
+        all_known = True
+        for token in self.TOKEN_PATTERN.findall(text):
+            if not token.isalpha() or len(token) < 3:
+                corrected.append(token)
+                continue
+            
+            word = token.lower()
+            if self.is_known(word, app_name):
+                corrected.append(token)
+                continue
+            
+            all_known = False
+            if not low_confidence:
+                if confidence is not None:
+                    self._observe(word)
+                corrected.append(token)
+                continue
+            
+            match = self.lookup(token, app_name)
+            if match is None or not self._may_replace(word, match):
+                corrected.append(token)
+                continue
+            
+            # Preservar a capitalização do token original
+            if token.isupper():
+                match = match.upper()
+            elif token[0].isupper():
+                match = match.capitalize()
+            
+            if match != token:
+                self.stats['corrections'] += 1
+                logger.debug(f"Correção léxica de OCR: '{token}' -> '{match}'")
+            corrected.append(match)
+        
+        return "".join(corrected), all_known
 
 class SmartCache:
     """Cache inteligente para elementos de UI que considera o contexto da aplicação"""
@@ -1477,7 +5868,7 @@ class AIManager:
             visual_desc = f"Posição: {element.position}, Texto: {element.text or 'Nenhum'}"
             
             # Preparar prompt para o modelo
-            prompt = f"<|system|>\nVocê é um assistente para acessibilidade que identifica elementos de interface.\n<|end|>\n<|user|>\nClassifique este elemento de interface: {visual_desc}. Escolha entre: botão, campo de texto, caixa de seleção, botão de opção, menu suspenso, link, imagem, título, texto.<|end|>\n<|assistant|>"
+            prompt = f"<|system|>\nVocê é um assistente para acessibilidade que identifica elementos de interface.\n<|end|>\n<|user|>\nClassifique este elemento de interface: {visual_desc}. Escolha entre: botão, campo de texto, caixa de seleção, botão de opção, menu suspenso, link, imagem, título, texto, tabela, região.<|end|>\n<|assistant|>"
             
             # Tokenizar e gerar resposta
             input_ids = self.tokenizer.encode(prompt, return_tensors="pt").to(self.model.device)
@@ -1679,23 +6070,301 @@ class SpeechManager:
             except Exception as e2:
                 logger.error(f"Não foi possível reiniciar o mecanismo: {e2}")
 
+class DescriptionEngine:
+    """Gera as descrições faladas dos elementos em um único lugar, com memoização
+    
+    Os estilos `simple` (visão/OCR), `html` (acessibilidade) e `contextual` (com o contexto da
+    aplicação) compartilham modelos pré-compilados e a geometria dos monitores, lida uma vez e
+    renovada a cada `geometry_ttl` segundos. A posição entra como a faixa da tela (limites fixos de
+    400/800 e 300/600 pixels nos estilos simple/html, quartos do monitor que contém o elemento no
+    contextual), de modo que o resultado é memorizado por (estilo, tipo, texto normalizado, faixa de
+    posição, contexto da aplicação). `describe_many` descreve listas inteiras resolvendo a janela em
+    primeiro plano uma só vez.
+    """
+    
+    # Modelos pré-compilados
+    WITH_TEXT = "{0} com texto '{1}'".format
+    SIZED = "{0} de {1} por {2} pixels".format
+    LABELLED = "{0}: {1}".format
+    
+    # Frases de posição por faixa: três faixas em pixels para os estilos simple/html, quartos para o contextual
+    PIXEL_COLUMNS = (400, 800)
+    PIXEL_ROWS = (300, 600)
+    THIRDS_WITH_TEXT = (" no lado esquerdo", "", " no lado direito")
+    THIRDS = (" no lado esquerdo", " no centro", " no lado direito")
+    VERTICAL_THIRDS = (" superior", "", " inferior")
+    QUARTERS = (" no lado esquerdo", " na parte central-esquerda", " na parte central-direita", " no lado direito")
+    # Mesmas frases de sempre: de 25% a 75% da altura o estilo contextual diz " inferior"
+    VERTICAL_QUARTERS = (" superior", " inferior", " inferior", "")
+    
+    # Tipos cuja posição é anunciada junto com o texto
+    POSITIONED_TYPES = ("botão", "link", "caixa de seleção")
+    # Limite de caracteres do texto por estilo
+    MAX_TEXT = {'simple': 30, 'html': 50, 'contextual': None}
+    
+    # Tipo inferido pelo texto para elementos de navegador
+    BROWSER_TYPE_RULES = (
+        (("curtir", "like", "seguir", "follow", "enviar", "send", "postar", "post"), "botão"),
+        (("buscar", "pesquisar", "search", "procurar"), "campo de pesquisa"),
+    )
+    LINK_PREFIXES = ("http",)
+    LINK_SUFFIXES = (".com", ".br", ".net")
+    
+    # Contexto por aplicação: contexto -> ((palavras, sufixo), ...); alguns contextos valem só para botões
+    APP_CONTEXT_RULES = {
+        'social': ((("curtir", "like"), " - botão para curtir publicação"),
+                   (("comentar", "comment"), " - botão para comentar publicação"),
+                   (("compartilhar", "share"), " - botão para compartilhar publicação"),
+                   (("seguir", "follow"), " - botão para seguir usuário"),
+                   (("mensagem", "message"), " - botão para enviar mensagem")),
+        'gmail': ((("enviar", "send"), " - botão para enviar email"),
+                  (("anexar", "attach"), " - botão para anexar arquivo"),
+                  (("responder", "reply"), " - botão para responder email")),
+        'document': ((("salvar", "save"), " - botão para salvar documento"),
+                     (("imprimir", "print"), " - botão para imprimir documento")),
+        'code': ((("executar", "run", "debug"), " - botão para executar código"),
+                 (("commit", "push", "git"), " - botão para operação git")),
+    }
+    BUTTON_ONLY_CONTEXTS = ('document', 'code')
+    
+    def __init__(self, foreground_context=None, cache_size=4096, geometry_ttl=60.0):
+        self.foreground_context = foreground_context
+        self.cache_size = cache_size
+        self.geometry_ttl = geometry_ttl
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.monitors = []
+        self.geometry_time = 0.0
+        self.stats = {'hits': 0, 'misses': 0}
+    
+    def refresh_geometry(self):
+        """Relê os retângulos dos monitores (um por monitor; a tela principal como alternativa)"""
+        monitors = []
+        try:
+            import win32api
+            monitors = [tuple(rect) for _, _, rect in win32api.EnumDisplayMonitors()]
+        except Exception:
+            try:
+                import pyautogui
+                width, height = pyautogui.size()
+                monitors = [(0, 0, width, height)]
+            except Exception:
+                pass
+        self.monitors = monitors or [(0, 0, 1920, 1080)]
+        self.geometry_time = time.time()
+    
+    def _monitor(self, x, y):
+        if time.time() - self.geometry_time > self.geometry_ttl:
+            self.refresh_geometry()
+        for monitor in self.monitors:
+            if monitor[0] <= x < monitor[2] and monitor[1] <= y < monitor[3]:
+                return monitor
+        return self.monitors[0]
+    
+    def position_bucket(self, position, divisions):
+        """Faixa (coluna, linha) do centro do elemento no seu monitor, com `divisions` faixas por eixo"""
+        x_center = (position[0] + position[2]) / 2
+        y_center = (position[1] + position[3]) / 2
+        left, top, right, bottom = self._monitor(x_center, y_center)
+        column = int((x_center - left) * divisions / max(right - left, 1))
+        row = int((y_center - top) * divisions / max(bottom - top, 1))
+        return min(max(column, 0), divisions - 1), min(max(row, 0), divisions - 1)
+    
+    @classmethod
+    def pixel_bucket(cls, position):
+        """Faixa (coluna, linha) pelos limites fixos em pixels dos estilos simple/html"""
+        x_center = (position[0] + position[2]) // 2
+        y_center = (position[1] + position[3]) // 2
+        column = 0 if x_center < cls.PIXEL_COLUMNS[0] else (2 if x_center > cls.PIXEL_COLUMNS[1] else 1)
+        row = 0 if y_center < cls.PIXEL_ROWS[0] else (2 if y_center > cls.PIXEL_ROWS[1] else 1)
+        return column, row
+    
+    def position_description(self, position):
+        """Frase de posição no estilo contextual (quartos do monitor)"""
+        column, row = self.position_bucket(position, 4)
+        return self.QUARTERS[column] + self.VERTICAL_QUARTERS[row]
+    
+    @staticmethod
+    def app_context(foreground):
+        """Contexto da aplicação usado pelas regras do estilo contextual"""
+        if foreground is None:
+            return None
+        if foreground.is_browser:
+            if foreground.is_social_media:
+                return 'social'
+            return 'gmail' if 'gmail' in foreground.title.lower() else None
+        if foreground.is_document:
+            return 'document'
+        if foreground.is_code_editor:
+            return 'code'
+        return None
+    
+    def describe(self, element, style='simple', app_context=None):
+        """Descrição de um elemento; no estilo contextual, o contexto vem da janela em primeiro plano"""
+        if style == 'contextual' and app_context is None and self.foreground_context:
+            app_context = self.app_context(self.foreground_context.get())
+        
+        text = " ".join((element.text or "").split())
+        element_type = element.element_type.value
+        position = element.position
+        width = position[2] - position[0]
+        height = position[3] - position[1]
+        
+        # Tamanho só entra na chave quando aparece na descrição ou decide o tipo
+        size = ((width, height) if not text or element.element_type == UIElementType.UNKNOWN or
+                text.startswith("Elemento em") else None)
+        flag = element.accessibility_id if element.accessibility_id in ("browser_element", "tab_focused") else None
+        existing = element.description if style == 'html' else None
+        bucket = self.position_bucket(position, 4) if style == 'contextual' else self.pixel_bucket(position)
+        key = (style, element_type, text, bucket, size, flag, existing,
+               app_context if style == 'contextual' else None)
+        
+        with self.lock:
+            description = self.cache.get(key)
+            if description is not None:
+                self.cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return description
+        
+        self.stats['misses'] += 1
+        description = self._render(style, element_type, text, bucket, size, flag, existing, app_context)
+        with self.lock:
+            self.cache[key] = description
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return description
+    
+    def describe_many(self, elements, style='simple'):
+        """Descreve uma lista de elementos, resolvendo o contexto da aplicação uma única vez"""
+        app_context = None
+        if style == 'contextual' and self.foreground_context:
+            app_context = self.app_context(self.foreground_context.get())
+        return [self.describe(elem, style, app_context) for elem in elements]
+    
+    def _truncate(self, text, style):
+        limit = self.MAX_TEXT[style]
+        if limit and len(text) > limit:
+            return text[:limit - 3] + "..."
+        return text
+    
+    def _render(self, style, element_type, text, bucket, size, flag, existing, app_context):
+        column, row = bucket
+        
+        if style == 'html':
+            # Descrição de acessibilidade já fornecida pelo elemento
+            if existing:
+                return self.LABELLED(element_type, existing)
+        
+        elif style == 'simple':
+            # Tipo inferido pelo texto para elementos de navegador
+            if flag == "browser_element" and text:
+                lower = text.lower()
+                for keywords, inferred_type in self.BROWSER_TYPE_RULES:
+                    if any(keyword in lower for keyword in keywords):
+                        element_type = inferred_type
+                        break
+                else:
+                    if lower.startswith(self.LINK_PREFIXES) or lower.endswith(self.LINK_SUFFIXES):
+                        element_type = "link"
+            
+            # Tipo pelas proporções
+            if element_type == UIElementType.UNKNOWN.value:
+                width, height = size
+                if width < 50 and height < 50 and abs(width - height) < 10:
+                    element_type = "botão"
+                elif width > height * 3:
+                    element_type = "campo de texto"
+                elif height > width * 1.5:
+                    element_type = "barra de rolagem"
+                else:
+                    element_type = "elemento"
+            
+            # Texto padrão de posição não é texto lido
+            if text.startswith("Elemento em"):
+                text = ""
+        
+        if style == 'contextual':
+            description = (self.WITH_TEXT(element_type, text) if text else self.SIZED(element_type, *size))
+            description += self.QUARTERS[column] + self.VERTICAL_QUARTERS[row]
+            
+            # Contexto específico da aplicação
+            lower = text.lower()
+            if app_context and (app_context not in self.BUTTON_ONLY_CONTEXTS or element_type == "botão"):
+                for keywords, suffix in self.APP_CONTEXT_RULES[app_context]:
+                    if any(keyword in lower for keyword in keywords):
+                        description += suffix
+                        break
+        elif text:
+            description = self.WITH_TEXT(element_type, self._truncate(text, style))
+            if element_type in self.POSITIONED_TYPES:
+                description += self.THIRDS_WITH_TEXT[column] + self.VERTICAL_THIRDS[row]
+            return description
+        else:
+            description = self.SIZED(element_type, *size) + self.THIRDS[column] + self.VERTICAL_THIRDS[row]
+        
+        if flag == "tab_focused":
+            description += " (em foco)"
+        return description
+
 class ScreenReader:
     """Classe principal que coordena todas as funcionalidades do leitor de tela"""
     
+    # Categorias da navegação estruturada e seus nomes falados
+    NAVIGATION_NAMES = {
+        'headings': 'cabeçalhos',
+        'links': 'links',
+        'regions': 'regiões',
+        'forms': 'elementos de formulário',
+        'tables': 'tabelas',
+    }
+    
     def __init__(self):
         # Carregar configurações
         self.config = self.load_config()
         
         # Inicializar componentes
         self.accessibility_manager = AccessibilityManager()
-        self.html_accessibility_manager = HTMLAccessibilityManager(self.accessibility_manager)  
-        self.vision_manager = VisionManager(self.config)
+        self.foreground_context = ForegroundContext(AppProfiler(), self.accessibility_manager)
+        self.description_engine = DescriptionEngine(self.foreground_context)
+        self.html_accessibility_manager = HTMLAccessibilityManager(
+            self.accessibility_manager, self.foreground_context,
+            cdp_port=self.config.getint('accessibility', 'cdp_port', fallback=0)
+        )
+        self.vision_manager = VisionManager(self.config, self.foreground_context)
         self.ai_manager = AIManager(self.config)
         self.speech_manager = SpeechManager(self.config)
         
         # Fila de comandos para processamento assíncrono
         self.command_queue = queue.Queue()
         
+        # Estado por janela/aba para retorno instantâneo após Alt+Tab
+        self.window_states = WindowStateCache(
+            int(self.config.getfloat('general', 'window_state_budget_mb', fallback=16) * 1024 * 1024)
+        )
+        self.active_window_key = None
+        self.active_window_rect = None
+        
+        # Pré-OCR da janela ativa usando CPU ociosa
+        self.idle_prefetcher = None
+        if (self.config.getboolean('general', 'idle_prefetch', fallback=True) and
+                self.vision_manager.ocr_scheduler is not None):
+            self.idle_prefetcher = IdlePrefetcher(
+                self,
+                idle_delay=self.config.getfloat('general', 'idle_prefetch_delay', fallback=1.0),
+                tile_size=self.config.getint('general', 'idle_prefetch_tile', fallback=400)
+            )
+        
+        # Pré-busca da região onde o cursor deve parar
+        self.cursor_prefetcher = None
+        if (self.config.getboolean('general', 'cursor_prefetch', fallback=True) and
+                self.vision_manager.reader is not None):
+            self.cursor_prefetcher = CursorPrefetcher(
+                self,
+                hit_radius=self.config.getint('general', 'cursor_prefetch_radius', fallback=60),
+                max_distance=self.config.getint('general', 'cursor_prefetch_max_distance', fallback=400),
+                ttl=self.config.getfloat('general', 'cursor_prefetch_ttl', fallback=2.0)
+            )
+        
         # Estado do leitor
         self.running = False
         self.paused = False
@@ -1703,8 +6372,18 @@ class ScreenReader:
         self.current_elements = []
         self.current_index = -1
         
+        # Trilhas dos elementos detectados por visão entre quadros; (id da trilha, elemento) em foco
+        self.element_tracker = ElementTracker()
+        self.focused_track = None
+        
+        # Navegação estruturada: índices por categoria mantidos entre comandos
+        self.role_index = AccessibilityRoleIndex()
+        self.navigation_category = None
+        self.structured_mode = False
+        
         # Definir atalhos de teclado
         self.setup_keyboard_shortcuts()
+        self.setup_structured_navigation()
         
         # Adicionar monitor de teclado de baixo nível
         self.setup_keyboard_monitoring()
@@ -1721,7 +6400,15 @@ class ScreenReader:
             'use_accessibility_api': 'true',
             'use_vision': 'true',
             'debug_mode': 'false',
-            'auto_adjust_performance': 'true'  # NOVO: ajustar configurações baseado no hardware
+            'auto_adjust_performance': 'true',  # NOVO: ajustar configurações baseado no hardware
+            'idle_prefetch': 'true',           # Pré-OCR da janela ativa quando a CPU está ociosa
+            'idle_prefetch_delay': '1.0',      # Segundos sem trabalho interativo antes do pré-OCR
+            'idle_prefetch_tile': '400',       # Tamanho (px) dos blocos processados em segundo plano
+            'cursor_prefetch': 'true',         # Antecipar OCR onde o cursor deve parar
+            'cursor_prefetch_radius': '60',    # Distância (px) para aproveitar uma previsão
+            'cursor_prefetch_max_distance': '400',  # Alcance máximo (px) da previsão de parada
+            'cursor_prefetch_ttl': '2.0',      # Segundos de validade de uma região antecipada
+            'window_state_budget_mb': '16'     # Memória para o estado guardado de janelas/abas recentes
         }
         
         config['ai'] = {
@@ -1738,7 +6425,21 @@ class ScreenReader:
             'use_ocr': 'true',
             'ocr_confidence': '0.15',      # ALTERADO: limiar muito mais baixo para textos em botões
             'multi_processing': 'true',    # NOVO: processar imagem com múltiplas técnicas
-            'enhance_small_elements': 'true'  # NOVO: melhoria para botões pequenos
+            'enhance_small_elements': 'true',  # NOVO: melhoria para botões pequenos
+            'ocr_background_budget': '0.3',    # Fração de CPU para completar OCR em segundo plano
+            'ocr_background_piece_height': '96',  # Altura máxima das faixas lidas entre pausas em segundo plano
+            'ocr_cascade_threshold': '0.6',    # Confiança para aceitar o primeiro estágio do OCR
+            'ocr_lexicon_correction': 'true',  # Corrigir OCR pelo vocabulário de UI (SymSpell)
+            'ocr_lexicon_threshold': '0.35',   # Confiança aceita quando todo o texto está no vocabulário
+            'ocr_base_dictionary': 'lexicons/base,/usr/share/dict/words',  # Palavras corretas nunca corrigidas
+            'lexicon_folder': 'lexicons',      # Listas de palavras por aplicação (<app>.txt)
+            'ocr_backend': 'eager',            # eager, torchscript ou onnx (inferência otimizada em CPU)
+            'ocr_backend_threads': '0',        # Threads do ONNX Runtime (0 = automático)
+            'record_ocr_crops': '',            # Pasta para gravar recortes usados por --comparar-ocr
+            'code_line_grid': 'true',          # Ler editores de código e terminais linha a linha
+            'layout_atlas': 'true',            # Reaproveitar elementos fixos já confirmados por aplicação
+            'layout_atlas_file': 'layout_atlas.json',
+            'layout_atlas_min_hits': '3'       # Leituras idênticas para confirmar uma caixa do atlas
         }
         
         config['speech'] = {
@@ -1758,7 +6459,19 @@ class ScreenReader:
             'simplify_descriptions': 'false', # NOVO: simplificar descrições
             'verbosity_level': '2',          # NOVO: nível de detalhes (1-3)
             'auto_highlight': 'true',        # NOVO: destacar elemento em foco
-            'focus_border_color': 'yellow'   # NOVO: cor da borda para elementos em foco
+            'focus_border_color': 'yellow',  # NOVO: cor da borda para elementos em foco
+            'cdp_port': '0'                  # Porta de depuração remota do Chromium (0 = desativado)
+        }
+        
+        # Seção para a camada de motores de OCR e suas regras de encaminhamento
+        config['ocr_engines'] = {
+            'default_engine': 'easyocr',      # Motor para rótulos pequenos e estilizados
+            'clean_text_engine': 'tesseract', # Motor para blocos grandes de texto limpo
+            'tesseract_enabled': 'true',      # Usado apenas se pytesseract e o binário estiverem instalados
+            'tesseract_languages': 'por+eng',
+            'large_text_min_width': '200',    # Tamanho mínimo (px) para considerar um bloco grande
+            'large_text_min_height': '40',
+            'min_binary_ratio': '0.9'         # Fração de pixels quase preto/branco para texto "limpo"
         }
         
         # NOVA seção para feedback de áudio
@@ -1839,82 +6552,7 @@ class ScreenReader:
     def generate_contextual_description(self, element, parent_context=None):
         """Gera descrição contextual rica para elementos, considerando o contexto da aplicação e página"""
         try:
-            # Obter informações da aplicação atual
-            import win32gui
-            hwnd = win32gui.GetForegroundWindow()
-            window_title = win32gui.GetWindowText(hwnd)
-            
-            # Identificar o tipo de aplicação
-            is_browser = any(browser in window_title.lower() for browser in ["chrome", "firefox", "edge", "safari", "opera"])
-            is_social_media = any(site in window_title.lower() for site in ["facebook", "instagram", "twitter", "linkedin", "youtube"])
-            is_document = any(app in window_title.lower() for app in ["word", "excel", "powerpoint", "pdf", "doc", "documento"])
-            is_code_editor = any(editor in window_title.lower() for editor in ["code", "visual studio", "intellij", "pycharm", "sublime"])
-            
-            # Obter tipo e texto do elemento
-            element_type = element.element_type.value
-            element_text = element.text.strip() if element.text else ""
-            
-            # 1. Descrição básica baseada no tipo de elemento
-            if element_text:
-                basic_desc = f"{element_type} com texto '{element_text}'"
-            else:
-                width = element.position[2] - element.position[0]
-                height = element.position[3] - element.position[1]
-                basic_desc = f"{element_type} de {width} por {height} pixels"
-            
-            # 2. Adicionar contexto de posição
-            position_context = self._get_position_description(element.position)
-            
-            # 3. Adicionar contexto específico da aplicação
-            app_context = ""
-            
-            if is_browser:
-                if is_social_media:
-                    # Contexto para redes sociais
-                    if "curtir" in element_text.lower() or "like" in element_text.lower():
-                        app_context = " - botão para curtir publicação"
-                    elif "comentar" in element_text.lower() or "comment" in element_text.lower():
-                        app_context = " - botão para comentar publicação"
-                    elif "compartilhar" in element_text.lower() or "share" in element_text.lower():
-                        app_context = " - botão para compartilhar publicação"
-                    elif "seguir" in element_text.lower() or "follow" in element_text.lower():
-                        app_context = " - botão para seguir usuário"
-                    elif "mensagem" in element_text.lower() or "message" in element_text.lower():
-                        app_context = " - botão para enviar mensagem"
-                elif "gmail" in window_title.lower():
-                    # Contexto para Gmail
-                    if "enviar" in element_text.lower() or "send" in element_text.lower():
-                        app_context = " - botão para enviar email"
-                    elif "anexar" in element_text.lower() or "attach" in element_text.lower():
-                        app_context = " - botão para anexar arquivo"
-                    elif "responder" in element_text.lower() or "reply" in element_text.lower():
-                        app_context = " - botão para responder email"
-            elif is_document:
-                # Contexto para editores de documento
-                if element_type == "botão":
-                    if any(action in element_text.lower() for action in ["salvar", "save"]):
-                        app_context = " - botão para salvar documento"
-                    elif any(action in element_text.lower() for action in ["imprimir", "print"]):
-                        app_context = " - botão para imprimir documento"
-            elif is_code_editor:
-                # Contexto para editores de código
-                if element_type == "botão":
-                    if any(action in element_text.lower() for action in ["executar", "run", "debug"]):
-                        app_context = " - botão para executar código"
-                    elif any(action in element_text.lower() for action in ["commit", "push", "git"]):
-                        app_context = " - botão para operação git"
-            
-            # 4. Integrar todas as partes da descrição
-            full_description = f"{basic_desc}{position_context}"
-            if app_context:
-                full_description += app_context
-                
-            # 5. Adicionar estado de foco se aplicável
-            if hasattr(element, 'is_focused') and element.is_focused:
-                full_description += " (em foco)"
-            
-            return full_description
-            
+            return self.description_engine.describe(element, 'contextual')
         except Exception as e:
             logger.error(f"Erro ao gerar descrição contextual: {e}")
             # Fallback para descrição simples
@@ -1924,40 +6562,7 @@ class ScreenReader:
         
     def _get_position_description(self, position):
         """Gera descrição de posição mais natural"""
-        x1, y1, x2, y2 = position
-        width = x2 - x1
-        height = y2 - y1
-        
-        # Obter posição relativa na tela
-        screen_width, screen_height = 1920, 1080  # Valores padrão
-        try:
-            import pyautogui
-            screen_width, screen_height = pyautogui.size()
-        except:
-            pass
-        
-        x_center = (x1 + x2) / 2
-        y_center = (y1 + y2) / 2
-        
-        # Posição horizontal
-        if x_center < screen_width * 0.25:
-            h_position = " no lado esquerdo"
-        elif x_center < screen_width * 0.5:
-            h_position = " na parte central-esquerda"
-        elif x_center < screen_width * 0.75:
-            h_position = " na parte central-direita"
-        else:
-            h_position = " no lado direito"
-        
-        # Posição vertical
-        if y_center < screen_height * 0.25:
-            v_position = " superior"
-        elif y_center < screen_height * 0.75:
-            v_position = " inferior"
-        else:
-            v_position = ""
-        
-        return h_position + v_position
+        return self.description_engine.position_description(position)
 
     def setup_keyboard_monitoring(self):
         """Configura um monitor de teclado de baixo nível para detectar TAB"""
@@ -2033,6 +6638,9 @@ class ScreenReader:
             return
         
         try:
+            # Trocar o estado guardado quando a janela ou a aba em primeiro plano muda
+            self.check_window_switch()
+            
             # Log a cada 20 ciclos aproximadamente
             if hasattr(self, '_cycle_counter'):
                 self._cycle_counter += 1
@@ -2061,6 +6669,9 @@ class ScreenReader:
                 self.processed_once = True
                 self.previous_mouse_position = (current_x, current_y)
                 
+                if self.vision_manager.ocr_scheduler:
+                    self.vision_manager.ocr_scheduler.note_interaction()
+                
                 logger.info(f"Mouse moveu para: ({current_x}, {current_y}), processando região...")
                 
                 # Capturar região ao redor do cursor
@@ -2073,135 +6684,104 @@ class ScreenReader:
                 if browser:
                     logger.info(f"Processando elemento em navegador: {browser}")
                     
+                    # Aplicar mudanças da página de forma incremental
+                    tree_changes = self.html_accessibility_manager.get_tree_changes()
+                    if tree_changes:
+                        self.apply_tree_changes(tree_changes)
+                    
                     # PRIORIDADE 1: Tentar obter elementos via acessibilidade HTML
-                    html_elements = self.html_accessibility_manager.get_html_accessibility_tree(region)
+                    # Consulta direta do elemento sob o cursor; a árvore da região fica como alternativa
+                    cursor_element = self.html_accessibility_manager.get_element_at_point(current_x, current_y)
                     
-                    if html_elements:
-                        logger.info(f"Elementos HTML detectados: {len(html_elements)}")
+                    if cursor_element is None:
+                        html_snapshot = self.html_accessibility_manager.get_html_accessibility_snapshot(region)
                         
-                        # Encontrar elemento sob o cursor
-                        cursor_element = None
-                        min_distance = float('inf')
+                        if len(html_snapshot):
+                            logger.info(f"Elementos HTML detectados: {len(html_snapshot)}")
+                            
+                            # Elemento sob o cursor ou, se nenhum, o mais próximo
+                            cursor_element = html_snapshot.at_point(current_x, current_y)
+                    
+                    if cursor_element:
+                        # Verificar se este elemento é diferente do último processado
+                        is_new_element = self._is_new_element(cursor_element)
                         
-                        for elem in html_elements:
-                            # Verificar se o cursor está dentro do elemento
-                            if (elem.position[0] <= current_x <= elem.position[2] and
-                                elem.position[1] <= current_y <= elem.position[3]):
-                                cursor_element = elem
-                                break
+                        if is_new_element:
+                            # Rótulos da API de acessibilidade alimentam o vocabulário do OCR
+                            if self.vision_manager.lexicon and cursor_element.text:
+                                self.vision_manager.lexicon.learn(cursor_element.text,
+                                                                  self.foreground_context.get().app_name)
+                            
+                            # Gerar descrição para o elemento
+                            description = self.generate_html_description(cursor_element)
+                            cursor_element.description = description
                             
-                            # Se não está diretamente sobre um elemento, encontrar o mais próximo
-                            cx = (elem.position[0] + elem.position[2]) / 2
-                            cy = (elem.position[1] + elem.position[3]) / 2
-                            dist = ((cx - current_x)**2 + (cy - current_y)**2)**0.5
+                            # Atualizar elemento em foco
+                            self.focused_element = cursor_element
                             
-                            if dist < min_distance:
-                                min_distance = dist
-                                cursor_element = elem
-                        
-                        if cursor_element:
-                            # Verificar se este elemento é diferente do último processado
-                            is_new_element = self._is_new_element(cursor_element)
+                            # Falar a descrição
+                            logger.info(f"Falando descrição HTML: {description}")
+                            self.speech_manager.speak(description)
                             
-                            if is_new_element:
-                                # Gerar descrição para o elemento
-                                description = self.generate_html_description(cursor_element)
-                                cursor_element.description = description
-                                
-                                # Atualizar elemento em foco
-                                self.focused_element = cursor_element
-                                
-                                # Falar a descrição
-                                logger.info(f"Falando descrição HTML: {description}")
-                                self.speech_manager.speak(description)
-                                
-                                # Como encontramos um elemento HTML, podemos retornar
-                                return
+                            # Como encontramos um elemento HTML, podemos retornar
+                            return
                 
                 # PRIORIDADE 2: Se não encontrou elementos HTML ou não estamos em navegador, usar OCR
-                screenshot = self.capture_screen_region(region)
-                if screenshot:
-                    elements = self.vision_manager.detect_elements(screenshot)
+                # Região já antecipada pela previsão de trajetória do cursor dispensa captura e detecção
+                prefetched = self.cursor_prefetcher.take(current_x, current_y, region) if self.cursor_prefetcher else None
+                screenshot_origin = region[:2]
+                if prefetched is not None:
+                    table, screenshot, screenshot_origin = prefetched
+                else:
+                    screenshot = self.capture_screen_region(region)
+                if prefetched is not None or screenshot:
+                    if prefetched is None:
+                        table = ElementTable.from_elements(self.vision_manager.detect_elements(
+                            screenshot, focus_point=(current_x - region[0], current_y - region[1]), origin=region[:2]
+                        ))
                     
-                    logger.info(f"Elementos detectados visualmente: {len(elements)}")
+                    logger.info(f"Elementos detectados visualmente: {len(table)}")
                     
-                    if elements:
+                    if len(table):
+                        # Tabela do quadro em coordenadas globais; só o elemento escolhido vira objeto
+                        table = table.translate(region[0], region[1])
+                        if is_log_cycle:
+                            logger.info(f"Memória dos elementos do quadro: {table.memory_bytes()} bytes")
+                        
+                        # Associar os elementos do quadro às trilhas (ids estáveis entre quadros)
+                        track_ids = self.element_tracker.update(table, screenshot, screenshot_origin)
+                        
                         # Encontrar elemento sob o cursor ou mais próximo
-                        cursor_element = None
-                        min_distance = float('inf')
+                        index = table.hit_test(current_x, current_y)
+                        cursor_element = table.element(index)
+                        track_id = track_ids[index]
                         
-                        for elem in elements:
-                            # Ajustar posições para coordenadas globais
-                            global_pos = (
-                                elem.position[0] + region[0],
-                                elem.position[1] + region[1],
-                                elem.position[2] + region[0],
-                                elem.position[3] + region[1]
-                            )
-                            
-                            # Verificar se o cursor está dentro do elemento
-                            if (global_pos[0] <= current_x <= global_pos[2] and
-                                global_pos[1] <= current_y <= global_pos[3]):
-                                cursor_element = UIElement(
-                                    elem.element_type,
-                                    global_pos,
-                                    elem.text,
-                                    elem.confidence
-                                )
-                                break
-                            
-                            # Se não está diretamente sobre um elemento, encontrar o mais próximo
-                            cx = (global_pos[0] + global_pos[2]) / 2
-                            cy = (global_pos[1] + global_pos[3]) / 2
-                            dist = ((cx - current_x)**2 + (cy - current_y)**2)**0.5
-                            
-                            if dist < min_distance:
-                                min_distance = dist
-                                cursor_element = UIElement(
-                                    elem.element_type,
-                                    global_pos,
-                                    elem.text,
-                                    elem.confidence
-                                )
+                        # Texto ainda não lido neste quadro (OCR adiado): usar o da trilha se os pixels não mudaram
+                        if not cursor_element.text:
+                            cursor_element.text = self.element_tracker.cached(track_id, 'text') or ""
                         
-                        if cursor_element:
-                            # Verificar se este elemento é diferente do último processado
-                            is_new_element = True
+                        # Mesmo elemento em foco: mesma trilha e o foco não foi movido por outro caminho
+                        is_new_element = (self.focused_track is None or self.focused_track[0] != track_id or
+                                          self.focused_track[1] is not self.focused_element)
+                        
+                        if is_new_element:
+                            # Descrição guardada na trilha enquanto os pixels não mudam
+                            description_key = ('description', cursor_element.text)
+                            description = self.element_tracker.cached(track_id, description_key)
+                            if description is None:
+                                description = self.generate_simple_description(cursor_element)
+                                self.element_tracker.store(track_id, description_key, description)
+                            cursor_element.description = description
                             
-                            if self.focused_element:
-                                # Verificar sobreposição significativa com elemento anterior
-                                old_area = (self.focused_element.position[2] - self.focused_element.position[0]) * \
-                                        (self.focused_element.position[3] - self.focused_element.position[1])
-                                new_area = (cursor_element.position[2] - cursor_element.position[0]) * \
-                                        (cursor_element.position[3] - cursor_element.position[1])
-                                
-                                # Calcular interseção
-                                x_overlap = max(0, min(self.focused_element.position[2], cursor_element.position[2]) - 
-                                            max(self.focused_element.position[0], cursor_element.position[0]))
-                                y_overlap = max(0, min(self.focused_element.position[3], cursor_element.position[3]) - 
-                                            max(self.focused_element.position[1], cursor_element.position[1]))
-                                
-                                overlap_area = x_overlap * y_overlap
-                                smaller_area = min(old_area, new_area)
-                                
-                                # Se a sobreposição é mais de 70% da área do menor elemento, considerar como o mesmo
-                                if smaller_area > 0 and overlap_area / smaller_area > 0.7:
-                                    # Se o texto for o mesmo, considerar como o mesmo elemento
-                                    if self.focused_element.text == cursor_element.text:
-                                        is_new_element = False
-                                        logger.info("Elemento sobreposto ao anterior, considerando igual")
+                            # Atualizar elemento em foco
+                            self.focused_element = cursor_element
+                            self.focused_track = (track_id, cursor_element)
                             
-                            if is_new_element:
-                                # Gerar descrição para o elemento
-                                description = self.generate_simple_description(cursor_element)
-                                cursor_element.description = description
-                                
-                                # Atualizar elemento em foco
-                                self.focused_element = cursor_element
-                                
-                                # Falar a descrição
-                                logger.info(f"Falando nova descrição: {description}")
-                                self.speech_manager.speak(description)
+                            # Falar a descrição
+                            logger.info(f"Falando nova descrição: {description}")
+                            self.speech_manager.speak(description)
+                        else:
+                            logger.info("Elemento na mesma trilha do anterior, considerando igual")
             
         except Exception as e:
             logger.error(f"Erro ao processar tela: {e}")
@@ -2213,9 +6793,8 @@ class ScreenReader:
             return True
             
         # Verificar se os IDs de acessibilidade são diferentes
-        if hasattr(new_element, 'accessibility_id') and hasattr(self.focused_element, 'accessibility_id'):
-            if new_element.accessibility_id != self.focused_element.accessibility_id:
-                return True
+        if new_element.accessibility_id != self.focused_element.accessibility_id:
+            return True
                 
         # Verificar sobreposição significativa
         old_area = (self.focused_element.position[2] - self.focused_element.position[0]) * \
@@ -2242,77 +6821,13 @@ class ScreenReader:
 
     def generate_html_description(self, element):
         """Gera uma descrição para elementos HTML que usa informações de acessibilidade"""
-        # Usar informações de acessibilidade para gerar uma descrição mais rica
-        element_type = element.element_type.value
-        
-        # Se o elemento já tem uma descrição de acessibilidade, usá-la
-        if hasattr(element, 'description') and element.description:
-            return f"{element_type}: {element.description}"
-            
-        # Se tem texto, usar o texto
-        if element.text:
-            # Limpar texto
-            clean_text = element.text.strip()
-            
-            # Truncar textos longos
-            if len(clean_text) > 50:
-                clean_text = clean_text[:47] + "..."
-                
-            description = f"{element_type} com texto '{clean_text}'"
-            
-            # Adicionar posição para elementos importantes
-            if element_type in ["botão", "link", "caixa de seleção"]:
-                x_center = (element.position[0] + element.position[2]) // 2
-                y_center = (element.position[1] + element.position[3]) // 2
-                
-                # Adicionar posição relativa
-                if x_center < 400:
-                    description += " no lado esquerdo"
-                elif x_center > 800:
-                    description += " no lado direito"
-                    
-                if y_center < 300:
-                    description += " superior"
-                elif y_center > 600:
-                    description += " inferior"
-                    
-            return description
-        
-        # Se não há texto, usar descrição baseada no tipo e tamanho
-        width = element.position[2] - element.position[0]
-        height = element.position[3] - element.position[1]
-        
-        description = f"{element_type} de {width} por {height} pixels"
-        
-        # Adicionar posição relativa
-        x_center = (element.position[0] + element.position[2]) // 2
-        y_center = (element.position[1] + element.position[3]) // 2
-        
-        if x_center < 400:
-            description += " no lado esquerdo"
-        elif x_center > 800:
-            description += " no lado direito"
-        else:
-            description += " no centro"
-            
-        if y_center < 300:
-            description += " superior"
-        elif y_center > 600:
-            description += " inferior"
-            
-        return description
+        return self.description_engine.describe(element, 'html')
 
     def detect_visual_changes_after_tab(self):
         """Detecta mudanças visuais precisas após Tab ser pressionado"""
         try:
             # Verificar se estamos em um navegador
-            import win32gui
-            hwnd = win32gui.GetForegroundWindow()
-            title = win32gui.GetWindowText(hwnd)
-            
-            is_browser = any(browser in title.lower() for browser in ["chrome", "firefox", "edge", "safari", "opera"])
-            
-            if not is_browser:
+            if not self.foreground_context.get().is_browser:
                 return False
             
             # Capturar screenshot da janela ativa
@@ -2448,28 +6963,7 @@ class ScreenReader:
     def is_accessibility_compatible_app(self):
         """Verifica se o aplicativo atual suporta APIs de acessibilidade avançadas"""
         try:
-            import win32gui
-            hwnd = win32gui.GetForegroundWindow()
-            title = win32gui.GetWindowText(hwnd)
-            class_name = win32gui.GetClassName(hwnd)
-            
-            # Lista de aplicações conhecidas com bom suporte a acessibilidade
-            compatible_apps = [
-                # Navegadores (já tratados pelo HTML Accessibility Manager)
-                'chrome', 'firefox', 'edge', 'opera', 'safari',
-                # Aplicações Office
-                'word', 'excel', 'powerpoint', 'outlook',
-                # Editores de código
-                'vscode', 'visual studio', 'intellij', 'pycharm',
-                # Outras aplicações
-                'adobe', 'reader'
-            ]
-            
-            for app in compatible_apps:
-                if app.lower() in title.lower():
-                    return True
-                    
-            return False
+            return self.foreground_context.get().is_accessibility_compatible
         except:
             return False
 
@@ -2479,7 +6973,9 @@ class ScreenReader:
             if not self.command_queue.empty():
                 command, args = self.command_queue.get(block=False)
                 
-                if command == 'next':
+                if command in ('next', 'prev') and self.structured_mode and self.navigation_category:
+                    self.navigate_web_elements(self.navigation_category, 1 if command == 'next' else -1)
+                elif command == 'next':
                     self.navigate_next()
                 elif command == 'prev':
                     self.navigate_prev()
@@ -2491,6 +6987,12 @@ class ScreenReader:
                     self.capture_at_cursor()
                 elif command == 'tab_pressed':  # Nova condição para TAB
                     self.handle_tab_press()
+                elif command.startswith('navigate_') and command[len('navigate_'):] in self.NAVIGATION_NAMES:
+                    self.navigate_web_elements(command[len('navigate_'):], args or 1)
+                elif command == 'toggle_navigation_mode':
+                    self.toggle_navigation_mode()
+                elif command == 'page_info':
+                    self.page_info()
                     
         except queue.Empty:
             pass
@@ -2518,6 +7020,110 @@ class ScreenReader:
         self.focused_element = self.current_elements[self.current_index]
         self.read_current()
     
+    def check_window_switch(self):
+        """Guarda o estado da janela anterior e restaura o da nova ao trocar de janela ou aba
+        
+        O estado guardado só é restaurado se a maior parte dos blocos da janela continua com os
+        mesmos pixels; caso contrário a navegação recomeça do zero para essa janela.
+        """
+        foreground = self.foreground_context.get()
+        key = (foreground.hwnd, foreground.title)
+        window_rect = self.foreground_context.get_window_rect()
+        if key == self.active_window_key:
+            # Acompanhar a posição da janela ativa (a navegação é guardada com o retângulo atual)
+            self.active_window_rect = window_rect or self.active_window_rect
+            return
+        
+        previous_key, self.active_window_key = self.active_window_key, key
+        previous_rect, self.active_window_rect = self.active_window_rect, window_rect
+        if previous_key is not None:
+            self.window_states.save_navigation(previous_key, self.current_elements, self.current_index,
+                                               self.focused_element, self.navigation_category, self.role_index,
+                                               rect=previous_rect)
+        
+        self.current_elements = []
+        self.current_index = -1
+        self.focused_element = None
+        self.navigation_category = None
+        self.role_index = AccessibilityRoleIndex()
+        self.element_tracker.reset()
+        self.focused_track = None
+        
+        state = self.window_states.get(key)
+        if state is None:
+            return
+        
+        rect = self.active_window_rect
+        if rect is None:
+            return
+        try:
+            screenshot = self.capture_screen_region(rect)
+            tile_size = self.config.getint('general', 'idle_prefetch_tile', fallback=400)
+            valid = self.window_states.revalidate(
+                key, WindowStateCache.tile_hashes(np.asarray(screenshot), rect, tile_size)
+            )
+        except Exception as e:
+            logger.debug(f"Não foi possível revalidar o estado da janela: {e}")
+            return
+        
+        if valid is None or valid >= 0.8:
+            # Janela movida: deslocar a navegação guardada junto com ela
+            if state['rect'] is not None and tuple(state['rect'][:2]) != tuple(rect[:2]):
+                dx, dy = rect[0] - state['rect'][0], rect[1] - state['rect'][1]
+                moved = list(state['elements'])
+                if state['focused'] is not None and all(elem is not state['focused'] for elem in moved):
+                    moved.append(state['focused'])
+                for elem in moved:
+                    x1, y1, x2, y2 = elem.position
+                    elem.position = (x1 + dx, y1 + dy, x2 + dx, y2 + dy)
+                state['rect'] = rect
+            self.current_elements = state['elements']
+            self.current_index = state['index']
+            self.focused_element = state['focused']
+            self.navigation_category = state['category']
+            if state['role_index'] is not None:
+                self.role_index = state['role_index']
+            self.window_states.stats['restores'] += 1
+            logger.info(f"Estado restaurado para '{foreground.title}' ({len(self.current_elements)} elementos)")
+    
+    def apply_tree_changes(self, events):
+        """Atualiza a lista navegada e o elemento em foco a partir dos eventos do AccessibilityTreeDiffer"""
+        self.role_index.apply_events(events)
+        # Elementos vêm de consultas diferentes (lista, ponto, percurso): casar pelo identificador
+        element_key = AccessibilityRoleIndex.element_key
+        focused_before = self.focused_element
+        focused_key = element_key(focused_before) if focused_before is not None else None
+        replaced = {}
+        removed = set()
+        for event_type, new, old in events:
+            if event_type in ('renamed', 'moved'):
+                replaced[element_key(old)] = new
+            elif event_type == 'removed':
+                removed.add(element_key(old))
+        
+        if self.current_elements and (replaced or removed):
+            updated = []
+            for elem in self.current_elements:
+                key = element_key(elem)
+                if key in removed:
+                    continue
+                updated.append(replaced.get(key, elem))
+            self.current_elements = updated
+            
+            if self.current_index >= len(updated):
+                self.current_index = len(updated) - 1
+        
+        if focused_key in replaced:
+            self.focused_element = replaced[focused_key]
+        
+        # Anunciar a mudança de nome do elemento em foco (ex.: rótulo de botão alterado)
+        for event_type, new, old in events:
+            if event_type == 'renamed' and focused_key is not None and element_key(old) == focused_key and new.text:
+                self.speech_manager.speak(f"{new.element_type.value} agora: {new.text}")
+                break
+        
+        logger.debug(f"Mudanças na árvore de acessibilidade aplicadas: {len(events)}")
+    
     def read_current(self):
         """Lê o elemento atual"""
         if self.focused_element:
@@ -2530,18 +7136,22 @@ class ScreenReader:
     
     def read_all(self):
         """Lê todos os elementos na tela"""
-        if not self.current_elements:
+        elements = self.current_elements
+        
+        # Sem elementos navegados, usar os elementos pré-processados da janela ativa
+        if not elements and self.idle_prefetcher:
+            elements = [elem for elem in self.idle_prefetcher.get_window_elements() if elem.text]
+        
+        if not elements:
             self.speech_manager.speak("Nenhum elemento disponível")
             return
         
-        descriptions = []
-        for elem in self.current_elements:
-            if not elem.description:
-                elem.description = self.ai_manager.generate_description(elem)
-            
-            descriptions.append(elem.description)
+        # Descrições que faltam geradas em lote pelo motor de descrições
+        missing = [elem for elem in elements if not elem.description]
+        for elem, description in zip(missing, self.description_engine.describe_many(missing)):
+            elem.description = description
         
-        self.speech_manager.speak(". ".join(descriptions))
+        self.speech_manager.speak(". ".join(elem.description for elem in elements))
     
     def capture_at_cursor(self):
         """Captura o elemento sob o cursor"""
@@ -2554,31 +7164,41 @@ class ScreenReader:
         
         if screenshot:
             # Detectar elementos
-            elements = self.vision_manager.detect_elements(screenshot)
-            
-            # Encontrar elemento sob o cursor
-            for elem in elements:
-                if (elem.position[0] <= x <= elem.position[2] and
-                    elem.position[1] <= y <= elem.position[3]):
-                    
+            elements = self.vision_manager.detect_elements(screenshot, focus_point=(x - region[0], y - region[1]),
+                                                           origin=region[:2])
+            
+            # Encontrar o elemento mais interno sob o cursor (detecção em coordenadas locais da região)
+            table = ElementTable.from_elements(elements).translate(region[0], region[1])
+            track_ids = self.element_tracker.update(table, screenshot, region[:2])
+            index = table.spatial_index().innermost(x, y)
+            if index is not None:
+                # Classificação e descrição do modelo ficam na trilha enquanto os pixels não mudam
+                track_id = track_ids[index]
+                cached = self.element_tracker.cached(track_id, 'classification')
+                if cached is None:
                     # Classificar elemento
-                    classified = self.ai_manager.classify_element(elem, screenshot)
+                    classified = self.ai_manager.classify_element(table.element(index), screenshot)
                     
                     # Gerar descrição
                     description = self.ai_manager.generate_description(classified)
-                    classified.description = description
-                    
-                    # Atualizar elemento em foco
-                    self.focused_element = classified
-                    
-                    # Adicionar à lista de elementos
-                    if classified not in self.current_elements:
-                        self.current_elements.append(classified)
-                        self.current_index = len(self.current_elements) - 1
-                    
-                    # Falar descrição
-                    self.speech_manager.speak(description)
-                    return
+                    self.element_tracker.store(track_id, 'classification',
+                                               (classified.element_type, classified.confidence, description))
+                else:
+                    classified = table.element(index)
+                    classified.element_type, classified.confidence, description = cached
+                classified.description = description
+                
+                # Atualizar elemento em foco
+                self.focused_element = classified
+                
+                # Adicionar à lista de elementos
+                if classified not in self.current_elements:
+                    self.current_elements.append(classified)
+                    self.current_index = len(self.current_elements) - 1
+                
+                # Falar descrição
+                self.speech_manager.speak(description)
+                return
             
             self.speech_manager.speak("Nenhum elemento detectado sob o cursor")
     
@@ -2644,6 +7264,11 @@ class ScreenReader:
         # Iniciar contador para log periódico
         contador = 0
         
+        if self.idle_prefetcher:
+            self.idle_prefetcher.start()
+        if self.cursor_prefetcher:
+            self.cursor_prefetcher.start()
+        
         try:
             logger.info("Iniciando loop principal...")
             while self.running:
@@ -2686,6 +7311,18 @@ class ScreenReader:
     def cleanup(self):
         """Limpa recursos antes de encerrar"""
         try:
+            if self.idle_prefetcher:
+                self.idle_prefetcher.stop()
+            if self.cursor_prefetcher:
+                self.cursor_prefetcher.stop()
+            
+            atspi_cache = getattr(self.accessibility_manager, 'atspi_cache', None)
+            if atspi_cache:
+                atspi_cache.stop()
+            
+            if getattr(self.vision_manager, 'layout_atlas', None):
+                self.vision_manager.layout_atlas.save(force=True)
+            
             # Liberar recursos do mecanismo de fala
             if hasattr(self, 'speech_manager') and self.speech_manager.engine:
                 self.speech_manager.engine.stop()
@@ -2702,95 +7339,7 @@ class ScreenReader:
 
     def generate_simple_description(self, element):
         """Gera descrições que incluem o texto detectado pelo OCR, otimizado para navegadores"""
-        element_type = element.element_type.value
-        position = element.position
-        width = position[2] - position[0]
-        height = position[3] - position[1]
-        
-        # Verificar se estamos em um navegador
-        is_browser_element = hasattr(element, 'accessibility_id') and element.accessibility_id == "browser_element"
-        
-        # Determinar tipo baseado no texto para elementos de navegador
-        if is_browser_element and hasattr(element, 'text') and element.text:
-            text = element.text.lower()
-            if any(term in text for term in ["curtir", "like", "seguir", "follow", "enviar", "send", "postar", "post"]):
-                element_type = "botão"
-            elif any(term in text for term in ["buscar", "pesquisar", "search", "procurar"]):
-                element_type = "campo de pesquisa"
-            elif text.startswith("http") or text.endswith(".com") or text.endswith(".br") or text.endswith(".net"):
-                element_type = "link"
-        
-        # Definir tipo com base nas proporções
-        if element_type == "elemento desconhecido":
-            if width < 50 and height < 50 and abs(width - height) < 10:
-                element_type = "botão"
-            elif width > height * 3:
-                element_type = "campo de texto"
-            elif height > width * 1.5:
-                element_type = "barra de rolagem"
-            else:
-                element_type = "elemento"
-        
-        # IMPORTANTE: Verificar DIRETAMENTE se há texto detectado pelo OCR
-        # e usar esse texto na descrição
-        if hasattr(element, 'text') and element.text and len(element.text.strip()) > 0:
-            # Limpar texto para não ter caracteres estranhos
-            clean_text = element.text.strip()
-            
-            # Verificar se não é apenas a posição padrão ("Elemento em X,Y")
-            if not clean_text.startswith("Elemento em"):
-                # Para textos longos, truncar
-                if len(clean_text) > 30:
-                    clean_text = clean_text[:27] + "..."
-                    
-                # Esta é a chave: incluir o texto detectado na descrição!
-                description = f"{element_type} com texto '{clean_text}'"
-                
-                # Debug para confirmar que o texto está sendo usado
-                logger.debug(f"Usando texto OCR na descrição: '{clean_text}'")
-                
-                # Adicionar informação de posição para elementos importantes
-                x_center = (position[0] + position[2]) // 2
-                y_center = (position[1] + position[3]) // 2
-                
-                if element_type in ["botão", "link", "checkbox"]:
-                    # Adicionar posição relativa para facilitar localização
-                    if x_center < 400:
-                        description += " no lado esquerdo"
-                    elif x_center > 800:
-                        description += " no lado direito"
-                        
-                    if y_center < 300:
-                        description += " superior"
-                    elif y_center > 600:
-                        description += " inferior"
-                
-                return description
-        
-        # Se não há texto ou não passou nas verificações, usar descrição de posição/tamanho
-        x_center = (position[0] + position[2]) // 2
-        y_center = (position[1] + position[3]) // 2
-        
-        description = f"{element_type} de {width} por {height} pixels"
-        
-        # Adicionar informação de posição relativa
-        if x_center < 400:
-            description += " no lado esquerdo"
-        elif x_center > 800:
-            description += " no lado direito"
-        else:
-            description += " no centro"
-            
-        if y_center < 300:
-            description += " superior"
-        elif y_center > 600:
-            description += " inferior"
-        
-        # Adicionar informação sobre foco de teclado quando relevante
-        if hasattr(element, 'accessibility_id') and element.accessibility_id == "tab_focused":
-            description += " (em foco)"
-        
-        return description
+        return self.description_engine.describe(element, 'simple')
     
     def handle_tab_press(self):
         """Processa o pressionamento da tecla TAB para focar em novo elemento"""
@@ -2891,12 +7440,11 @@ class ScreenReader:
         try:
             # Verificar se estamos em um navegador
             import win32gui
-            hwnd = win32gui.GetForegroundWindow()
-            title = win32gui.GetWindowText(hwnd)
-            
-            is_browser = any(browser in title.lower() for browser in ["chrome", "firefox", "edge", "safari", "opera"])
+            foreground = self.foreground_context.get()
+            hwnd = foreground.hwnd
+            title = foreground.title
             
-            if is_browser:
+            if foreground.is_browser:
                 logger.info(f"Detectado navegador: {title}")
                 
                 # Capturar screenshot ANTES do tab
@@ -3040,6 +7588,11 @@ class ScreenReader:
             # Navegação por formulários: Alt+Ctrl+F
             keyboard.add_hotkey('alt+ctrl+f', lambda: self.command_queue.put(('navigate_forms', None)))
             
+            # Mesmas teclas com Shift: elemento anterior da categoria
+            for key, category in (('h', 'headings'), ('l', 'links'), ('r', 'regions'), ('t', 'tables'), ('f', 'forms')):
+                keyboard.add_hotkey(f'alt+ctrl+shift+{key}',
+                                    lambda category=category: self.command_queue.put((f'navigate_{category}', -1)))
+            
             # Alternar modo de navegação: Alt+Ctrl+M
             keyboard.add_hotkey('alt+ctrl+m', lambda: self.command_queue.put(('toggle_navigation_mode', None)))
             
@@ -3050,8 +7603,17 @@ class ScreenReader:
         except Exception as e:
             logger.error(f"Erro ao configurar navegação estruturada: {e}")
 
-    def navigate_web_elements(self, element_type):
-        """Navega pelos elementos estruturais de uma página web"""
+    def get_role_index(self):
+        """Índices de navegação da página atual, reconstruídos apenas quando a janela ou o título mudam"""
+        foreground = self.foreground_context.get()
+        key = (foreground.hwnd, foreground.title)
+        if self.role_index.key != key:
+            self.html_accessibility_manager.require_runtime_ids()
+            self.role_index.build(key, self._extract_elements_by_role)
+        return self.role_index
+    
+    def navigate_web_elements(self, element_type, direction=1):
+        """Navega pelos elementos estruturais de uma página web (próximo ou anterior da categoria)"""
         browser = self.html_accessibility_manager.detect_browser()
         
         if not browser:
@@ -3059,85 +7621,51 @@ class ScreenReader:
             return
         
         try:
-            # Capturar elementos HTML relevantes
-            elements = []
+            role_index = self.get_role_index()
+            elements = role_index.get(element_type)
             
-            if element_type == 'headings':
-                # Obter todos os cabeçalhos
-                elements = self._extract_elements_by_role(role='heading')
-                self.speech_manager.speak(f"Navegando por {len(elements)} cabeçalhos")
-                
-            elif element_type == 'links':
-                # Obter todos os links
-                elements = self._extract_elements_by_role(role='link')
-                self.speech_manager.speak(f"Navegando por {len(elements)} links")
-                
-            elif element_type == 'regions':
-                # Obter todas as regiões/landmarks
-                elements = self._extract_elements_by_role(role=['region', 'landmark', 'main', 'navigation'])
-                self.speech_manager.speak(f"Navegando por {len(elements)} regiões")
-                
-            elif element_type == 'forms':
-                # Obter elementos de formulário
-                elements = self._extract_elements_by_role(role=['textbox', 'button', 'checkbox', 'radio', 'combobox'])
-                self.speech_manager.speak(f"Navegando por {len(elements)} elementos de formulário")
-                
-            elif element_type == 'tables':
-                # Obter tabelas
-                elements = self._extract_elements_by_role(role='table')
-                self.speech_manager.speak(f"Navegando por {len(elements)} tabelas")
-                
-            # Armazenar elementos para navegação
-            if elements:
-                self.current_elements = elements
-                self.current_index = 0
-                self.focused_element = elements[0]
-                
-                # Ler o primeiro elemento
-                self.read_current()
-            else:
+            if not elements:
                 self.speech_manager.speak(f"Nenhum elemento do tipo solicitado encontrado")
+                return
+            
+            if element_type != self.navigation_category:
+                self.navigation_category = element_type
+                self.speech_manager.speak(f"Navegando por {len(elements)} {self.NAVIGATION_NAMES[element_type]}")
+            
+            # Armazenar elementos para navegação
+            self.current_index = role_index.neighbor(element_type, self.focused_element, direction)
+            self.current_elements = elements
+            self.focused_element = elements[self.current_index]
+            
+            # Ler o elemento
+            self.read_current()
                 
         except Exception as e:
             logger.error(f"Erro na navegação estruturada: {e}")
             self.speech_manager.speak("Erro durante navegação estruturada")
+    
+    def toggle_navigation_mode(self):
+        """Alterna as teclas de próximo/anterior entre todos os elementos e a categoria estruturada atual"""
+        self.structured_mode = not self.structured_mode
+        if self.structured_mode:
+            category = self.NAVIGATION_NAMES.get(self.navigation_category or 'headings')
+            self.speech_manager.speak(f"Navegação estruturada ativada: {category}")
+        else:
+            self.speech_manager.speak("Navegação estruturada desativada")
 
     def _extract_elements_by_role(self, role):
-        """Extrai elementos HTML com base em seu papel (role) de acessibilidade"""
+        """Extrai elementos HTML com base em seu papel (role) de acessibilidade
+        
+        A filtragem é feita pelo backend de acessibilidade quando possível; sem suporte,
+        a árvore completa é filtrada localmente.
+        """
         try:
-            if isinstance(role, str):
-                role = [role]  # Converter para lista para facilitar
-                
-            elements = []
-            
-            # Usar Puppeteer ou biblioteca similar para extrair elementos por role
-            # Este é um método que precisa ser implementado com a biblioteca web específica
-            
-            # Exemplo simplificado usando a instância de HTMLAccessibilityManager existente
-            all_elements = self.html_accessibility_manager.get_html_accessibility_tree()
-            
-            for elem in all_elements:
-                # Mapear tipo de elemento para roles de acessibilidade
-                elem_role = ""
-                
-                if elem.element_type == UIElementType.BUTTON:
-                    elem_role = "button"
-                elif elem.element_type == UIElementType.LINK:
-                    elem_role = "link"
-                elif elem.element_type == UIElementType.TEXT_FIELD:
-                    elem_role = "textbox"
-                elif elem.element_type == UIElementType.CHECKBOX:
-                    elem_role = "checkbox"
-                elif elem.element_type == UIElementType.RADIO:
-                    elem_role = "radio"
-                elif elem.element_type == UIElementType.HEADING:
-                    elem_role = "heading"
-                
-                # Se o role do elemento corresponde a um dos solicitados, adicionar à lista
-                if elem_role in role:
-                    elements.append(elem)
+            elements = self.html_accessibility_manager.find_elements_by_role(role)
+            if elements is not None:
+                return elements
             
-            return elements
+            snapshot = self.html_accessibility_manager.get_html_accessibility_snapshot()
+            return snapshot.with_role(role)
         
         except Exception as e:
             logger.error(f"Erro ao extrair elementos por role: {e}")
@@ -3159,32 +7687,16 @@ class ScreenReader:
                 self.speech_manager.speak("Não foi possível capturar a página atual")
                 return
                 
-            # Extrair elementos principais
-            elements = self.html_accessibility_manager.get_html_accessibility_tree()
-            
             # Contar elementos por tipo
-            headings = 0
-            links = 0
-            buttons = 0
-            forms = 0
-            images = 0
-            
-            for elem in elements:
-                if elem.element_type == UIElementType.HEADING:
-                    headings += 1
-                elif elem.element_type == UIElementType.LINK:
-                    links += 1
-                elif elem.element_type == UIElementType.BUTTON:
-                    buttons += 1
-                elif elem.element_type == UIElementType.TEXT_FIELD:
-                    forms += 1
-                elif elem.element_type == UIElementType.IMAGE:
-                    images += 1
+            role_index = self.get_role_index()
+            headings = role_index.count('headings')
+            links = role_index.count('links')
+            buttons = role_index.count('forms', UIElementType.BUTTON)
+            forms = role_index.count('forms', UIElementType.TEXT_FIELD)
+            images = role_index.count('images')
             
             # Obter título da página
-            import win32gui
-            hwnd = win32gui.GetForegroundWindow()
-            page_title = win32gui.GetWindowText(hwnd)
+            page_title = self.foreground_context.get().title
             
             # Gerar resumo
             summary = f"Página atual: {page_title}. "
@@ -3217,7 +7729,7 @@ class ScreenReader:
             if cpu_count <= 2:
                 # CPU fraca, reduzir o número de threads para OCR
                 if hasattr(self.vision_manager, 'reader') and self.vision_manager.reader:
-                    self.vision_manager.reader = easyocr.Reader(['pt', 'en'], gpu=False, recog_network='standard')
+                    self.vision_manager.reader = self.vision_manager.create_reader(recog_network='standard')
                     logger.info("Configuração de OCR ajustada para desempenho em CPUs limitadas")
             
             # Ajustar uso de memória para o modelo
@@ -3482,6 +7994,23 @@ class AppProfiler:
                     "ctrl+l": "Focar na barra de endereço",
                     "ctrl+f": "Buscar na página"
                 }
+            },
+            
+            # Editores de código
+            "visual studio code": {
+                "common_elements": {
+                    "problemas": ["Problems", "Problemas"],
+                    "saída": ["Output", "Saída"],
+                    "depuração": ["Debug Console", "Console de Depuração"],
+                    "terminal": ["Terminal"],
+                    "explorador": ["Explorer", "Explorador"]
+                },
+                "regions": ["Explorer", "Search", "Source Control", "Run and Debug", "Extensions"],
+                "vocabulary": [
+                    "return", "import", "from", "class", "def", "self", "None", "True", "False",
+                    "function", "const", "let", "async", "await", "while", "for", "else", "elif",
+                    "try", "except", "finally", "raise", "with", "yield", "lambda", "print"
+                ]
             }
         }
         
@@ -3528,6 +8057,21 @@ class AppProfiler:
         
         return None
     
+    def get_vocabulary(self):
+        """Retorna pares (texto, aplicação) com o vocabulário conhecido de cada perfil"""
+        vocabulary = []
+        for app_name, profile in self.app_profiles.items():
+            for action, keywords in profile.get("common_elements", {}).items():
+                vocabulary.append((action, app_name))
+                vocabulary.extend((keyword, app_name) for keyword in keywords)
+            vocabulary.extend((region, app_name) for region in profile.get("regions", []))
+            vocabulary.extend((desc, app_name) for desc in profile.get("shortcuts", {}).values())
+            vocabulary.extend((word, app_name) for word in profile.get("vocabulary", []))
+        
+        # Atalhos comuns valem para qualquer aplicação
+        vocabulary.extend((desc, "generic") for desc in self.common_shortcuts.values())
+        return vocabulary
+    
     def suggest_shortcuts(self, app_name):
         """Sugere atalhos úteis para a aplicação atual"""
         shortcuts = []
@@ -3607,7 +8151,7 @@ class ErrorRecovery:
                 
             elif component == "ocr":
                 # Reiniciar motor OCR
-                self.screen_reader.vision_manager.reader = easyocr.Reader(['pt', 'en'], gpu=False)
+                self.screen_reader.vision_manager.reader = self.screen_reader.vision_manager.create_reader()
                 self.screen_reader.vision_manager.ocr_cache = {}  # Limpar cache
                 return True
                 
@@ -3621,8 +8165,11 @@ class ErrorRecovery:
             elif component == "accessibility":
                 # Reiniciar gerenciadores de acessibilidade
                 self.screen_reader.accessibility_manager = AccessibilityManager()
+                self.screen_reader.foreground_context.accessibility_manager = self.screen_reader.accessibility_manager
                 self.screen_reader.html_accessibility_manager = HTMLAccessibilityManager(
-                    self.screen_reader.accessibility_manager
+                    self.screen_reader.accessibility_manager,
+                    self.screen_reader.foreground_context,
+                    cdp_port=self.screen_reader.config.getint('accessibility', 'cdp_port', fallback=0)
                 )
                 return True
             
@@ -3733,6 +8280,214 @@ def testar_componentes():
     print("=== FIM DOS TESTES ===")
 
 
+# Função para medir a consulta por papel no backend de acessibilidade em páginas grandes
+def medir_consulta_por_papel(repeticoes=5, espera=3):
+    """Compara a consulta por papel no backend com a filtragem da árvore completa na página ativa
+    
+    Abra uma página grande no navegador e deixe-a em primeiro plano durante a contagem regressiva.
+    """
+    print("=== CONSULTA POR PAPEL: backend x árvore completa ===")
+    for segundos in range(espera, 0, -1):
+        print(f"   Iniciando em {segundos}...")
+        time.sleep(1)
+    
+    gerenciador = HTMLAccessibilityManager(AccessibilityManager())
+    consultas = {
+        'cabeçalhos': 'heading',
+        'links': 'link',
+        'formulários': ['textbox', 'button', 'checkbox', 'radio', 'combobox'],
+        'tabelas': 'table',
+        'regiões': ['region', 'landmark', 'main', 'navigation'],
+    }
+    
+    def medir(funcao):
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            resultado = funcao()
+        return resultado, (time.perf_counter() - inicio) * 1000 / repeticoes
+    
+    for nome, papel in consultas.items():
+        encontrados, tempo_backend = medir(lambda: gerenciador.find_elements_by_role(papel))
+        
+        def arvore_completa():
+            # Sessão nova a cada repetição, percorrendo a árvore inteira como antes
+            if gerenciador.tree_walker:
+                gerenciador.tree_walker.invalidate()
+            retrato = gerenciador.get_html_accessibility_snapshot()
+            while gerenciador.tree_walker and not gerenciador.tree_walker.is_complete(gerenciador.tree_root_key):
+                retrato = gerenciador.get_html_accessibility_snapshot()
+            return retrato.with_role(papel)
+        
+        filtrados, tempo_arvore = medir(arvore_completa)
+        
+        if encontrados is None:
+            print(f"   {nome}: backend sem suporte; árvore completa {len(filtrados)} em {tempo_arvore:.1f} ms")
+        else:
+            print(f"   {nome}: backend {len(encontrados)} em {tempo_backend:.1f} ms; "
+                  f"árvore completa {len(filtrados)} em {tempo_arvore:.1f} ms")
+
+
+# Função para verificar o backend CDP com uma gravação, sem navegador
+def testar_cdp_gravado(gravacao=None):
+    """Reproduz uma sessão CDP gravada no CDPAccessibilityBackend e confere os elementos obtidos
+    
+    Sem `gravacao`, usa uma página mínima embutida. Com um arquivo gravado, mostra os elementos lidos.
+    """
+    print("=== TESTE DO BACKEND CDP COM GRAVAÇÃO ===")
+    if gravacao is None:
+        estado = json.dumps([0, 0, 0, 0, 0, 0, 80, 1, True])
+        gravacao = {
+            'responses': {
+                'Runtime.evaluate': {'result': {'value': estado}},
+                'Accessibility.getFullAXTree': {'nodes': [
+                    {'nodeId': '1', 'role': {'value': 'heading'}, 'name': {'value': 'Título'}, 'backendDOMNodeId': 10},
+                    {'nodeId': '2', 'role': {'value': 'link'}, 'name': {'value': 'Início'}, 'backendDOMNodeId': 11},
+                ]},
+                'DOMSnapshot.captureSnapshot': {'documents': [{
+                    'nodes': {'backendNodeId': [10, 11, 12]},
+                    'layout': {'nodeIndex': [0, 1, 2],
+                               'bounds': [[0, 0, 200, 30], [0, 40, 80, 20], [0, 70, 60, 20]]},
+                }]},
+            },
+        }
+        embutida = True
+    else:
+        embutida = False
+    
+    transporte = CDPReplayTransport(gravacao)
+    backend = CDPAccessibilityBackend(transport_factory=lambda: transporte, state_interval=0)
+    if not backend.ensure_connected():
+        print("   Falha ao conectar com a gravação")
+        return False
+    
+    elementos = backend.get_elements()
+    for elemento in elementos:
+        print(f"   {elemento.element_type.name} '{elemento.text}' em {elemento.position}")
+    if not embutida:
+        backend.close()
+        return bool(elementos)
+    
+    # Atualização incremental: nó existente renomeado e nó novo com layout conhecido
+    transporte.emit({'method': 'Accessibility.nodesUpdated', 'params': {'nodes': [
+        {'nodeId': '2', 'role': {'value': 'link'}, 'name': {'value': 'Página inicial'}, 'backendDOMNodeId': 11},
+        {'nodeId': '3', 'role': {'value': 'button'}, 'name': {'value': 'Enviar'}, 'backendDOMNodeId': 12},
+    ]}})
+    atualizados = {elemento.text: elemento.element_type for elemento in backend.get_elements()}
+    botoes = backend.find_by_role(['button'])
+    backend.close()
+    
+    resultados = {
+        'árvore inicial': len(elementos) == 2 and elementos[0].position == (0, 80, 200, 110),
+        'nó renomeado': 'Página inicial' in atualizados and 'Início' not in atualizados,
+        'nó inserido': atualizados.get('Enviar') == UIElementType.BUTTON,
+        'consulta por papel': [b.text for b in botoes] == ['Enviar'],
+        'busca única': backend.stats['full_fetches'] == 1,
+    }
+    for nome, ok in resultados.items():
+        print(f"   {nome}: {'ok' if ok else 'FALHOU'}")
+    return all(resultados.values())
+
+
+# Função para comparar o backend otimizado do OCR com o easyOCR original
+def comparar_backends_ocr(pasta_recortes='ocr_crops', backend='onnx'):
+    """Compara paridade, latência e pico de memória entre o easyOCR original e o backend otimizado
+    
+    Usa os recortes gravados em `pasta_recortes` (veja a opção `record_ocr_crops` da seção [vision]).
+    """
+    import glob
+    import psutil
+    
+    print(f"=== COMPARAÇÃO DE BACKENDS DE OCR: eager x {backend} ===")
+    
+    arquivos = sorted(glob.glob(os.path.join(pasta_recortes, '*.png')))
+    if not arquivos:
+        print(f"   Nenhum recorte encontrado em '{pasta_recortes}'")
+        return None
+    recortes = [cv2.imread(arquivo, cv2.IMREAD_GRAYSCALE) for arquivo in arquivos]
+    
+    processo = psutil.Process()
+    
+    def medir(reader):
+        # Amostrar o RSS em paralelo para estimar o pico de memória durante o OCR
+        pico = [processo.memory_info().rss]
+        ativo = threading.Event()
+        ativo.set()
+        
+        def amostrar():
+            while ativo.is_set():
+                pico[0] = max(pico[0], processo.memory_info().rss)
+                time.sleep(0.005)
+        
+        amostrador = threading.Thread(target=amostrar, daemon=True)
+        base = processo.memory_info().rss
+        amostrador.start()
+        
+        textos = []
+        inicio = time.perf_counter()
+        for recorte in recortes:
+            textos.append(" ".join(text for _, text, _ in reader.readtext(recorte)))
+        latencia_ms = (time.perf_counter() - inicio) * 1000 / len(recortes)
+        
+        ativo.clear()
+        amostrador.join()
+        return textos, latencia_ms, (pico[0] - base) / (1024 ** 2)
+    
+    leitor_original = easyocr.Reader(['pt', 'en'], gpu=False)
+    textos_originais, latencia_original, memoria_original = medir(leitor_original)
+    
+    leitor_otimizado = easyocr.Reader(['pt', 'en'], gpu=False)
+    status = OCRInferenceBackend(backend).apply(leitor_otimizado)
+    textos_otimizados, latencia_otimizada, memoria_otimizada = medir(leitor_otimizado)
+    
+    iguais = sum(1 for a, b in zip(textos_originais, textos_otimizados) if a == b)
+    paridade = iguais / len(recortes)
+    
+    print(f"   Módulos convertidos: {status}")
+    print(f"   Recortes: {len(recortes)}, paridade de texto: {paridade:.1%}")
+    print(f"   Latência média: eager {latencia_original:.1f} ms, {backend} {latencia_otimizada:.1f} ms")
+    print(f"   Pico de memória adicional: eager {memoria_original:.1f} MB, {backend} {memoria_otimizada:.1f} MB")
+    for arquivo, a, b in zip(arquivos, textos_originais, textos_otimizados):
+        if a != b:
+            print(f"   Divergência em {os.path.basename(arquivo)}: '{a}' x '{b}'")
+    
+    return {
+        'paridade': paridade,
+        'latencia_ms': (latencia_original, latencia_otimizada),
+        'pico_memoria_mb': (memoria_original, memoria_otimizada),
+        'status': status
+    }
+
+
+# Função para ajustar os parâmetros de OCR por aplicação a partir de quadros gravados
+def ajustar_parametros_ocr(pasta_quadros='tuning_frames', arquivo_config='ai_screen_reader.ini'):
+    """Executa o OCRParameterTuner e mostra acurácia e latência antes e depois do ajuste"""
+    print("=== AJUSTE DE PARÂMETROS DE OCR POR APLICAÇÃO ===")
+    
+    config = configparser.ConfigParser()
+    config.read(arquivo_config)
+    vision = VisionManager(config)
+    if vision.reader is None:
+        print("   Motor OCR indisponível")
+        return {}
+    
+    relatorios = OCRParameterTuner(vision, pasta_quadros).run(arquivo_config)
+    for app, relatorio in relatorios.items():
+        print(f"   {app}: acurácia/ms {relatorio['baseline']} -> {relatorio['tuned']} "
+              f"({relatorio['samples']} regiões)")
+    return relatorios
+
+
 if __name__ == "__main__":
+    if "--medir-papeis" in sys.argv:
+        medir_consulta_por_papel()
+        sys.exit(0)
+    if "--testar-cdp" in sys.argv:
+        sys.exit(0 if testar_cdp_gravado() else 1)
+    if "--comparar-ocr" in sys.argv:
+        comparar_backends_ocr()
+        sys.exit(0)
+    if "--ajustar-ocr" in sys.argv:
+        ajustar_parametros_ocr()
+        sys.exit(0)
     main()
     testar_componentes()  # Executa apenas o teste de componentes
\ No newline at end of file